@@ -0,0 +1,101 @@
+"""
+Benchmark of coverage_shield start up time
+
+Times `python -m coverage_shield --help` in fresh python processes and lists the slowest imports
+(using python -X importtime). Exits with status 1 if the median time is over the budget.
+
+Run from the repository root with:
+python benchmarks/benchmark_import_time.py --runs 10 --budget 0.3
+"""
+
+# Load packages
+import argparse  # parsing command line arguments
+import subprocess  # running python in a fresh process
+import statistics  # calculating median time
+import sys  # getting python executable
+import time  # timing the command
+
+
+def time_command(command: [str], runs: int = 10) -> [float]:
+    """Times command run in a fresh process a number of times
+
+    Args:
+        command ([str]): command to run
+        runs (int, optional): number of times to run command. Defaults to 10.
+
+    Returns:
+        [float]: seconds taken by each run
+    """
+
+    durations = []
+    for _ in range(runs):
+        start_time = time.perf_counter()
+        subprocess.run(command, stdout=subprocess.DEVNULL, check=True)
+        durations.append(time.perf_counter() - start_time)
+
+    return durations
+
+
+def get_slowest_imports(command: [str], top_n: int = 10) -> [tuple[float, str]]:
+    """Gets slowest imports (including their own imports) when running python command
+
+    Args:
+        command ([str]): python arguments (python executable added)
+        top_n (int, optional): number of imports to report. Defaults to 10.
+
+    Returns:
+        [tuple[float, str]]: cumulative seconds and name of slowest imports
+    """
+
+    # Run command printing time taken by each import (written to standard error)
+    import_times = subprocess.run(
+        [sys.executable, "-X", "importtime", *command],
+        stdout=subprocess.DEVNULL,
+        stderr=subprocess.PIPE,
+        text=True,
+    ).stderr
+
+    # Parse lines like "import time:  self [us] | cumulative | imported package"
+    slowest_imports = []
+    for line in import_times.splitlines():
+        if not line.startswith("import time:") or "cumulative" in line:
+            continue
+        _, cumulative, name = line.split("|")
+        slowest_imports.append((int(cumulative) / 1e6, name.rstrip()))
+
+    return sorted(slowest_imports, reverse=True)[:top_n]
+
+
+def main():
+
+    # Get options
+    parser = argparse.ArgumentParser(description="Benchmark coverage_shield start up")
+    parser.add_argument("--runs", type=int, default=10, help="number of runs")
+    parser.add_argument(
+        "--budget", type=float, default=0.3, help="maximum median seconds"
+    )
+    args = parser.parse_args()
+
+    # Time python alone and coverage_shield --help
+    python_durations = time_command([sys.executable, "-c", "pass"], args.runs)
+    help_durations = time_command(
+        [sys.executable, "-m", "coverage_shield", "--help"], args.runs
+    )
+    python_median = statistics.median(python_durations)
+    help_median = statistics.median(help_durations)
+
+    # Report times
+    print(f"python start up (median of {args.runs}): {python_median:.3f}s")
+    print(f"coverage_shield --help (median of {args.runs}): {help_median:.3f}s")
+    print("\nSlowest imports (cumulative seconds):")
+    for seconds, name in get_slowest_imports(["-m", "coverage_shield", "--help"]):
+        print(f"{seconds:8.3f}  {name}")
+
+    # Check time within budget
+    if help_median > args.budget:
+        print(f"\ncoverage_shield --help took longer than budget ({args.budget}s)")
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
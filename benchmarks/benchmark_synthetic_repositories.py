@@ -0,0 +1,450 @@
+"""
+Benchmark of coverage_shield on synthetic repositories
+
+Generates synthetic python projects (package modules, unittest tests, .covignore, and README) of
+configurable size, then times:
+- The full pipeline (python -m coverage_shield, which calls parse_command_line_arguments()), broken
+  down into phases using --metrics
+- Each stage on its own: parse_coverage_report(), make_coverage_badge_url(), and replace_regex_in_file()
+
+Results are appended to a json lines file (with the coverage_shield version and git commit) and
+compared to the latest previous result for the same project size, so performance changes can be
+checked across versions.
+
+Run from the repository root with:
+python benchmarks/benchmark_synthetic_repositories.py --modules 10 100 --repeats 3
+"""
+
+# Load packages
+import argparse  # parsing command line arguments
+import json  # reading metrics and writing results
+import shutil  # copying README
+import statistics  # calculating median times
+import subprocess  # running coverage_shield in a fresh process
+import sys  # getting python executable
+import tempfile  # creating synthetic repositories
+import time  # timing stages
+from datetime import datetime, timezone  # noting when results recorded
+from pathlib import Path  # handling file paths
+
+# Import coverage_shield from this repository (rather than any installed version)
+REPOSITORY_DIRECTORY = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(REPOSITORY_DIRECTORY))
+import coverage_shield  # getting version
+from coverage_shield import unittest_coverage_functions  # stages to time
+
+# Badge pattern coverage_shield updates in README
+BADGE_REGEX = r"\!\[Code Coverage\]\(.+\)"
+
+
+def build_module(n_statements: int) -> str:
+    """Builds source of synthetic module with roughly the number of statements requested
+
+    Each function has four statements (including a branch).
+
+    Args:
+        n_statements (int): number of statements
+
+    Returns:
+        str: module source
+    """
+
+    functions = [
+        f"def function_{index}(value):\n"
+        f"    total = value * {index}\n"
+        f"    if total > {index * 10}:\n"
+        f"        return total - {index}\n"
+        f"    return total + {index}\n"
+        for index in range(max(n_statements // 4, 1))
+    ]
+
+    return "\n\n".join(functions)
+
+
+def build_test_module(module_index: int, n_tests: int, n_functions: int) -> str:
+    """Builds source of unittest module testing (roughly half of) the functions of a synthetic module
+
+    Args:
+        module_index (int): index of module tested
+        n_tests (int): number of tests
+        n_functions (int): number of functions in module
+
+    Returns:
+        str: test module source
+    """
+
+    tests = [
+        f"    def test_function_{index}(self):\n"
+        f"        self.assertIsInstance(module_{module_index}.function_{index % max(n_functions // 2, 1)}({index}), int)\n"
+        for index in range(n_tests)
+    ]
+
+    return (
+        "import unittest\n\n"
+        f"from synthetic_package import module_{module_index}\n\n\n"
+        f"class TestModule{module_index}(unittest.TestCase):\n" + "\n".join(tests)
+    )
+
+
+def build_covignore(n_patterns: int) -> str:
+    """Builds .covignore content with a mix of pattern types
+
+    Args:
+        n_patterns (int): number of patterns
+
+    Returns:
+        str: .covignore content
+    """
+
+    pattern_templates = [
+        "generated_{index}/",
+        "*_pb{index}.py",
+        "/build_{index}",
+        "docs/**/gen_{index}_*.py",
+        "vendor_{index}/*.py",
+    ]
+    patterns = ["setup.py", "__init__.py", "synthetic_package/vendor/"] + [
+        pattern_templates[index % len(pattern_templates)].format(index=index)
+        for index in range(n_patterns)
+    ]
+
+    return "\n".join(patterns) + "\n"
+
+
+def build_readme(n_lines: int) -> str:
+    """Builds README content with a coverage badge at the top
+
+    Args:
+        n_lines (int): number of lines
+
+    Returns:
+        str: README content
+    """
+
+    lines = ["![Code Coverage](https://img.shields.io/badge/coverage-0%25-red)", ""] + [
+        f"Line {index} of a synthetic README describing the package in some detail."
+        for index in range(n_lines)
+    ]
+
+    return "\n".join(lines) + "\n"
+
+
+def generate_repository(
+    directory: Path,
+    n_modules: int,
+    n_statements: int,
+    n_tests: int,
+    n_patterns: int,
+    n_readme_lines: int,
+):
+    """Generates synthetic repository
+
+    Args:
+        directory (Path): directory to create repository in
+        n_modules (int): number of package modules (each with a test module)
+        n_statements (int): number of statements in each module
+        n_tests (int): number of tests of each module
+        n_patterns (int): number of .covignore patterns (as well as a few defaults)
+        n_readme_lines (int): number of lines in README
+    """
+
+    # Create package (with an ignored vendor module) and tests
+    package_directory = Path(directory, "synthetic_package")
+    Path(package_directory, "vendor").mkdir(parents=True)
+    Path(directory, "tests").mkdir()
+    Path(package_directory, "__init__.py").touch()
+    Path(package_directory, "vendor", "__init__.py").touch()
+    Path(package_directory, "vendor", "library.py").write_text(build_module(40))
+    Path(directory, "tests", "__init__.py").touch()
+    for module_index in range(n_modules):
+        Path(package_directory, f"module_{module_index}.py").write_text(
+            build_module(n_statements)
+        )
+        Path(directory, "tests", f"test_module_{module_index}.py").write_text(
+            build_test_module(module_index, n_tests, max(n_statements // 4, 1))
+        )
+
+    # Create .covignore and README
+    Path(directory, ".covignore").write_text(build_covignore(n_patterns))
+    Path(directory, "README.md").write_text(build_readme(n_readme_lines))
+
+
+def time_function(function, repeats: int = 5) -> float:
+    """Times function (after a warm up call) and returns median duration
+
+    Args:
+        function: function without arguments to time
+        repeats (int, optional): number of timed calls. Defaults to 5.
+
+    Returns:
+        float: median seconds
+    """
+
+    function()
+    durations = []
+    for _ in range(repeats):
+        start_time = time.perf_counter()
+        function()
+        durations.append(time.perf_counter() - start_time)
+
+    return statistics.median(durations)
+
+
+def time_pipeline(
+    directory: Path, engine: str = "api", repeats: int = 5
+) -> tuple[float, dict[str, float]]:
+    """Times full coverage_shield run (fresh process) on repository
+
+    Args:
+        directory (Path): repository directory
+        engine (str, optional): coverage engine (-e/--engine). Defaults to "api".
+        repeats (int, optional): number of runs. Defaults to 5.
+
+    Returns:
+        tuple[float, dict[str, float]]: median seconds and median seconds of each phase
+    """
+
+    metrics_path = Path(directory, ".coverage_shield", "metrics.json")
+    durations = []
+    phase_durations = {}
+    for _ in range(repeats):
+        start_time = time.perf_counter()
+        subprocess.run(
+            [
+                sys.executable,
+                "-m",
+                "coverage_shield",
+                "-d",
+                str(directory),
+                "-e",
+                engine,
+                "-n",
+                "--metrics",
+            ],
+            cwd=REPOSITORY_DIRECTORY,
+            stdout=subprocess.DEVNULL,
+            stderr=subprocess.DEVNULL,
+            check=True,
+        )
+        durations.append(time.perf_counter() - start_time)
+
+        # Note duration of each phase
+        with open(metrics_path) as file:
+            for phase in json.load(file)["phases"]:
+                phase_durations.setdefault(phase["phase"], []).append(
+                    phase["wall_seconds"]
+                )
+
+    return statistics.median(durations), {
+        phase: statistics.median(phase_seconds)
+        for phase, phase_seconds in phase_durations.items()
+    }
+
+
+def time_stages(directory: Path, repeats: int = 5) -> dict[str, float]:
+    """Times report parsing, badge building, and README updating stages on their own
+
+    Uses coverage data left by a previous run of coverage_shield in the repository.
+
+    Args:
+        directory (Path): repository directory
+        repeats (int, optional): number of timed calls of each stage. Defaults to 5.
+
+    Returns:
+        dict[str, float]: median seconds of each stage
+    """
+
+    # Get coverage report and patterns to ignore
+    coverage_report_string = subprocess.run(
+        [sys.executable, "-m", "coverage", "report"],
+        cwd=directory,
+        capture_output=True,
+        text=True,
+        check=True,
+    ).stdout
+    patterns_to_ignore = (
+        unittest_coverage_functions.load_patterns_to_ignore_in_coverage(
+            Path(directory, ".covignore")
+        )
+    )
+    coverage_report = unittest_coverage_functions.parse_coverage_report(
+        coverage_report_string, patterns_to_ignore
+    )
+    badge_url = unittest_coverage_functions.make_coverage_badge_url(coverage_report)
+
+    # Update copy of README (so each call starts from the same file)
+    readme_path = Path(directory, "README_copy.md")
+    shutil.copy(Path(directory, "README.md"), readme_path)
+
+    return {
+        "parse_coverage_report": time_function(
+            lambda: unittest_coverage_functions.parse_coverage_report(
+                coverage_report_string, patterns_to_ignore
+            ),
+            repeats,
+        ),
+        "make_coverage_badge_url": time_function(
+            lambda: unittest_coverage_functions.make_coverage_badge_url(
+                coverage_report
+            ),
+            repeats,
+        ),
+        "replace_regex_in_file": time_function(
+            lambda: unittest_coverage_functions.replace_regex_in_file(
+                readme_path, BADGE_REGEX, f"![Code Coverage]({badge_url})"
+            ),
+            repeats,
+        ),
+    }
+
+
+def get_commit() -> str:
+    """Gets commit of this repository (None if not available)
+
+    Returns:
+        str: commit hash
+    """
+
+    result = subprocess.run(
+        ["git", "rev-parse", "HEAD"],
+        cwd=REPOSITORY_DIRECTORY,
+        capture_output=True,
+        text=True,
+    )
+
+    return result.stdout.strip() if result.returncode == 0 else None
+
+
+def find_previous_result(results_path: Path, size: dict) -> dict:
+    """Finds latest result recorded for the same repository size
+
+    Args:
+        results_path (Path): json lines file of results
+        size (dict): size of synthetic repository
+
+    Returns:
+        dict: previous result (None if not found)
+    """
+
+    if not results_path.is_file():
+        return None
+
+    previous_result = None
+    with open(results_path) as file:
+        for line in file:
+            result = json.loads(line)
+            if result["size"] == size:
+                previous_result = result
+
+    return previous_result
+
+
+def print_result(result: dict, previous_result: dict = None):
+    """Prints timings of result (compared to previous result if available)
+
+    Args:
+        result (dict): benchmark result
+        previous_result (dict, optional): previous result for same size. Defaults to None.
+    """
+
+    print(f"\nSynthetic repository: {result['size']}")
+    previous_timings = {} if previous_result is None else previous_result["timings"]
+    for name, seconds in result["timings"].items():
+        line = f"{seconds:10.4f}s  {name}"
+        if previous_timings.get(name):
+            line += f"  ({seconds / previous_timings[name]:.2f}x previous {previous_timings[name]:.4f}s)"
+        print(line)
+    if previous_result is not None:
+        print(
+            f"(previous result: version {previous_result['version']}, commit {previous_result['commit']}, {previous_result['recorded_at']})"
+        )
+
+
+def main():
+
+    # Get options
+    parser = argparse.ArgumentParser(
+        description="Benchmark coverage_shield on synthetic repositories"
+    )
+    parser.add_argument(
+        "--modules",
+        type=int,
+        nargs="+",
+        default=[10, 100],
+        help="number of modules (one repository per value)",
+    )
+    parser.add_argument(
+        "--statements", type=int, default=100, help="statements per module"
+    )
+    parser.add_argument("--tests", type=int, default=5, help="tests per module")
+    parser.add_argument(
+        "--patterns", type=int, default=20, help="number of .covignore patterns"
+    )
+    parser.add_argument(
+        "--readme_lines", type=int, default=1000, help="number of README lines"
+    )
+    parser.add_argument("--engine", default="api", help="coverage engine")
+    parser.add_argument("--repeats", type=int, default=3, help="number of runs")
+    parser.add_argument(
+        "--results",
+        type=Path,
+        default=Path(
+            REPOSITORY_DIRECTORY, ".coverage_shield", "benchmark_results.jsonl"
+        ),
+        help="json lines file to append results to",
+    )
+    args = parser.parse_args()
+
+    for n_modules in args.modules:
+
+        # Note repository size
+        size = {
+            "modules": n_modules,
+            "statements": args.statements,
+            "tests": args.tests,
+            "patterns": args.patterns,
+            "readme_lines": args.readme_lines,
+            "engine": args.engine,
+        }
+
+        with tempfile.TemporaryDirectory() as temporary_directory:
+
+            # Generate repository and time coverage_shield on it
+            generate_repository(
+                Path(temporary_directory),
+                n_modules,
+                args.statements,
+                args.tests,
+                args.patterns,
+                args.readme_lines,
+            )
+            pipeline_seconds, phase_seconds = time_pipeline(
+                Path(temporary_directory), args.engine, args.repeats
+            )
+            stage_seconds = time_stages(Path(temporary_directory), args.repeats)
+
+        # Store and report result
+        result = {
+            "recorded_at": datetime.now(timezone.utc).isoformat(timespec="seconds"),
+            "version": coverage_shield.__version__,
+            "commit": get_commit(),
+            "python": sys.version.split()[0],
+            "size": size,
+            "timings": {
+                "pipeline": pipeline_seconds,
+                **{
+                    f"pipeline:{phase}": seconds
+                    for phase, seconds in phase_seconds.items()
+                },
+                **stage_seconds,
+            },
+        }
+        previous_result = find_previous_result(args.results, size)
+        args.results.parent.mkdir(parents=True, exist_ok=True)
+        with open(args.results, "a") as file:
+            file.write(json.dumps(result) + "\n")
+        print_result(result, previous_result)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,224 @@
+# Load required libraries
+from __future__ import annotations  # type hints not evaluated
+import subprocess  # running tests in the project directory
+import sys  # getting python executable
+import time  # timing each step
+from pathlib import Path  # handling file paths
+from typing import NamedTuple  # storing results
+import coverage  # reading coverage data saved by test process
+
+# Local imports
+from coverage_shield import coverage_data_functions
+from coverage_shield import covignore_functions
+from coverage_shield import unittest_coverage_functions
+from coverage_shield.coverage_data_functions import CoverageRecord
+
+
+class CoverageResult(NamedTuple):
+    """Result of calculating coverage of a project (see update_coverage_badge())
+
+    passed is False if the tests (or coverage) failed, in which case total is None and files is empty.
+    coverage is the percentage of statements run (rounded as on the badge), timings holds the seconds
+    taken by each step ("run_tests", "coverage_report", "update_readme", and "total"), and output is
+    the error output of the test run (unit testing progress).
+    """
+
+    project_root: Path
+    passed: bool
+    total: CoverageRecord
+    files: tuple[CoverageRecord, ...]
+    coverage: float
+    badge_url: str
+    timings: dict[str, float]
+    output: str
+
+
+def calculate_coverage_percentage(coverage_total: CoverageRecord) -> float:
+    """Calculates percentage of statements run, rounded as on the badge
+
+    Args:
+        coverage_total (CoverageRecord): total statistics (None if coverage failed)
+
+    Returns:
+        float: percentage of statements run (None if coverage failed)
+    """
+
+    if coverage_total is None:
+        return None
+    if coverage_total.statements == 0:
+        return 100.0
+
+    return round(
+        (coverage_total.statements - coverage_total.missed)
+        / coverage_total.statements
+        * 100,
+        1,
+    )
+
+
+def find_coverage_config(project_root: Path) -> str | bool:
+    """Finds project's coverage configuration file, checking the files coverage checks (in the same
+    order) in the project directory rather than the current directory
+
+    Args:
+        project_root (Path): project directory
+
+    Returns:
+        str | bool: path to configuration file, or False if project has no coverage configuration
+    """
+
+    for file_name, section_prefix in [
+        (".coveragerc", ""),
+        (".coveragerc.toml", ""),
+        ("setup.cfg", "[coverage:"),
+        ("tox.ini", "[coverage:"),
+        ("pyproject.toml", "[tool.coverage"),
+    ]:
+        config_path = Path(project_root, file_name)
+        if config_path.is_file() and section_prefix in config_path.read_text():
+            return str(config_path)
+
+    return False
+
+
+def run_project_coverage(
+    project_root: Path, tester: str = "unittest", omit_patterns: [str] = ()
+) -> tuple[subprocess.CompletedProcess, float]:
+    """Runs project's tests under coverage in a separate python process started in the project directory
+
+    The coverage data are saved in the project's .coverage file.
+
+    Args:
+        project_root (Path): project directory
+        tester (str, optional): unit test package to use ("unittest" or "pytest"). Defaults to "unittest".
+        omit_patterns ([str], optional): coverage omit patterns of files not to trace. Defaults to ().
+
+    Returns:
+        tuple[subprocess.CompletedProcess, float]: result of coverage command and seconds taken
+    """
+
+    start_time = time.perf_counter()
+    command_result = subprocess.run(
+        [
+            sys.executable,
+            "-m",
+            "coverage",
+            "run",
+            "--source=.",
+            *covignore_functions.build_omit_arguments(omit_patterns),
+            "-m",
+            tester,
+        ],
+        cwd=project_root,
+        capture_output=True,
+        text=True,
+    )
+
+    return command_result, time.perf_counter() - start_time
+
+
+def update_coverage_badge(
+    project_root: Path,
+    readme_path: Path = Path("README.md"),
+    tester: str = "unittest",
+    update_readme: bool = True,
+) -> CoverageResult:
+    """Calculates coverage of project's tests, builds coverage badge, and adds it to README
+
+    Unlike the command line interface, the current directory is never changed: the tests themselves
+    still run in a separate python process (coverage run) started in the project directory, and the
+    report is built in this process from the .coverage file it saves, with file names and coverage
+    configuration taken from project_root. Global state (e.g. imported modules) isn't changed either,
+    so projects can be run from several threads at once (as long as they don't share a README).
+
+    Args:
+        project_root (Path): project directory (containing tests and .covignore)
+        readme_path (Path, optional): path to README (relative to project_root unless absolute).
+            Defaults to Path("README.md").
+        tester (str, optional): unit test package to use ("unittest" or "pytest"). Defaults to "unittest".
+        update_readme (bool, optional): whether to add badge to README. Defaults to True.
+
+    Returns:
+        CoverageResult: totals, per file statistics, badge url, and timings
+    """
+
+    # Check tester option provided
+    tester_options = ["unittest", "pytest"]
+    if not tester in tester_options:
+        raise ValueError(
+            f"The tester option provided ({tester}) was not recognised. Must be one of: {', '.join(tester_options)}"
+        )
+
+    start_time = time.perf_counter()
+    project_root = Path(project_root).resolve()
+    timings = {}
+
+    # Get patterns to ignore (and omit from tracing)
+    patterns_to_ignore = (
+        unittest_coverage_functions.load_patterns_to_ignore_in_coverage(
+            Path(project_root, ".covignore")
+        )
+    )
+    omit_patterns = covignore_functions.build_omit_patterns(
+        patterns_to_ignore, project_root
+    )
+
+    # Run the tests
+    command_result, timings["run_tests"] = run_project_coverage(
+        project_root, tester, omit_patterns
+    )
+
+    # Build the report from the saved coverage data (in this process)
+    files = ()
+    if command_result.returncode == 0:
+        report_start_time = time.perf_counter()
+        coverage_object = coverage.Coverage(
+            data_file=str(Path(project_root, ".coverage")),
+            config_file=find_coverage_config(project_root),
+        )
+        try:
+            coverage_object.load()
+            files = tuple(
+                coverage_data_functions.filter_coverage_records(
+                    coverage_data_functions.iterate_coverage_records(
+                        coverage_object, project_root
+                    ),
+                    patterns_to_ignore,
+                )
+            )
+        except coverage.exceptions.CoverageException:
+            files = ()
+        timings["coverage_report"] = time.perf_counter() - report_start_time
+
+    # Sum the statements and build the badge
+    passed = command_result.returncode == 0 and len(files) > 0
+    coverage_total = (
+        coverage_data_functions.sum_coverage_records(files) if passed else None
+    )
+    badge_url = unittest_coverage_functions.make_coverage_badge_url(
+        [] if coverage_total is None else [coverage_total]
+    )
+
+    # Add the badge to the README
+    if update_readme:
+        readme_start_time = time.perf_counter()
+        unittest_coverage_functions.replace_regex_in_file(
+            file_path=Path(project_root, readme_path),
+            pattern_regex=unittest_coverage_functions.build_badge_pattern(
+                "Code Coverage"
+            ),
+            replacement=f"![Code Coverage]({badge_url})",
+        )
+        timings["update_readme"] = time.perf_counter() - readme_start_time
+    timings["total"] = time.perf_counter() - start_time
+
+    return CoverageResult(
+        project_root,
+        passed,
+        coverage_total,
+        files if passed else (),
+        calculate_coverage_percentage(coverage_total),
+        badge_url,
+        timings,
+        command_result.stderr,
+    )
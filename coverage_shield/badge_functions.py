@@ -0,0 +1,252 @@
+# Load required libraries
+import functools  # caching rendered badges
+import os  # building relative paths
+import re  # splitting badge urls
+from pathlib import Path  # handling file paths
+from urllib.parse import unquote, urlparse  # decoding badge urls
+from xml.sax.saxutils import escape  # escaping badge text
+
+# Advance widths (in font units, 2048 per em) of Verdana characters, the font shields io uses
+# (approximate for punctuation, characters not listed are given DEFAULT_CHARACTER_WIDTH)
+# fmt: off
+CHARACTER_WIDTHS = {
+    **dict.fromkeys("0123456789", 1302),
+    " ": 720, "!": 823, '"': 1015, "#": 1876, "$": 1302, "%": 2188, "&": 1526, "'": 557,
+    "(": 931, ")": 931, "*": 1302, "+": 1716, ",": 745, "-": 868, ".": 745, "/": 1302,
+    ":": 868, ";": 868, "<": 1716, "=": 1716, ">": 1716, "?": 1114, "@": 2048, "[": 931,
+    "\\": 1302, "]": 931, "^": 1716, "_": 1302, "`": 1302, "{": 1300, "|": 931, "}": 1300,
+    "~": 1716, "A": 1401, "B": 1405, "C": 1430, "D": 1577, "E": 1294, "F": 1178, "G": 1587,
+    "H": 1540, "I": 868, "J": 938, "K": 1415, "L": 1141, "M": 1750, "N": 1540, "O": 1615,
+    "P": 1256, "Q": 1615, "R": 1438, "S": 1406, "T": 1240, "U": 1522, "V": 1401, "W": 2025,
+    "X": 1404, "Y": 1241, "Z": 1403, "a": 1229, "b": 1256, "c": 1059, "d": 1256, "e": 1206,
+    "f": 716, "g": 1256, "h": 1282, "i": 561, "j": 688, "k": 1188, "l": 561, "m": 1960,
+    "n": 1282, "o": 1232, "p": 1256, "q": 1256, "r": 874, "s": 1049, "t": 793, "u": 1282,
+    "v": 1188, "w": 1640, "x": 1188, "y": 1188, "z": 1053,
+}
+# fmt: on
+DEFAULT_CHARACTER_WIDTH = 1302
+UNITS_PER_EM = 2048
+FONT_SIZE = 11
+
+# Colours shields io accepts by name (others are given as hex without the hash)
+NAMED_COLOURS = {
+    "brightgreen": "#4c1",
+    "green": "#97ca00",
+    "yellowgreen": "#a4a61d",
+    "yellow": "#dfb317",
+    "orange": "#fe7d37",
+    "red": "#e05d44",
+    "blue": "#007ec6",
+    "grey": "#555",
+    "lightgrey": "#9f9f9f",
+}
+
+# Flat style badge (as shields io draws it), filled in by render_badge_svg()
+BADGE_TEMPLATE = (
+    '<svg xmlns="http://www.w3.org/2000/svg" width="{width}" height="20" role="img" '
+    'aria-label="{label}: {value}"><title>{label}: {value}</title>'
+    '<linearGradient id="s" x2="0" y2="100%"><stop offset="0" stop-color="#bbb" '
+    'stop-opacity=".1"/><stop offset="1" stop-opacity=".1"/></linearGradient>'
+    '<clipPath id="r"><rect width="{width}" height="20" rx="3" fill="#fff"/></clipPath>'
+    '<g clip-path="url(#r)"><rect width="{label_width}" height="20" fill="#555"/>'
+    '<rect x="{label_width}" width="{value_width}" height="20" fill="{colour}"/>'
+    '<rect width="{width}" height="20" fill="url(#s)"/></g>'
+    '<g fill="#fff" text-anchor="middle" font-family="Verdana,Geneva,DejaVu Sans,sans-serif" '
+    'font-size="{font_size}">'
+    '<text x="{label_x}" y="15" fill="#010101" fill-opacity=".3">{label}</text>'
+    '<text x="{label_x}" y="14">{label}</text>'
+    '<text x="{value_x}" y="15" fill="{value_shadow}" fill-opacity=".3">{value}</text>'
+    '<text x="{value_x}" y="14" fill="{value_text}">{value}</text></g></svg>\n'
+)
+
+
+def measure_text_width(text: str) -> float:
+    """Measures width of text (in pixels) written in badge font
+
+    Args:
+        text (str): text to measure
+
+    Returns:
+        float: width of text in pixels
+    """
+
+    return (
+        sum(
+            CHARACTER_WIDTHS.get(character, DEFAULT_CHARACTER_WIDTH)
+            for character in text
+        )
+        * FONT_SIZE
+        / UNITS_PER_EM
+    )
+
+
+def convert_colour_to_hex(colour: str) -> str:
+    """Converts colour (as given to shields io) to hex colour
+
+    Args:
+        colour (str): colour name (e.g. "red") or hex colour (with or without the hash)
+
+    Returns:
+        str: hex colour with hash
+    """
+
+    if colour in NAMED_COLOURS:
+        return NAMED_COLOURS[colour]
+    if re.fullmatch(r"#?([0-9a-fA-F]{3}|[0-9a-fA-F]{6})", colour) is None:
+        raise ValueError(f"The badge colour provided ({colour}) was not recognised.")
+
+    return colour if colour.startswith("#") else f"#{colour}"
+
+
+def is_light_colour(hex_colour: str) -> bool:
+    """Checks if colour is light (so badge text is written in dark grey rather than white)
+
+    Args:
+        hex_colour (str): hex colour with hash (3 or 6 digits)
+
+    Returns:
+        bool: True if colour is light
+    """
+
+    digits = hex_colour[1:]
+    if len(digits) == 3:
+        digits = "".join(digit * 2 for digit in digits)
+    red, green, blue = (int(digits[index : index + 2], 16) for index in (0, 2, 4))
+
+    return (red * 299 + green * 587 + blue * 114) / 255000 > 0.69
+
+
+@functools.lru_cache(maxsize=128)
+def render_badge_svg(label: str, value: str, colour: str) -> str:
+    """Renders badge as SVG (cached, so identical badges are only rendered once)
+
+    Args:
+        label (str): text on left of badge (e.g. "coverage")
+        value (str): text on right of badge (e.g. "87.5%")
+        colour (str): colour of right of badge (name or hex colour, see convert_colour_to_hex())
+
+    Returns:
+        str: SVG of badge
+    """
+
+    # Size each half of the badge around its text
+    label_width = round(measure_text_width(label)) + 10
+    value_width = round(measure_text_width(value)) + 10
+
+    # Choose text colour that can be read on badge colour
+    hex_colour = convert_colour_to_hex(colour)
+    light = is_light_colour(hex_colour)
+
+    return BADGE_TEMPLATE.format(
+        width=label_width + value_width,
+        label_width=label_width,
+        value_width=value_width,
+        label_x=label_width / 2,
+        value_x=label_width + value_width / 2,
+        label=escape(label, {'"': "&quot;"}),
+        value=escape(value, {'"': "&quot;"}),
+        colour=hex_colour,
+        value_text="#333" if light else "#fff",
+        value_shadow="#ccc" if light else "#010101",
+        font_size=FONT_SIZE,
+    )
+
+
+def write_badge_svg(file_path: Path, label: str, value: str, colour: str) -> bool:
+    """Writes badge as SVG file, unless file already holds the same badge
+
+    Args:
+        file_path (Path): path to SVG file
+        label (str): text on left of badge
+        value (str): text on right of badge
+        colour (str): colour of right of badge
+
+    Returns:
+        bool: True if file written (False if unchanged)
+    """
+
+    # Check if file already holds badge (so it isn't rewritten)
+    badge_svg = render_badge_svg(label, value, colour)
+    file_path = Path(file_path)
+    if file_path.is_file() and file_path.read_text() == badge_svg:
+        return False
+
+    # Write badge
+    file_path.parent.mkdir(parents=True, exist_ok=True)
+    file_path.write_text(badge_svg)
+
+    return True
+
+
+def parse_badge_url(badge_url: str) -> tuple[str, str, str]:
+    """Gets label, value, and colour of shields io static badge from its url
+
+    Args:
+        badge_url (str): shields io badge url (e.g. https://img.shields.io/badge/coverage-87.5%25-a5d86a)
+
+    Returns:
+        tuple[str, str, str]: label, value, and colour of badge
+    """
+
+    # Split badge into its parts (dashes are separators unless doubled)
+    badge = urlparse(badge_url).path.rsplit("/", 1)[-1]
+    parts = re.split(r"(?<!-)-(?!-)", badge)
+    if len(parts) != 3:
+        raise ValueError(f"The badge url provided ({badge_url}) was not recognised.")
+
+    # Decode text (underscores are spaces unless doubled)
+    label, value, colour = (
+        unquote(part)
+        .replace("--", "-")
+        .replace("__", "\0")
+        .replace("_", " ")
+        .replace("\0", "_")
+        for part in parts
+    )
+
+    return label, value, colour
+
+
+def build_badge_file_name(badge_name: str) -> str:
+    """Builds SVG file name for badge (e.g. "Code Coverage" -> "code_coverage.svg")
+
+    Args:
+        badge_name (str): name of badge in README
+
+    Returns:
+        str: file name
+    """
+
+    return re.sub(r"\W+", "_", badge_name.strip()).lower() + ".svg"
+
+
+def write_local_badges(
+    badge_urls: dict[str, str], badge_directory: Path, readme_path: Path
+) -> tuple[dict[str, str], list[Path]]:
+    """Renders shields io badges as SVG files so README doesn't need shields io to show them
+
+    Args:
+        badge_urls (dict[str, str]): shields io badge url for each badge (keyed by badge name)
+        badge_directory (Path): directory to write SVG files to
+        readme_path (Path): path to README the badges are shown in
+
+    Returns:
+        tuple[dict[str, str], list[Path]]: path of each SVG file relative to README (keyed by badge
+            name) and paths of the SVG files written (those that changed)
+    """
+
+    badge_paths = {}
+    written_paths = []
+    for badge_name, badge_url in badge_urls.items():
+
+        # Write badge (if changed)
+        file_path = Path(badge_directory, build_badge_file_name(badge_name))
+        if write_badge_svg(file_path, *parse_badge_url(badge_url)):
+            written_paths.append(file_path)
+
+        # Note path to use in README (always with forward slashes)
+        badge_paths[badge_name] = Path(
+            os.path.relpath(file_path.resolve(), Path(readme_path).resolve().parent)
+        ).as_posix()
+
+    return badge_paths, written_paths
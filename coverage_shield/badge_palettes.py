@@ -0,0 +1,94 @@
+"""
+Colour palettes for coverage badges, precomputed so seaborn doesn't need to be imported
+
+Each palette holds 100 hex colours (one for each percentage point), generated with:
+seaborn.color_palette(palette_name, 100).as_hex()
+"""
+
+# Precomputed palettes (colours separated by spaces)
+BADGE_PALETTES = {
+    "RdYlGn": (
+        "#a90426 #af0926 #b30d26 #b91326 #bd1726 #c21c27 #c62027 #cc2627 #d02927 "
+        "#d62f27 #d93429 #dc3b2c #de402e #e24731 #e54e35 #e75337 #eb5a3a #ed5f3c "
+        "#f16640 #f36b42 #f57245 #f57748 #f67f4b #f7844e #f88c51 #f99153 #fa9857 "
+        "#fb9d59 #fca55d #fdad60 #fdb163 #fdb768 #fdbb6c #fdc171 #fdc574 #feca79 "
+        "#fece7c #fed481 #fed884 #fede89 #fee18d #fee593 #fee797 #feeb9d #feefa3 "
+        "#fff1a8 #fff5ae #fff7b2 #fffbb8 #fffdbc #fdfebc #fafdb8 #f5fbb2 #f2faae "
+        "#eef8a8 #ebf7a3 #e6f59d #e2f397 #dff293 #daf08d #d7ee8a #d1ec86 #cdea83 "
+        "#c7e77f #c3e67d #bde379 #b9e176 #b3df72 #afdd70 #a9da6c #a5d86a #9dd569 "
+        "#96d268 #91d068 #89cc67 #84ca66 #7dc765 #78c565 #70c164 #6bbf64 #63bc62 "
+        "#5db961 #54b45f #4eb15d #45ad5b #3faa59 #36a657 #2da155 #279f53 #1e9a51 "
+        "#199750 #16914d #148e4b #118848 #0f8446 #0c7f43 #0a7b41 #07753e #05713c "
+        "#026c39"
+    ).split(),
+    "RdYlBu": (
+        "#a90426 #af0926 #b30d26 #b91326 #bd1726 #c21c27 #c62027 #cc2627 #d02927 "
+        "#d62f27 #d93429 #dc3b2c #de402e #e24731 #e54e35 #e75337 #eb5a3a #ed5f3c "
+        "#f16640 #f36b42 #f57245 #f57748 #f67f4b #f7844e #f88c51 #f99153 #fa9857 "
+        "#fb9d59 #fca55d #fdad60 #fdb164 #fdb769 #fdbb6d #fdc173 #fdc576 #feca7c "
+        "#fece7f #fed485 #fed889 #fede8e #fee192 #fee597 #fee79b #feeba1 #feefa6 "
+        "#fff1aa #fff5af #fff7b3 #fffbb9 #fffdbc #fdfec2 #fbfdc7 #f7fcce #f5fbd2 "
+        "#f1fad9 #eff9dd #ebf7e4 #e7f6eb #e5f5ef #e1f3f6 #def2f7 #d8eff6 #d4edf4 "
+        "#cdeaf3 #c9e8f2 #c3e5f0 #bfe3ef #b9e0ed #b4deec #aedbea #aad8e9 #a3d3e6 "
+        "#9dcee3 #99cae1 #92c5de #8ec2dc #87bdd9 #83b9d8 #7db4d5 #78b0d3 #72abd0 "
+        "#6ea6ce #69a0ca #659bc8 #6095c4 #5c90c2 #578abf #5183bb #4d7fb9 #4878b6 "
+        "#4574b3 #426cb0 #4167ad #3e60aa #3d5ba7 #3a54a4 #394fa1 #36479e #35429b "
+        "#333b97"
+    ).split(),
+    "RdBu": (
+        "#6d0220 #760521 #7c0722 #840924 #8a0b25 #930e26 #991027 #a21328 #a81529 "
+        "#b1182b #b41c2d #b82531 #bb2a34 #bf3338 #c43b3c #c6413e #cb4942 #ce4f45 "
+        "#d25849 #d55d4c #d86551 #db6b55 #de735c #e17860 #e48066 #e6866a #ea8e70 "
+        "#ec9374 #f09c7b #f3a481 #f5a886 #f6af8e #f6b394 #f7b99c #f8bda1 #f9c4a9 "
+        "#fac8af #fbceb7 #fcd3bc #fdd9c4 #fddcc9 #fcdfcf #fce2d2 #fbe5d8 #fae8de "
+        "#faeae1 #f9eee7 #f9f0eb #f8f3f0 #f7f5f4 #f5f6f7 #f2f5f6 #edf2f5 #eaf1f5 "
+        "#e6eff4 #e3edf3 #deebf2 #dae9f2 #d7e8f1 #d2e6f0 #cfe4ef #c7e0ed #c2ddec "
+        "#bbdaea #b6d7e8 #aed3e6 #a9d1e5 #a2cde3 #9dcbe1 #96c7df #90c4dd #87beda "
+        "#7eb8d7 #78b4d5 #6eaed2 #68abd0 #5fa5cd #59a1ca #4f9bc7 #4997c5 #4291c2 "
+        "#3f8ec0 #3b88be #3885bc #3480b9 #327cb7 #2e77b5 #2a71b2 #276eb0 #2369ad "
+        "#2065ab #1d5fa2 #1b5a9c #185493 #15508d #124984 #10457e #0d3f76 #0a3b70 "
+        "#073467"
+    ).split(),
+    "Spectral": (
+        "#a20643 #a90d45 #ad1246 #b41947 #b81e48 #be254a #c32a4b #c9314c #cd364d "
+        "#d43d4f #d7414e #da464d #dd4a4c #e1504b #e45549 #e75948 #ea5e47 #ed6246 "
+        "#f06744 #f36b43 #f57245 #f57748 #f67f4b #f7844e #f88c51 #f99153 #fa9857 "
+        "#fb9d59 #fca55d #fdad60 #fdb163 #fdb768 #fdbb6c #fdc171 #fdc574 #feca79 "
+        "#fece7c #fed481 #fed884 #fede89 #fee18d #fee593 #fee797 #feeb9d #feefa3 "
+        "#fff1a8 #fff5ae #fff7b2 #fffbb8 #fffdbc #fefebd #fcfeba #f9fcb5 #f7fcb2 "
+        "#f4faad #f2faaa #eff9a6 #ecf7a1 #eaf79e #e7f59a #e4f498 #ddf19a #d8ef9b "
+        "#d1ed9c #cdeb9d #c6e89f #c1e6a0 #bae3a1 #b5e1a2 #aedea3 #aadca4 #a2d9a4 "
+        "#99d6a4 #94d4a4 #8cd1a4 #86cfa5 #7ecca5 #79c9a5 #71c6a5 #6bc4a5 #64c0a6 "
+        "#60bba8 #5ab4ab #56b0ad #50a9af #4ba4b1 #459eb4 #3f97b7 #3b92b9 #358bbc "
+        "#3387bc #3880b9 #3b7cb7 #4175b4 #4471b2 #496aaf #4d65ad #525fa9 #555aa7 "
+        "#5b53a4"
+    ).split(),
+    "viridis": (
+        "#450457 #46085c #460b5e #471063 #471365 #481769 #481a6c #481d6f #482071 "
+        "#482475 #482677 #472a7a #472d7b #46307e #463480 #453781 #443a83 #433d84 "
+        "#424086 #414287 #404688 #3f4889 #3e4c8a #3d4e8a #3b518b #3a538b #39568c "
+        "#38598c #365c8d #355f8d #34618d #32648e #31668e #30698e #2f6b8e #2e6e8e "
+        "#2d708e #2c728e #2b748e #2a778e #29798e #287c8e #277e8e #26818e #25838e "
+        "#25858e #23888e #238a8d #228d8d #218f8d #20928c #20938c #1f968b #1f988b "
+        "#1e9b8a #1e9d89 #1fa088 #1fa287 #20a486 #22a785 #23a983 #25ac82 #27ad81 "
+        "#2ab07f #2db27d #31b57b #34b679 #38b977 #3bbb75 #40bd72 #44bf70 #4ac16d "
+        "#50c46a #54c568 #5ac864 #5ec962 #65cb5e #69cd5b #70cf57 #75d054 #7cd250 "
+        "#81d34d #89d548 #8ed645 #95d840 #9bd93c #a2da37 #aadc32 #b0dd2f #b8de29 "
+        "#bddf26 #c5e021 #cae11f #d2e21b #d8e219 #dfe318 #e5e419 #ece51b #f1e51d "
+        "#f8e621"
+    ).split(),
+    "magma": (
+        "#010106 #02020b #03030f #050416 #06051a #090720 #0b0924 #0e0b2b #110c2f "
+        "#140e36 #160f3b #1a1042 #1d1147 #21114e #251255 #29115a #2d1161 #311165 "
+        "#36106b #390f6e #3f0f72 #420f75 #471078 #4a1079 #4f127b #52137c #57157e "
+        "#5a167e #5f187f #641a80 #671b80 #6b1d81 #6e1e81 #732081 #762181 #7b2382 "
+        "#7e2482 #832681 #862781 #8b2981 #8e2a81 #932b80 #962c80 #9b2e7f #a02f7f "
+        "#a3307e #a8327d #ab337c #b0357b #b3367a #b83779 #bc3978 #c03a76 #c43c75 "
+        "#c83e73 #cc3f71 #d0416f #d5446d #d8456c #dc4869 #df4a68 #e34e65 #e55064 "
+        "#e95462 #eb5760 #ee5b5e #f05f5e #f2645c #f4675c #f66c5c #f7705c #f8765c "
+        "#f97b5d #fa7f5e #fb8560 #fc8961 #fc8e64 #fd9266 #fd9869 #fd9b6b #fea16e "
+        "#fea571 #feaa74 #feae77 #feb47b #feb77e #febd82 #fec287 #fec68a #fecc8f "
+        "#fecf92 #fed597 #fed89a #fddea0 #fde2a3 #fde7a9 #fdebac #fcf0b2 #fcf4b6 "
+        "#fcf9bb"
+    ).split(),
+}
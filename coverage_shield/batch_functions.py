@@ -0,0 +1,332 @@
+# Load required libraries
+import argparse  # handling parsed command line arguments
+import asyncio  # running repositories concurrently
+import glob  # expanding directory patterns
+import json  # reading and writing result of each repository
+import os  # counting cores and building environment
+import sys  # getting python executable
+import tempfile  # storing result of each repository
+import time  # timing repositories
+from collections import deque  # keeping last line of output
+from pathlib import Path  # handling file paths
+from typing import NamedTuple  # storing results
+
+# Local imports
+import coverage_shield  # finding where coverage_shield is installed
+
+# Note where each repository's output is written (relative to repository)
+BATCH_LOG_PATH = Path(".coverage_shield", "batch.log")
+
+
+class RepositoryResult(NamedTuple):
+    """Result of running coverage_shield on a repository
+
+    status is "passed", "failing" (tests failed), or "error" (coverage_shield failed), coverage is the
+    percentage shown on the badge (e.g. "76.4%", None if not passed), and message is the last line of
+    error output (if coverage_shield failed).
+    """
+
+    directory: str
+    status: str
+    coverage: str
+    seconds: float
+    cached: bool
+    message: str
+
+
+def expand_directories(patterns: [str], base_directory: Path = Path(".")) -> [Path]:
+    """Expands directory paths and glob patterns (e.g. "packages/*") into directories
+
+    Args:
+        patterns ([str]): directory paths or glob patterns (relative to base directory)
+        base_directory (Path, optional): directory patterns are relative to. Defaults to Path(".").
+
+    Returns:
+        [Path]: unique directories found (in order of patterns, then sorted)
+    """
+
+    directories = {}
+    for pattern in patterns:
+        for path in sorted(
+            glob.glob(str(Path(base_directory, pattern)), recursive=True)
+        ):
+            if Path(path).is_dir():
+                directories.setdefault(Path(path).resolve(), None)
+
+    return list(directories)
+
+
+def build_repository_arguments(args: argparse.Namespace) -> [str]:
+    """Builds command line arguments to run coverage_shield on each repository of batch
+
+    Options that apply to each repository (e.g. tester and engine) are passed on, batch and directory
+    options aren't.
+
+    Args:
+        args (argparse.Namespace): parsed command line arguments
+
+    Returns:
+        [str]: command line arguments for coverage_shield
+    """
+
+    arguments = [
+        "--readme",
+        args.readme,
+        "--tester",
+        args.tester,
+        "--engine",
+        args.engine,
+        "--jobs",
+        str(args.jobs),
+        "--tail_lines",
+        str(args.tail_lines),
+    ]
+    if args.profile_tests is not None:
+        arguments += ["--profile_tests", str(args.profile_tests)]
+    if args.incremental is not None:
+        arguments += ["--incremental"] + (
+            [] if args.incremental == "" else [args.incremental]
+        )
+    if args.combine is not None:
+        arguments += ["--combine", args.combine]
+    if args.reduce_tests is not None:
+        arguments += ["--reduce_tests", args.reduce_tests]
+    if args.diff_coverage is not None:
+        arguments += ["--diff_coverage", args.diff_coverage]
+    if args.core is not None:
+        arguments += ["--core", args.core]
+    if args.metrics is not None:
+        arguments += ["--metrics", args.metrics]
+    if args.test_log is not None:
+        arguments += ["--test_log", args.test_log]
+    if args.history is not None:
+        arguments += ["--history", args.history]
+    if args.trend_badge is not None:
+        arguments += ["--trend_badge", str(args.trend_badge)]
+    if args.history_report is not None:
+        arguments += ["--history_report", str(args.history_report)]
+    if args.badge_targets is not None:
+        arguments += ["--badge_targets", *args.badge_targets]
+    if args.local_badges is not None:
+        arguments += ["--local_badges", args.local_badges]
+    for flag in [
+        "reduced",
+        "overhead",
+        "stream",
+        "metrics_summary",
+        "no_cache",
+        "git_push",
+        "wait_for_push",
+    ]:
+        if getattr(args, flag):
+            arguments.append(f"--{flag}")
+
+    return arguments
+
+
+def write_repository_result(run_result: dict, result_path: Path):
+    """Writes result of running coverage_shield on a repository to json file (read by batch)
+
+    Args:
+        run_result (dict): total statements ("statements") and missed statements ("missed") (None if
+            tests failed), and whether the cached result was used ("cached")
+        result_path (Path): path to file
+    """
+
+    result_path.parent.mkdir(parents=True, exist_ok=True)
+    with open(result_path, "w") as file:
+        json.dump(
+            {
+                "passed": run_result["statements"] is not None,
+                "statements": run_result["statements"],
+                "missed": run_result["missed"],
+                "cached": run_result["cached"],
+            },
+            file,
+        )
+
+
+def read_repository_result(result_path: Path) -> tuple[str, str, bool] | None:
+    """Reads result of running coverage_shield on a repository from json file
+
+    Args:
+        result_path (Path): path to file (see write_repository_result())
+
+    Returns:
+        tuple[str, str, bool] | None: status ("passed" or "failing"), coverage shown on badge (e.g.
+            "76.4%", None if failing), and whether cached result used, or None if file doesn't exist
+    """
+
+    if not result_path.is_file():
+        return None
+    with open(result_path) as file:
+        result = json.load(file)
+    if not result["passed"]:
+        return "failing", None, result["cached"]
+
+    from coverage_shield import api_functions  # rounding as on badge (imports coverage)
+    from coverage_shield.coverage_data_functions import CoverageRecord
+
+    coverage_percentage = api_functions.calculate_coverage_percentage(
+        CoverageRecord("TOTAL", result["statements"], result["missed"], 0, 0)
+    )
+
+    return "passed", f"{coverage_percentage}%", result["cached"]
+
+
+async def run_repository(
+    directory: Path,
+    arguments: [str],
+    semaphore: asyncio.Semaphore,
+) -> RepositoryResult:
+    """Runs coverage_shield on repository in a separate process (in the repository directory)
+
+    The process writes its result to a temporary json file (see write_repository_result()) and its
+    output (e.g. test progress and --history_report) to BATCH_LOG_PATH in the repository, so it isn't
+    held in memory.
+
+    Args:
+        directory (Path): repository directory
+        arguments ([str]): command line arguments (see build_repository_arguments())
+        semaphore (asyncio.Semaphore): limits number of repositories run at once
+
+    Returns:
+        RepositoryResult: result of run
+    """
+
+    # Make sure coverage_shield can be imported from the repository directory
+    environment = os.environ.copy()
+    environment["PYTHONPATH"] = os.pathsep.join(
+        filter(
+            None,
+            [
+                str(Path(coverage_shield.__file__).parent.parent),
+                environment.get("PYTHONPATH"),
+            ],
+        )
+    )
+
+    # Note where to write the output of the run
+    log_path = Path(directory, BATCH_LOG_PATH)
+    log_path.parent.mkdir(parents=True, exist_ok=True)
+
+    with tempfile.TemporaryDirectory() as temporary_directory:
+        result_path = Path(temporary_directory, "result.json")
+        async with semaphore:
+            with open(log_path, "wb") as log_file:
+                start_time = time.perf_counter()
+                process = await asyncio.create_subprocess_exec(
+                    sys.executable,
+                    "-m",
+                    "coverage_shield",
+                    *arguments,
+                    "--result",
+                    str(result_path),
+                    cwd=directory,
+                    env=environment,
+                    stdout=log_file,
+                    stderr=asyncio.subprocess.STDOUT,
+                )
+                await process.wait()
+                seconds = time.perf_counter() - start_time
+        result = read_repository_result(result_path)
+
+    # Check the result
+    if process.returncode != 0 or result is None:
+        with open(log_path, errors="replace") as file:
+            last_lines = deque(
+                (line.strip() for line in file if line.strip() != ""), maxlen=1
+            )
+        message = last_lines[0] if len(last_lines) > 0 else ""
+        if process.returncode == 0:
+            message = "coverage_shield didn't write a result"
+        return RepositoryResult(str(directory), "error", None, seconds, False, message)
+    status, coverage, cached = result
+
+    return RepositoryResult(str(directory), status, coverage, seconds, cached, "")
+
+
+async def run_repositories(
+    directories: [Path], arguments: [str], concurrency: int
+) -> [RepositoryResult]:
+    """Runs coverage_shield on repositories concurrently, printing each result as it finishes
+
+    Args:
+        directories ([Path]): repository directories
+        arguments ([str]): command line arguments (see build_repository_arguments())
+        concurrency (int): maximum number of repositories run at once
+
+    Returns:
+        [RepositoryResult]: result of each repository (in order of directories)
+    """
+
+    semaphore = asyncio.Semaphore(concurrency)
+    tasks = [
+        asyncio.ensure_future(run_repository(directory, arguments, semaphore))
+        for directory in directories
+    ]
+    for n_finished, task in enumerate(asyncio.as_completed(tasks), start=1):
+        result = await task
+        print(
+            f"[{n_finished}/{len(tasks)}] {result.directory}: {result.coverage or result.status} ({result.seconds:.1f}s)"
+        )
+
+    return [task.result() for task in tasks]
+
+
+def run_batch(
+    directories: [Path],
+    arguments: [str],
+    concurrency: int = 0,
+) -> [RepositoryResult]:
+    """Runs coverage_shield on each repository, several at once, without changing directory
+
+    Args:
+        directories ([Path]): repository directories
+        arguments ([str]): command line arguments (see build_repository_arguments())
+        concurrency (int, optional): maximum number of repositories run at once. Uses number of cores if 0.
+            Defaults to 0.
+
+    Returns:
+        [RepositoryResult]: result of each repository (in order of directories)
+    """
+
+    concurrency = os.cpu_count() if concurrency == 0 else concurrency
+
+    return asyncio.run(run_repositories(directories, arguments, concurrency))
+
+
+def format_batch_summary(results: [RepositoryResult], wall_seconds: float) -> str:
+    """Formats table summarising results of each repository and totals
+
+    Args:
+        results ([RepositoryResult]): result of each repository
+        wall_seconds (float): time taken by whole batch
+
+    Returns:
+        str: summary table
+    """
+
+    # Build a row for each repository
+    width = max([len("Repository")] + [len(result.directory) for result in results])
+    rows = [f"{'Repository':<{width}}  {'Status':<15}  {'Coverage':>8}  {'Seconds':>7}"]
+    for result in results:
+        status = f"{result.status}{' (cached)' if result.cached else ''}"
+        rows.append(
+            f"{result.directory:<{width}}  {status:<15}  {result.coverage or '-':>8}  {result.seconds:>7.1f}"
+        )
+        if result.message != "":
+            rows.append(f"{'':<{width}}  {result.message}")
+
+    # Add totals
+    n_statuses = {
+        status: sum(result.status == status for result in results)
+        for status in ["passed", "failing", "error"]
+    }
+    total_seconds = sum(result.seconds for result in results)
+    rows.append(
+        f"{len(results)} repositories: {n_statuses['passed']} passed, {n_statuses['failing']} failing, "
+        f"{n_statuses['error']} errors in {wall_seconds:.1f}s ({total_seconds:.1f}s of runs)"
+    )
+
+    return "\n".join(rows)
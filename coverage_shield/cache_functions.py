@@ -0,0 +1,298 @@
+# Load required libraries
+import fnmatch  # matching test file names
+import hashlib  # hashing file contents
+import json  # reading and writing cached results
+import os  # updating file access times and listing installed packages
+import sys  # getting python version
+import subprocess  # catching git command errors
+from pathlib import Path  # handling file paths
+
+# Local imports
+from coverage_shield import git_functions
+
+# Increment if format (or meaning) of cached results changes
+CACHE_FORMAT_VERSION = 4
+
+# Note files coverage reads its configuration from
+COVERAGE_CONFIG_FILES = [".coveragerc", "setup.cfg", "pyproject.toml", "tox.ini"]
+
+
+def list_unignored_files(directory: Path, pathspecs: [str]) -> [Path]:
+    """Lists files (tracked or untracked but not ignored by git) matching git pathspecs
+
+    Args:
+        directory (Path): directory of git repository
+        pathspecs ([str]): git pathspecs (e.g. "*.py" or "tests")
+
+    Raises:
+        subprocess.CalledProcessError: if directory isn't a git repository
+        FileNotFoundError: if git isn't installed
+
+    Returns:
+        [Path]: paths to files
+    """
+
+    command_result = git_functions.send_command(
+        "git",
+        "ls-files",
+        "--cached",
+        "--others",
+        "--exclude-standard",
+        "-z",
+        "--",
+        *pathspecs,
+        capture_output=True,
+        text=True,
+        cwd=directory,
+    )
+
+    return [
+        Path(directory, file_path)
+        for file_path in command_result.stdout.split("\0")
+        if file_path != ""
+    ]
+
+
+def get_source_files(directory: Path = Path(".")) -> [Path]:
+    """Gets python files (tracked or untracked but not ignored by git) and .covignore in directory
+
+    Falls back to finding all python files outside hidden directories if directory isn't a git repo.
+
+    Args:
+        directory (Path, optional): directory to search. Defaults to Path(".").
+
+    Returns:
+        [Path]: sorted paths to files
+    """
+
+    try:
+        # Ask git for tracked and untracked (but not ignored) files
+        file_paths = list_unignored_files(directory, ["*.py", ".covignore"])
+
+    except (subprocess.CalledProcessError, FileNotFoundError):
+        # Find files without git
+        file_paths = [
+            file_path
+            for file_path in [*directory.rglob("*.py"), Path(directory, ".covignore")]
+            if not any(
+                part.startswith(".") and part != ".covignore"
+                for part in file_path.relative_to(directory).parts
+            )
+        ]
+
+    # Keep files that exist (tracked files can be deleted)
+    return sorted({file_path for file_path in file_paths if file_path.is_file()})
+
+
+def get_test_fixture_files(source_files: [Path], directory: Path = Path(".")) -> [Path]:
+    """Gets non-python files in the top level directories containing test files (e.g. tests/data/)
+
+    Files are found as for get_source_files(). Test files at the top of directory are skipped, so
+    files like the README (which coverage_shield updates) aren't included.
+
+    Args:
+        source_files ([Path]): paths to python files (see get_source_files())
+        directory (Path, optional): directory containing source files. Defaults to Path(".").
+
+    Returns:
+        [Path]: sorted paths to files
+    """
+
+    # Find top level directories containing test files (the names unittest and pytest discover)
+    test_directories = sorted(
+        {
+            file_path.relative_to(directory).parts[0]
+            for file_path in source_files
+            if len(file_path.relative_to(directory).parts) > 1
+            and any(
+                fnmatch.fnmatch(file_path.name, file_pattern)
+                for file_pattern in ["test*.py", "*_test.py"]
+            )
+        }
+    )
+    if len(test_directories) == 0:
+        return []
+
+    try:
+        # Ask git for tracked and untracked (but not ignored) files
+        file_paths = list_unignored_files(directory, test_directories)
+
+    except (subprocess.CalledProcessError, FileNotFoundError):
+        # Find files without git
+        file_paths = [
+            file_path
+            for test_directory in test_directories
+            for file_path in Path(directory, test_directory).rglob("*")
+            if not any(
+                part.startswith(".") for part in file_path.relative_to(directory).parts
+            )
+        ]
+
+    return sorted(
+        {
+            file_path
+            for file_path in file_paths
+            if file_path.suffix != ".py"
+            and file_path.is_file()
+            and "__pycache__" not in file_path.parts
+        }
+    )
+
+
+def get_coverage_config_files(directory: Path = Path(".")) -> [Path]:
+    """Gets coverage configuration files in directory (and the file COVERAGE_RCFILE points to)
+
+    Args:
+        directory (Path, optional): directory to search. Defaults to Path(".").
+
+    Returns:
+        [Path]: paths to configuration files that exist
+    """
+
+    file_paths = [Path(directory, file_name) for file_name in COVERAGE_CONFIG_FILES]
+    if os.environ.get("COVERAGE_RCFILE"):
+        file_paths.append(Path(directory, os.environ["COVERAGE_RCFILE"]))
+
+    return [file_path for file_path in file_paths if file_path.is_file()]
+
+
+def hash_file(file_path: Path) -> str:
+    """Hashes contents of file
+
+    Args:
+        file_path (Path): path to file
+
+    Returns:
+        str: hexadecimal sha256 hash
+    """
+
+    with open(file_path, "rb") as file:
+        return hashlib.file_digest(file, "sha256").hexdigest()
+
+
+def get_installed_packages() -> [str]:
+    """Gets names of installed package metadata directories (e.g. coverage-7.4.0.dist-info)
+
+    The directory names include the package versions, so reading them avoids parsing the metadata
+    of every installed package (slow when many packages are installed).
+
+    Returns:
+        [str]: sorted names of metadata directories found on python path
+    """
+
+    package_directories = set()
+    for path in sys.path:
+        try:
+            with os.scandir(path or ".") as entries:
+                package_directories.update(
+                    entry.name
+                    for entry in entries
+                    if entry.name.endswith((".dist-info", ".egg-info"))
+                )
+        except OSError:  # not a directory (e.g. zip file) or doesn't exist
+            continue
+
+    return sorted(package_directories)
+
+
+def build_cache_key(directory: Path = Path("."), run_options: [str] = ()) -> str:
+    """Builds key for cached results from hash of source files, python version, and package versions
+
+    The source files include the python files, .covignore, coverage configuration files (see
+    get_coverage_config_files()), and test fixtures (see get_test_fixture_files()).
+
+    Args:
+        directory (Path, optional): directory containing source files. Defaults to Path(".").
+        run_options ([str], optional): options that change the coverage result (e.g. tester). Defaults to ().
+
+    Returns:
+        str: hexadecimal hash
+    """
+
+    cache_hash = hashlib.sha256()
+
+    # Add cache format, python version, run options, and coverage environment variables
+    cache_hash.update(f"{CACHE_FORMAT_VERSION}\0{sys.version}\0".encode())
+    cache_hash.update("\0".join(run_options).encode())
+    for variable in ["COVERAGE_CORE", "COVERAGE_RCFILE"]:
+        cache_hash.update(f"\0{variable}={os.environ.get(variable, '')}".encode())
+
+    # Add installed package versions
+    cache_hash.update("\0".join(get_installed_packages()).encode())
+
+    # Add file paths and contents
+    source_files = get_source_files(directory)
+    for file_path in [
+        *source_files,
+        *get_test_fixture_files(source_files, directory),
+        *get_coverage_config_files(directory),
+    ]:
+        file_name = (
+            file_path.relative_to(directory).as_posix()
+            if file_path.is_relative_to(directory)
+            else str(file_path.resolve())
+        )
+        cache_hash.update(f"\0{file_name}\0".encode())
+        cache_hash.update(hash_file(file_path).encode())
+
+    return cache_hash.hexdigest()
+
+
+def load_cached_result(
+    cache_key: str, cache_directory: Path = Path(".coverage_shield", "cache")
+) -> dict:
+    """Loads cached coverage result
+
+    Args:
+        cache_key (str): key for cached result (see build_cache_key())
+        cache_directory (Path, optional): directory storing cached results. Defaults to
+            Path(".coverage_shield", "cache").
+
+    Returns:
+        dict: cached result (None if not cached)
+    """
+
+    # Check if result cached
+    cache_path = Path(cache_directory, f"{cache_key}.json")
+    if not cache_path.is_file():
+        return None
+
+    # Read in result
+    with open(cache_path) as file:
+        cached_result = json.load(file)
+
+    # Mark as recently used (so evicted last)
+    os.utime(cache_path)
+
+    return cached_result
+
+
+def store_cached_result(
+    cache_key: str,
+    result: dict,
+    cache_directory: Path = Path(".coverage_shield", "cache"),
+    max_entries: int = 20,
+):
+    """Stores coverage result in cache, evicting least recently used results if cache full
+
+    Args:
+        cache_key (str): key for cached result (see build_cache_key())
+        result (dict): coverage result (e.g. totals and badge url)
+        cache_directory (Path, optional): directory storing cached results. Defaults to
+            Path(".coverage_shield", "cache").
+        max_entries (int, optional): maximum number of results to keep. Defaults to 20.
+    """
+
+    # Write result to cache
+    cache_directory.mkdir(parents=True, exist_ok=True)
+    with open(Path(cache_directory, f"{cache_key}.json"), "w") as file:
+        json.dump(result, file)
+
+    # Remove least recently used results beyond limit
+    cache_paths = sorted(
+        cache_directory.glob("*.json"),
+        key=lambda cache_path: cache_path.stat().st_mtime,
+        reverse=True,
+    )
+    for cache_path in cache_paths[max_entries:]:
+        cache_path.unlink(missing_ok=True)
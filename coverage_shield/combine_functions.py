@@ -0,0 +1,162 @@
+# Load required libraries
+from __future__ import annotations  # type hints not evaluated (lazy imports)
+import os  # counting cores and file sizes
+import tempfile  # storing partly merged data files
+import warnings  # send warnings
+from pathlib import Path  # handling file paths
+from concurrent.futures import (
+    ProcessPoolExecutor,
+)  # merging groups of data files in parallel
+from typing import TYPE_CHECKING, Iterator  # type hints
+import coverage  # combining coverage data
+
+if TYPE_CHECKING:
+    import pandas as pd  # working with dataframes
+
+# Local imports
+from coverage_shield import unittest_coverage_functions
+from coverage_shield import parallel_coverage_functions
+from coverage_shield import metrics_functions
+from coverage_shield.coverage_data_functions import CoverageRecord
+
+
+def find_data_files(
+    data_directory: Path, output_path: Path = Path(".coverage")
+) -> [Path]:
+    """Finds coverage data files (named .coverage or .coverage.<suffix>, as coverage run writes them)
+    in directory and its subdirectories
+
+    Args:
+        data_directory (Path): directory containing data files (e.g. downloaded CI artifacts)
+        output_path (Path, optional): combined data file, left out if found. Defaults to Path(".coverage").
+
+    Returns:
+        [Path]: data file paths (sorted)
+    """
+
+    output_path = output_path.resolve()
+    return sorted(
+        file_path
+        for file_path in data_directory.rglob(".coverage*")
+        if (file_path.name == ".coverage" or file_path.name.startswith(".coverage."))
+        and file_path.is_file()
+        and file_path.resolve() != output_path
+    )
+
+
+def merge_data_files(data_paths: [Path], output_path: Path):
+    """Merges coverage data files into one (run in worker processes)
+
+    File paths are remapped using the [paths] section of the coverage configuration (e.g. .coveragerc),
+    as coverage combine does.
+
+    Args:
+        data_paths ([Path]): data files to merge (kept)
+        output_path (Path): merged data file (replaced if it exists)
+    """
+
+    coverage_object = coverage.Coverage(data_file=str(output_path))
+    coverage_object.combine(
+        [str(data_path) for data_path in data_paths], strict=True, keep=True
+    )
+    coverage_object.save()
+
+
+def combine_data_files(
+    data_paths: [Path], output_path: Path = Path(".coverage"), jobs: int = 0
+) -> coverage.Coverage:
+    """Combines coverage data files by merging groups of files in parallel, then merging the merged
+    files, until one is left (a tree reduction)
+
+    In the first round each process merges a group of files with similar total size, so the time
+    taken grows with the number of files per process and the number of rounds (which grows with the
+    logarithm of the number of processes) rather than the number of files.
+
+    Args:
+        data_paths ([Path]): data files to combine (kept)
+        output_path (Path, optional): combined data file. Defaults to Path(".coverage").
+        jobs (int, optional): number of processes to merge with. Uses all cores if 0. Defaults to 0.
+
+    Returns:
+        coverage.Coverage: coverage object holding combined data
+    """
+
+    # Note number of jobs
+    jobs = os.cpu_count() if jobs == 0 else jobs
+
+    with tempfile.TemporaryDirectory() as temporary_directory, ProcessPoolExecutor(
+        max_workers=jobs
+    ) as executor:
+
+        # Merge groups of files (halving the number of groups each round) until two or fewer groups
+        merge_round = 0
+        while min(jobs, len(data_paths) // 2) > 1:
+            groups = parallel_coverage_functions.split_into_shards(
+                data_paths,
+                [os.path.getsize(data_path) for data_path in data_paths],
+                min(jobs, len(data_paths) // 2),
+            )
+            merged_paths = [
+                Path(temporary_directory, f"round{merge_round}.{index}")
+                for index in range(len(groups))
+            ]
+            list(executor.map(merge_data_files, groups, merged_paths))
+
+            # Remove files merged in the previous round
+            if merge_round > 0:
+                for data_path in data_paths:
+                    data_path.unlink()
+            data_paths = merged_paths
+            merge_round += 1
+
+        # Merge the remaining files
+        merge_data_files(data_paths, output_path)
+
+    coverage_object = coverage.Coverage(data_file=str(output_path))
+    coverage_object.load()
+
+    return coverage_object
+
+
+def run_combined_code_coverage(
+    data_directory: Path,
+    jobs: int = 0,
+    stream: bool = False,
+) -> pd.DataFrame | Iterator[CoverageRecord]:
+    """Combines coverage data files (e.g. from each job of a CI matrix) and returns report
+
+    The combined data are saved in .coverage (as coverage combine would) and files ignored by
+    .covignore left out of the report.
+
+    Will send warning if no data files are found (or can't be combined) and return empty report
+
+    Args:
+        data_directory (Path): directory containing data files (see find_data_files())
+        jobs (int, optional): number of processes to merge with. Uses all cores if 0. Defaults to 0.
+        stream (bool, optional): whether to return report as streamed records instead of dataframe.
+            Defaults to False.
+
+    Returns:
+        pd.DataFrame | Iterator[CoverageRecord]: coverage report as dataframe (or records) if data
+            combined; empty report otherwise
+    """
+
+    # Find the data files
+    data_paths = find_data_files(data_directory)
+    if len(data_paths) == 0:
+        warnings.warn(f"No coverage data files found in {data_directory}!")
+        return unittest_coverage_functions.build_empty_report(stream)
+
+    # Combine the data files
+    with metrics_functions.record_phase("combine_coverage_data"):
+        try:
+            coverage_object = combine_data_files(data_paths, jobs=jobs)
+        except coverage.exceptions.CoverageException as error:
+            warnings.warn(f"Combining coverage data files failed! {error}")
+            return unittest_coverage_functions.build_empty_report(stream)
+
+    return unittest_coverage_functions.build_coverage_report(
+        coverage_object,
+        unittest_coverage_functions.load_patterns_to_ignore_in_coverage(),
+        stream,
+    )
@@ -4,10 +4,15 @@ from pathlib import Path  # handling file paths
 from datetime import datetime  # working with dates and times
 import sys  # accessing command line arguments
 import os  # Change directory
+import time  # timing coverage run
+import tempfile  # storing test durations temporarily
+import warnings  # send warnings
 
 # Local imports
-from coverage_shield import unittest_coverage_functions
+# (modules that run coverage are imported when needed so --help and cached runs start quickly)
 from coverage_shield import git_functions
+from coverage_shield import cache_functions
+from coverage_shield import metrics_functions
 
 
 def build_command_line_interface() -> argparse.ArgumentParser:
@@ -16,6 +21,24 @@ def build_command_line_interface() -> argparse.ArgumentParser:
     Adds the following arguments:
     - Target directory: -d/--directory
     - Target README: -r/--readme
+    - Other documentation files: --badge_targets
+    - Unit test package: -t/--tester
+    - Coverage engine: -e/--engine
+    - Parallel processes: -j/--jobs
+    - Profile tests: -p/--profile_tests
+    - Only run tests impacted by changes: -i/--incremental
+    - Reduced test suite: --reduce_tests and --reduced
+    - Combine coverage data files: --combine
+    - Diff coverage badge: --diff_coverage
+    - Measurement core and its overhead: --core and --overhead
+    - Stream coverage report: -s/--stream
+    - Watch for changes: -w/--watch
+    - Record phase metrics: --metrics and --metrics_summary
+    - Coverage history: --history, --trend_badge, and --history_report
+    - Run on many repositories: -b/--batch, --concurrency, and --result
+    - Test output: --test_log and --tail_lines
+    - Render badges locally: --local_badges
+    - Ignore cached results: -n/--no_cache
     - Push changes: -g/--git_push
 
     Returns:
@@ -51,6 +74,14 @@ def build_command_line_interface() -> argparse.ArgumentParser:
         type=str,
         help="Provide path to README.md relative to directory provided.",
     )
+    parser.add_argument(
+        "--badge_targets",
+        nargs="+",  # Accept 1 or more arguments
+        default=None,  # Default value
+        metavar="target_path",
+        type=str,
+        help="Provide paths (or glob patterns, e.g. 'packages/*/README.md') relative to directory provided of other documentation files to update badges in (as well as README). Badges in .rst files are written as reStructuredText substitutions.",
+    )
     parser.add_argument(
         "-t",
         "--tester",
@@ -58,13 +89,218 @@ def build_command_line_interface() -> argparse.ArgumentParser:
         default="unittest",  # Default value
         metavar="tester",
         type=str,
-        help="Provide name of unit test python package you want to use. Accepts either \"unittest\" or \"pytest\"",
+        help='Provide name of unit test python package you want to use. Accepts either "unittest" or "pytest"',
+    )
+    parser.add_argument(
+        "-e",
+        "--engine",
+        nargs="?",  # Accept 0 or 1 arguments
+        default="api",  # Default value
+        metavar="engine",
+        type=str,
+        help='Provide how to run coverage. Accepts either "api" (run tests in current process - faster) or "subprocess" (run tests in separate process - isolated), or "fork" (import dependencies once then run tests in forked processes - isolated and quick to start, not on Windows)',
+    )
+    parser.add_argument(
+        "-j",
+        "--jobs",
+        nargs="?",  # Accept 0 or 1 arguments
+        default=None,  # Default value
+        metavar="jobs",
+        type=int,
+        help="Provide number of processes to split test modules across (combining their coverage data), or to merge data files with when using --combine. Use 0 for all cores (1 if not provided, or all cores with --combine).",
+    )
+    parser.add_argument(
+        "-p",
+        "--profile_tests",
+        nargs="?",  # Accept 0 or 1 arguments
+        const=10,  # Value if flag given without argument
+        default=None,  # Default value
+        metavar="n_tests",
+        type=int,
+        help="Record the duration of each test and report the slowest n_tests (10 if not provided), compared to previous profiled run.",
+    )
+    parser.add_argument(
+        "-i",
+        "--incremental",
+        nargs="?",  # Accept 0 or 1 arguments
+        const="",  # Value if flag given without argument
+        default=None,  # Default value
+        metavar="base_ref",
+        type=str,
+        help="Only run tests that run files changed since the stored baseline was recorded (also files changed since git reference base_ref, if provided) and merge their coverage into the baseline. Tests run in current process.",
+    )
+    parser.add_argument(
+        "--reduce_tests",
+        nargs="?",  # Accept 0 or 1 arguments
+        const="greedy",  # Value if flag given without argument
+        default=None,  # Default value
+        metavar="mode",
+        choices=["greedy", "exact"],
+        type=str,
+        help="Record the lines run and duration of each test, then select the quickest tests that run the same lines (greedy if mode not provided; exact for the quickest selection in suites of up to 25 tests) and check their coverage matches. Tests run in current process.",
+    )
+    parser.add_argument(
+        "--reduced",
+        action="store_true",
+        help="Only run the tests selected by --reduce_tests, reporting the time saved and whether coverage matches the full test suite.",
+    )
+    parser.add_argument(
+        "--combine",
+        nargs="?",  # Accept 0 or 1 arguments
+        const=".",  # Value if flag given without argument
+        default=None,  # Default value
+        metavar="data_directory",
+        type=str,
+        help="Don't run the tests, instead combine the coverage data files (.coverage and .coverage.*, e.g. from each CI job) found in data_directory (relative to directory provided, directory provided if not provided) into .coverage, merging groups of files in parallel across -j/--jobs processes (use 0 for all cores). Results aren't cached.",
+    )
+    parser.add_argument(
+        "--diff_coverage",
+        nargs="?",  # Accept 0 or 1 arguments
+        const="HEAD",  # Value if flag given without argument
+        default=None,  # Default value
+        metavar="base_ref",
+        type=str,
+        help="Also add a badge (![Diff Coverage](...)) for coverage of lines changed since git reference base_ref (HEAD if not provided).",
+    )
+    parser.add_argument(
+        "--core",
+        nargs="?",  # Accept 0 or 1 arguments
+        const="auto",  # Value if flag given without argument
+        default=None,  # Default value
+        metavar="core",
+        choices=["auto", "sysmon", "ctrace", "pytrace"],
+        type=str,
+        help="Choose the core coverage measures with: sysmon (sys.monitoring, python 3.12+), ctrace (C tracer), pytrace (python tracer), or auto for the fastest available (auto if core not provided). Coverage's default core used if not given.",
+    )
+    parser.add_argument(
+        "--overhead",
+        action="store_true",
+        help="Also run the tests without coverage and report how much slower they were with coverage (the tracing overhead). Results aren't cached.",
+    )
+    parser.add_argument(
+        "-s",
+        "--stream",
+        action="store_true",
+        help="Sum the coverage report one file at a time without building a table of all files (uses less memory for very large repositories).",
+    )
+    parser.add_argument(
+        "-w",
+        "--watch",
+        nargs="?",  # Accept 0 or 1 arguments
+        const=0.1,  # Value if flag given without argument
+        default=None,  # Default value
+        metavar="debounce",
+        type=float,
+        help="Keep running, rerunning the tests affected by saved changes (once no changes for debounce seconds, 0.1 if not provided) and updating the badges in README (and --badge_targets). Tests run in current process, so options for how tests run, or what happens after a run, can't be used.",
+    )
+    parser.add_argument(
+        "--metrics",
+        nargs="?",  # Accept 0 or 1 arguments
+        const=".coverage_shield/metrics.json",  # Value if flag given without argument
+        default=None,  # Default value
+        metavar="metrics_path",
+        type=str,
+        help="Write wall time, cpu time, and peak memory (including test processes) of each phase of the run to json file metrics_path (relative to directory provided, .coverage_shield/metrics.json if not provided).",
+    )
+    parser.add_argument(
+        "--metrics_summary",
+        action="store_true",
+        help="Print a summary line of the time taken by each phase of the run.",
+    )
+    parser.add_argument(
+        "--history",
+        nargs="?",  # Accept 0 or 1 arguments
+        const=".coverage_shield/history.sqlite3",  # Value if flag given without argument
+        default=None,  # Default value
+        metavar="history_path",
+        type=str,
+        help="Record the coverage (total and per file) of the current commit in SQLite database history_path (relative to directory provided, .coverage_shield/history.sqlite3 if not provided). Cached runs aren't recorded.",
+    )
+    parser.add_argument(
+        "--trend_badge",
+        nargs="?",  # Accept 0 or 1 arguments
+        const=20,  # Value if flag given without argument
+        default=None,  # Default value
+        metavar="n_commits",
+        type=int,
+        help="Add a Coverage Trend badge showing a sparkline of the coverage of the last n_commits commits recorded with --history (20 if not provided).",
+    )
+    parser.add_argument(
+        "--history_report",
+        nargs="?",  # Accept 0 or 1 arguments
+        const=10,  # Value if flag given without argument
+        default=None,  # Default value
+        metavar="n_commits",
+        type=int,
+        help="Print the coverage of the last n_commits commits recorded with --history (10 if not provided), drops in coverage, and files whose coverage changed since the previous commit.",
+    )
+    parser.add_argument(
+        "-b",
+        "--batch",
+        nargs="+",  # Accept 1 or more arguments
+        default=None,  # Default value
+        metavar="repository",
+        type=str,
+        help="Run on each repository directory (or glob pattern, e.g. 'packages/*') relative to directory provided, several at once in separate processes, and print a summary. Other options are used for every repository.",
+    )
+    parser.add_argument(
+        "--concurrency",
+        nargs="?",  # Accept 0 or 1 arguments
+        default=0,  # Default value
+        metavar="n_repositories",
+        type=int,
+        help="Provide maximum number of repositories to run at once with -b/--batch. Use 0 for number of cores.",
+    )
+    parser.add_argument(
+        "--result",
+        nargs="?",  # Accept 0 or 1 arguments
+        const=".coverage_shield/result.json",  # Value if flag given without argument
+        default=None,  # Default value
+        metavar="result_path",
+        type=str,
+        help="Write whether the tests passed, the total and missed statements, and whether the cached result was used to json file result_path (relative to directory provided, .coverage_shield/result.json if not provided). Used by -b/--batch to collect the result of each repository.",
+    )
+    parser.add_argument(
+        "--test_log",
+        nargs="?",  # Accept 0 or 1 arguments
+        default=None,  # Default value
+        metavar="log_path",
+        type=str,
+        help="Write the output of the tests (as they run) to log file log_path (relative to directory provided) instead of the console.",
+    )
+    parser.add_argument(
+        "--tail_lines",
+        nargs="?",  # Accept 0 or 1 arguments
+        default=20,  # Default value
+        metavar="n_lines",
+        type=int,
+        help="Provide number of last lines of test output to show if tests run in separate processes fail.",
+    )
+    parser.add_argument(
+        "--local_badges",
+        nargs="?",  # Accept 0 or 1 arguments
+        default=None,  # Default value
+        const="badges",  # Value if flag given without a directory
+        metavar="badge_directory",
+        type=str,
+        help="Render the badges as SVG files in badge_directory (relative to directory provided, badges if not provided) and link them in README, so shields.io isn't needed to show them.",
+    )
+    parser.add_argument(
+        "-n",
+        "--no_cache",
+        action="store_true",
+        help="Always run the tests, rather than reusing the cached coverage result when no python files, .covignore, coverage configuration, test fixtures, or package versions have changed.",
     )
     parser.add_argument(
         "-g",
         "--git_push",
         action="store_true",
-        help="Stage, commit, and push the updated README file (-r/--readme) using git.",
+        help="Stage and commit the updated README file (-r/--readme) using git, then push in the background (retrying if the push fails, logged in .coverage_shield/git_push.log).",
+    )
+    parser.add_argument(
+        "--wait_for_push",
+        action="store_true",
+        help="With -g/--git_push, wait for the push to finish before exiting (e.g. in CI jobs that stop leftover processes).",
     )
 
     return parser
@@ -89,34 +325,390 @@ def parse_command_line_arguments(
     # Get arguments
     args = parser.parse_args(arguments)
 
+    # Use all cores to merge data files (and a single process to run tests) if number of jobs not provided
+    if args.jobs is None:
+        args.jobs = 0 if args.combine is not None else 1
+
+    # Check options watch mode can't use (tests run in current process and only badges are updated)
+    if args.watch is not None:
+        incompatible_options = [
+            option
+            for option, used in {
+                "-e/--engine": args.engine != "api",
+                "-j/--jobs": args.jobs != 1,
+                "-p/--profile_tests": args.profile_tests is not None,
+                "-i/--incremental": args.incremental is not None,
+                "--reduce_tests": args.reduce_tests is not None,
+                "--reduced": args.reduced,
+                "--combine": args.combine is not None,
+                "--overhead": args.overhead,
+                "--metrics": args.metrics is not None,
+                "--metrics_summary": args.metrics_summary,
+                "--history": args.history is not None,
+                "--trend_badge": args.trend_badge is not None,
+                "--history_report": args.history_report is not None,
+                "-b/--batch": args.batch is not None,
+                "--result": args.result is not None,
+                "--test_log": args.test_log is not None,
+                "-g/--git_push": args.git_push,
+            }.items()
+            if used
+        ]
+        if len(incompatible_options) > 0:
+            parser.error(
+                f"-w/--watch can't be used with {', '.join(incompatible_options)}"
+            )
+
     # Check if running unittests
     if not testing:
 
-        # Set target directory
+        # Check if running on many repositories (each in its own process, so not changing directory)
+        if args.batch is not None:
+            from coverage_shield import batch_functions
+
+            start_time = time.perf_counter()
+            results = batch_functions.run_batch(
+                batch_functions.expand_directories(args.batch, Path(args.directory)),
+                batch_functions.build_repository_arguments(args),
+                args.concurrency,
+            )
+            print(
+                batch_functions.format_batch_summary(
+                    results, time.perf_counter() - start_time
+                )
+            )
+            return
+
+        # Set target directory (noting README path first as it's relative to original directory)
+        readme_path = Path(args.directory, args.readme).resolve()
         os.chdir(args.directory)
 
-        # Run coverage package (which runs unit tests and generates report)
-        coverage_dataframe = unittest_coverage_functions.run_code_coverage(args.tester)
+        # Choose the measurement core (if requested)
+        from coverage_shield import tracer_functions
 
-        # Build the badge url
-        coverage_badge_url = unittest_coverage_functions.make_coverage_badge_url(
-            coverage_dataframe
-        )
+        core = None
+        if args.core is not None:
+            core = tracer_functions.choose_core(
+                args.core,
+                branch=tracer_functions.is_branch_measured(),
+                dynamic_contexts=args.watch is not None
+                or args.incremental is not None
+                or args.reduce_tests is not None,
+            )
 
-        # Update badge in README
-        unittest_coverage_functions.replace_regex_in_file(
-            file_path=Path(args.directory, args.readme),
-            pattern_regex=r"\!\[Code Coverage\]\(.+\)",
-            replacement=f"![Code Coverage]({coverage_badge_url})",
+        # Note documentation files to update badges in (README first)
+        from coverage_shield import unittest_coverage_functions
+
+        target_paths = [readme_path]
+        if args.badge_targets is not None:
+            target_paths += [
+                file_path
+                for file_path in unittest_coverage_functions.find_badge_targets(
+                    args.badge_targets
+                )
+                if file_path != readme_path
+            ]
+        badge_directory = None if args.local_badges is None else Path(args.local_badges)
+
+        # Check if watching for changes
+        if args.watch is not None:
+            from coverage_shield import watch_functions
+
+            with tracer_functions.use_core(core):
+                watch_functions.run_watch_mode(
+                    target_paths,
+                    args.tester,
+                    args.watch,
+                    badge_directory,
+                    args.diff_coverage,
+                )
+            return
+
+        # Start recording the resources used by each phase
+        metrics_functions.reset_phases()
+        start_resources = metrics_functions.measure_resources()
+
+        # Run coverage (or get cached result) and build the badge urls
+        with metrics_functions.record_phase("run_coverage"), tracer_functions.use_core(
+            core
+        ):
+            run_result = run_coverage_and_build_badge_urls(args, core)
+        badge_urls = run_result["badge_urls"]
+
+        # Add badge showing trend in coverage (from coverage history)
+        history_path = Path(
+            ".coverage_shield/history.sqlite3" if args.history is None else args.history
         )
+        if args.trend_badge is not None:
+            from coverage_shield import history_functions
+
+            with metrics_functions.record_phase("trend_badge"):
+                badge_urls["Coverage Trend"] = history_functions.build_trend_badge_url(
+                    history_path, args.trend_badge
+                )
+
+        # Update badges in README (and other documentation files)
+        with metrics_functions.record_phase("update_readme"):
+            badge_paths = unittest_coverage_functions.update_badges_in_files(
+                badge_urls, target_paths, badge_directory
+            )
 
         # Check if pushing changes
         if args.git_push:
 
-            # Stage, commit, and push updated README
-            git_functions.push_updated_readme(
-                readme_path=Path(args.directory, args.readme)
+            # Stage and commit updated README (with other files in a single commit), and push
+            with metrics_functions.record_phase("git_push"):
+                git_functions.push_updated_readme(
+                    readme_path=readme_path,
+                    other_paths=target_paths[1:] + badge_paths,
+                    wait=args.wait_for_push,
+                )
+
+        # Write result of run (if requested)
+        if args.result is not None:
+            from coverage_shield import batch_functions
+
+            batch_functions.write_repository_result(run_result, Path(args.result))
+
+        # Report the coverage history
+        if args.history_report is not None:
+            from coverage_shield import history_functions
+
+            connection = history_functions.open_history(history_path)
+            print(
+                history_functions.format_history_report(connection, args.history_report)
+            )
+            connection.close()
+
+        # Report the resources used by each phase
+        if args.metrics is not None or args.metrics_summary:
+            metrics = metrics_functions.build_metrics(
+                metrics_functions.recorded_phases,
+                metrics_functions.calculate_phase_metrics(
+                    start_resources, metrics_functions.measure_resources()
+                ),
+                arguments,
             )
+            if args.metrics is not None:
+                metrics_functions.write_metrics(metrics, Path(args.metrics))
+            if args.metrics_summary:
+                print(metrics_functions.format_metrics_summary(metrics))
 
     else:
         return args
+
+
+def run_coverage_and_build_badge_urls(
+    args: argparse.Namespace, core: str = None
+) -> dict:
+    """Runs coverage package (which runs unit tests and generates report) and builds badge urls
+
+    If the source files, package versions, and options haven't changed since a previous run, the
+    cached badge urls are returned without running the tests (unless -n/--no_cache used).
+
+    Args:
+        args (argparse.Namespace): parsed command line arguments
+        core (str, optional): measurement core in use (reported with tracing overhead). Coverage's
+            default if None. Defaults to None.
+
+    Returns:
+        dict: total statements ("statements") and missed statements ("missed") (None if tests failed),
+            shields io badge url for each badge ("badge_urls", keyed by badge name: "Code Coverage"
+            and, if requested, "Diff Coverage"), and whether the cached result was used ("cached")
+    """
+
+    # Note options that change the badges
+    run_options = [args.tester, args.engine]
+    if args.reduce_tests is not None:
+        run_options.append(f"reduce:{args.reduce_tests}")
+    if args.reduced:
+        run_options.append("reduced")
+    if args.diff_coverage is not None:
+        run_options.append(f"diff:{git_functions.get_commit(args.diff_coverage)}")
+    if args.core is not None:
+        run_options.append(f"core:{args.core}")
+
+    # Check if result cached (data files combined aren't in cache key, so combined results not cached,
+    # and tests must run to measure their overhead)
+    use_cache = not args.no_cache and args.combine is None and not args.overhead
+    if use_cache:
+        with metrics_functions.record_phase("check_cache"):
+            cache_key = cache_functions.build_cache_key(run_options=run_options)
+            cached_result = cache_functions.load_cached_result(cache_key)
+        if cached_result is not None:
+            print("Source files unchanged since a previous run. Using cached coverage.")
+            return {**cached_result, "cached": True}
+
+    # Load the modules that run coverage (imports coverage package)
+    from coverage_shield import unittest_coverage_functions
+    from coverage_shield import profiling_functions
+    from coverage_shield import impact_functions
+    from coverage_shield import diff_coverage_functions
+    from coverage_shield import reduction_functions
+
+    # Load reduced test suite (if requested)
+    test_selection = None
+    if (
+        args.reduced
+        and args.combine is None
+        and args.incremental is None
+        and args.reduce_tests is None
+    ):
+        test_selection = reduction_functions.read_test_selection(args.tester)
+        if test_selection is None:
+            warnings.warn(
+                f"No reduced test suite found for {args.tester} (use --reduce_tests). Running all tests."
+            )
+
+    # Run coverage package (which runs unit tests and generates report)
+    with tempfile.TemporaryDirectory() as temporary_directory:
+        timings_path = (
+            None
+            if args.profile_tests is None
+            else Path(temporary_directory, "test_durations.json")
+        )
+        start_time = time.perf_counter()
+        if args.combine is not None:
+            from coverage_shield import combine_functions
+
+            coverage_report = combine_functions.run_combined_code_coverage(
+                Path(args.combine), jobs=args.jobs, stream=args.stream
+            )
+        elif args.incremental is not None:
+            coverage_report = impact_functions.run_incremental_code_coverage(
+                args.tester,
+                base_ref=None if args.incremental == "" else args.incremental,
+                timings_path=timings_path,
+                stream=args.stream,
+                log_path=args.test_log,
+            )
+        elif args.reduce_tests is not None:
+            coverage_report = reduction_functions.run_reduced_code_coverage(
+                args.tester,
+                mode=args.reduce_tests,
+                timings_path=timings_path,
+                stream=args.stream,
+                log_path=args.test_log,
+            )
+        else:
+            coverage_report = unittest_coverage_functions.run_code_coverage(
+                args.tester,
+                engine=args.engine,
+                jobs=args.jobs,
+                timings_path=timings_path,
+                stream=args.stream,
+                log_path=args.test_log,
+                tail_lines=args.tail_lines,
+                test_ids=(
+                    None if test_selection is None else list(test_selection[0].tests)
+                ),
+            )
+        run_duration = time.perf_counter() - start_time
+
+        # Take files tests are defined in from full test suite (unselected tests don't run), so the
+        # badge matches the full test suite's, and note coverage of code under test to compare
+        if test_selection is not None:
+            coverage_report, tested_total = (
+                reduction_functions.build_reduced_coverage_records(
+                    unittest_coverage_functions.iterate_coverage_report(
+                        coverage_report
+                    ),
+                    test_selection[0],
+                    test_selection[2],
+                )
+            )
+
+        # Report the slowest tests
+        if timings_path is not None:
+            timing_history = profiling_functions.update_test_timing_history(
+                profiling_functions.read_test_durations([timings_path]),
+                run_duration,
+            )
+            profiling_functions.print_hotspot_report(
+                timing_history, top_n=args.profile_tests
+            )
+
+    # Sum statements across files (streamed reports can only be read once), recording them in the
+    # coverage history if requested
+    with metrics_functions.record_phase("calculate_coverage_total"):
+        if args.history is not None:
+            from coverage_shield import history_functions
+
+            coverage_total = history_functions.record_coverage_history(
+                unittest_coverage_functions.iterate_coverage_report(coverage_report),
+                Path(args.history),
+            )
+        else:
+            coverage_total = unittest_coverage_functions.calculate_coverage_total(
+                coverage_report
+            )
+
+    # Measure tracing overhead against tests run without coverage (if requested and tests passed)
+    if args.overhead and coverage_total is not None:
+        from coverage_shield import tracer_functions
+
+        if (
+            args.combine is not None
+            or args.incremental is not None
+            or args.reduce_tests is not None
+        ):
+            warnings.warn(
+                "Tracing overhead is only measured when all tests (or the --reduced tests) are run."
+            )
+        elif tracer_functions.run_uninstrumented_tests(
+            args.tester,
+            args.engine,
+            args.jobs,
+            None if test_selection is None else list(test_selection[0].tests),
+            args.tail_lines,
+        ):
+            print(
+                tracer_functions.format_overhead_summary(
+                    core,
+                    metrics_functions.sum_phase_times("run_tests"),
+                    metrics_functions.sum_phase_times("uninstrumented_tests"),
+                )
+            )
+
+    # Report time saved by reduced test suite and whether its coverage matches
+    if test_selection is not None:
+        print(
+            reduction_functions.format_reduction_summary(
+                test_selection[0],
+                test_selection[1],
+                tested_total,
+                run_duration,
+            )
+        )
+
+    # Build the badge url (from report holding only the total)
+    badge_urls = {
+        "Code Coverage": unittest_coverage_functions.make_coverage_badge_url(
+            [] if coverage_total is None else [coverage_total]
+        )
+    }
+
+    # Build diff coverage badge url (if tests passed)
+    if args.diff_coverage is not None and coverage_total is not None:
+        with metrics_functions.record_phase("diff_coverage"):
+            badge_urls["Diff Coverage"] = (
+                diff_coverage_functions.build_diff_coverage_badge_url(
+                    args.diff_coverage,
+                    data_file=(
+                        Path(".coverage")
+                        if args.incremental is None
+                        else impact_functions.BASELINE_DATA_PATH
+                    ),
+                )
+            )
+
+    # Store result in cache (if tests passed)
+    run_result = {
+        "statements": None if coverage_total is None else coverage_total.statements,
+        "missed": None if coverage_total is None else coverage_total.missed,
+        "badge_urls": badge_urls,
+    }
+    if use_cache and coverage_total is not None:
+        cache_functions.store_cached_result(cache_key, run_result)
+
+    return {**run_result, "cached": False}
@@ -0,0 +1,307 @@
+# Load required libraries
+from __future__ import annotations  # type hints not evaluated (lazy imports)
+import json  # reading coverage json reports
+import os  # naming files relative to a directory
+from io import StringIO  # capturing json report written by coverage
+from contextlib import redirect_stdout  # capturing json report written by coverage
+from pathlib import Path  # handling file paths
+import numpy as np  # storing coverage statistics as compact arrays
+import coverage  # reading coverage data
+from coverage.report_core import (
+    get_analysis_to_report,
+)  # analysing measured files one at a time
+from typing import TYPE_CHECKING, Iterable, Iterator, NamedTuple  # type hints
+
+if TYPE_CHECKING:
+    import pandas as pd  # working with dataframes
+
+# Local imports
+from coverage_shield import covignore_functions
+
+
+class CoverageRecord(NamedTuple):
+    """Coverage statistics of a single file (or the total across files)"""
+
+    name: str
+    statements: int
+    missed: int
+    branches: int
+    partial_branches: int
+
+
+def parse_coverage_json(coverage_json: str) -> dict[str, np.ndarray]:
+    """Parses json report produced by coverage (coverage json) into arrays of per file statistics
+
+    Args:
+        coverage_json (str): coverage json report
+
+    Returns:
+        dict[str, np.ndarray]: arrays of file names ("names"), statement counts ("statements"), missed
+            statement counts ("missed"), branch counts ("branches"), and partially covered branch
+            counts ("partial_branches")
+    """
+
+    # Get the per file summaries
+    file_reports = json.loads(coverage_json)["files"]
+    n_files = len(file_reports)
+    summaries = [file_report["summary"] for file_report in file_reports.values()]
+
+    # Store each statistic as an array
+    coverage_arrays = {
+        "names": np.array(list(file_reports), dtype=object),
+        "statements": np.fromiter(
+            (summary["num_statements"] for summary in summaries),
+            dtype=np.int64,
+            count=n_files,
+        ),
+        "missed": np.fromiter(
+            (summary["missing_lines"] for summary in summaries),
+            dtype=np.int64,
+            count=n_files,
+        ),
+        "branches": np.fromiter(
+            (summary.get("num_branches", 0) for summary in summaries),
+            dtype=np.int64,
+            count=n_files,
+        ),
+        "partial_branches": np.fromiter(
+            (summary.get("num_partial_branches", 0) for summary in summaries),
+            dtype=np.int64,
+            count=n_files,
+        ),
+    }
+
+    return coverage_arrays
+
+
+def read_coverage_json(
+    json_path: Path = Path("coverage.json"),
+) -> dict[str, np.ndarray]:
+    """Reads json report file produced by coverage (coverage json) into arrays of per file statistics
+
+    Args:
+        json_path (Path, optional): path to json report. Defaults to Path("coverage.json").
+
+    Returns:
+        dict[str, np.ndarray]: arrays of per file statistics (see parse_coverage_json())
+    """
+
+    # Read in the json report
+    with open(json_path) as file:
+        coverage_json = file.read()
+
+    return parse_coverage_json(coverage_json)
+
+
+def coverage_object_to_arrays(
+    coverage_object: coverage.Coverage,
+) -> dict[str, np.ndarray]:
+    """Gets arrays of per file statistics from coverage.Coverage object data
+
+    Uses coverage's json report so statistics match those from coverage command line tools.
+
+    Args:
+        coverage_object (coverage.Coverage): coverage object that has measured (or loaded) data
+
+    Returns:
+        dict[str, np.ndarray]: arrays of per file statistics (see parse_coverage_json())
+    """
+
+    # Write json report to string (outfile "-" writes to standard output)
+    json_output = StringIO()
+    try:
+        with redirect_stdout(json_output):
+            coverage_object.json_report(outfile="-")
+    except coverage.exceptions.NoDataError:
+        return parse_coverage_json('{"files": {}}')
+
+    return parse_coverage_json(json_output.getvalue())
+
+
+def read_coverage_data_file(
+    data_file: Path = Path(".coverage"),
+) -> dict[str, np.ndarray]:
+    """Reads coverage data file (.coverage SQLite database) into arrays of per file statistics
+
+    Args:
+        data_file (Path, optional): path to coverage data file. Defaults to Path(".coverage").
+
+    Returns:
+        dict[str, np.ndarray]: arrays of per file statistics (see parse_coverage_json())
+    """
+
+    # Load the coverage data
+    coverage_object = coverage.Coverage(data_file=str(data_file))
+    coverage_object.load()
+
+    return coverage_object_to_arrays(coverage_object)
+
+
+def filter_coverage_arrays(
+    coverage_arrays: dict[str, np.ndarray], patterns_to_ignore: [str] = None
+) -> dict[str, np.ndarray]:
+    """Removes files ignored by any of the patterns to ignore
+
+    Args:
+        coverage_arrays (dict[str, np.ndarray]): arrays of per file statistics
+        patterns_to_ignore ([str], optional): .covignore (gitignore style) patterns to ignore. Defaults to None.
+
+    Returns:
+        dict[str, np.ndarray]: arrays of per file statistics without ignored files
+    """
+
+    # Check if any patterns to ignore
+    if patterns_to_ignore is None:
+        return coverage_arrays
+
+    # Note which files to keep
+    is_ignored = covignore_functions.build_ignore_function(patterns_to_ignore)
+    names = coverage_arrays["names"]
+    keep = np.fromiter(
+        (not is_ignored(name) for name in names),
+        dtype=bool,
+        count=len(names),
+    )
+
+    return {key: values[keep] for key, values in coverage_arrays.items()}
+
+
+def calculate_coverage_totals(
+    coverage_arrays: dict[str, np.ndarray],
+) -> tuple[int, int]:
+    """Sums statements and missed statements across files
+
+    Args:
+        coverage_arrays (dict[str, np.ndarray]): arrays of per file statistics
+
+    Returns:
+        tuple[int, int]: total number of statements and missed statements
+    """
+
+    return int(coverage_arrays["statements"].sum()), int(
+        coverage_arrays["missed"].sum()
+    )
+
+
+def coverage_arrays_to_dataframe(
+    coverage_arrays: dict[str, np.ndarray],
+) -> pd.DataFrame:
+    """Converts arrays of per file statistics into coverage report dataframe
+
+    Args:
+        coverage_arrays (dict[str, np.ndarray]): arrays of per file statistics
+
+    Returns:
+        pd.DataFrame: coverage report as dataframe (Name, Stmts, Miss, Branch, BrPart, and Cover columns)
+    """
+
+    import pandas as pd  # working with dataframes (slow, so imported when needed)
+
+    # Calculate percentage of statements covered (files without statements are fully covered)
+    statements = coverage_arrays["statements"]
+    covered = statements - coverage_arrays["missed"]
+    cover = np.divide(
+        covered * 100.0,
+        statements,
+        out=np.full(len(statements), 100.0),
+        where=statements > 0,
+    )
+
+    # Build the dataframe
+    coverage_dataframe = pd.DataFrame(
+        {
+            "Name": coverage_arrays["names"],
+            "Stmts": statements,
+            "Miss": coverage_arrays["missed"],
+            "Branch": coverage_arrays["branches"],
+            "BrPart": coverage_arrays["partial_branches"],
+            "Cover": cover,
+        }
+    )
+
+    return coverage_dataframe
+
+
+def iterate_coverage_records(
+    coverage_object: coverage.Coverage, directory: Path = None
+) -> Iterator[CoverageRecord]:
+    """Yields statistics of each measured file from coverage.Coverage object data, one file at a time
+
+    Files are analysed as they're yielded (as coverage's own reporters do) so the statistics of all
+    files are never held in memory at once.
+
+    Args:
+        coverage_object (coverage.Coverage): coverage object that has measured (or loaded) data
+        directory (Path, optional): directory files are named relative to. Current directory if None.
+            Defaults to None.
+
+    Yields:
+        CoverageRecord: statistics of a measured file (named relative to directory)
+    """
+
+    try:
+        for file_reporter, analysis in get_analysis_to_report(coverage_object, None):
+            numbers = analysis.numbers
+            yield CoverageRecord(
+                (
+                    file_reporter.relative_filename()
+                    if directory is None
+                    else os.path.relpath(file_reporter.filename, directory)
+                ),
+                numbers.n_statements,
+                numbers.n_missing,
+                numbers.n_branches,
+                numbers.n_partial_branches,
+            )
+    except coverage.exceptions.NoDataError:
+        return
+
+
+def filter_coverage_records(
+    coverage_records: Iterable[CoverageRecord], patterns_to_ignore: [str] = None
+) -> Iterator[CoverageRecord]:
+    """Yields records of files that aren't ignored by any of the patterns to ignore
+
+    Args:
+        coverage_records (Iterable[CoverageRecord]): statistics of each file
+        patterns_to_ignore ([str], optional): .covignore (gitignore style) patterns to ignore. Defaults to None.
+
+    Yields:
+        CoverageRecord: statistics of a file that isn't ignored
+    """
+
+    # Check if any patterns to ignore
+    if patterns_to_ignore is None:
+        yield from coverage_records
+        return
+
+    is_ignored = covignore_functions.build_ignore_function(patterns_to_ignore)
+    for coverage_record in coverage_records:
+        if not is_ignored(coverage_record.name):
+            yield coverage_record
+
+
+def sum_coverage_records(
+    coverage_records: Iterable[CoverageRecord],
+) -> CoverageRecord | None:
+    """Sums statistics across files as the records are read
+
+    Args:
+        coverage_records (Iterable[CoverageRecord]): statistics of each file
+
+    Returns:
+        CoverageRecord | None: total statistics (named "TOTAL") or None if there were no records
+    """
+
+    n_files, statements, missed, branches, partial_branches = 0, 0, 0, 0, 0
+    for coverage_record in coverage_records:
+        n_files += 1
+        statements += coverage_record.statements
+        missed += coverage_record.missed
+        branches += coverage_record.branches
+        partial_branches += coverage_record.partial_branches
+
+    if n_files == 0:
+        return None
+
+    return CoverageRecord("TOTAL", statements, missed, branches, partial_branches)
@@ -0,0 +1,254 @@
+# Load required libraries
+import re  # working with regular expressions
+from functools import lru_cache  # reusing compiled patterns
+from pathlib import Path  # handling file paths
+from typing import Callable  # type hints
+
+
+def split_pattern(pattern: str) -> tuple[str, bool, bool, bool]:
+    """Splits .covignore (gitignore style) pattern into glob and its flags
+
+    Args:
+        pattern (str): pattern from .covignore file (e.g. "!/build/")
+
+    Returns:
+        tuple[str, bool, bool, bool]: glob without flags (e.g. "build"), whether pattern is negated
+            (starts with "!"), anchored to the repository directory (contains "/" before its end),
+            and only matches directories (ends with "/")
+    """
+
+    # Remove trailing spaces (unless escaped)
+    pattern = re.sub(r"(?<!\\) +$", "", pattern)
+
+    # Note if pattern negated (re-includes files) - escaped "\!" and "\#" are literal
+    negated = pattern.startswith("!")
+    if negated:
+        pattern = pattern[1:]
+    elif pattern.startswith(("\\!", "\\#")):
+        pattern = pattern[1:]
+
+    # Note if pattern only matches directories
+    directory_only = pattern.endswith("/")
+    pattern = pattern.rstrip("/")
+
+    # Note if pattern anchored (a slash at start or in middle)
+    anchored = "/" in pattern
+    pattern = pattern.lstrip("/")
+
+    return pattern, negated, anchored, directory_only
+
+
+def convert_glob_to_regex(glob: str) -> str:
+    """Converts gitignore style glob to regular expression matching forward slash separated paths
+
+    "*" and "?" don't match "/", "**" matches any number of directories, and "[...]" matches a
+    character class.
+
+    Args:
+        glob (str): glob (see split_pattern())
+
+    Returns:
+        str: regular expression (without start or end anchors)
+    """
+
+    regex_parts = []
+    position = 0
+    while position < len(glob):
+
+        # Check for "**/" (any directories) or trailing "/**" (anything within)
+        if glob.startswith("**/", position) and (
+            position == 0 or glob[position - 1] == "/"
+        ):
+            regex_parts.append("(?:.*/)?")
+            position += 3
+        elif glob.startswith("/**", position) and position + 3 == len(glob):
+            regex_parts.append("/.*")
+            position += 3
+
+        # Check for wildcards
+        elif glob[position] == "*":
+            regex_parts.append("[^/]*")
+            position = len(glob) - len(glob[position:].lstrip("*"))
+        elif glob[position] == "?":
+            regex_parts.append("[^/]")
+            position += 1
+
+        # Check for character class (e.g. [abc] or [!abc])
+        elif glob[position] == "[" and "]" in glob[position + 2 :]:
+            end = glob.index("]", position + 2)
+            characters = glob[position + 1 : end]
+            if characters.startswith("!"):
+                characters = "^" + characters[1:]
+            characters = characters.replace("\\", "\\\\")
+            regex_parts.append(f"[{characters}]")
+            position = end + 1
+
+        # Check for escaped character
+        elif glob[position] == "\\" and position + 1 < len(glob):
+            regex_parts.append(re.escape(glob[position + 1]))
+            position += 2
+
+        else:
+            regex_parts.append(re.escape(glob[position]))
+            position += 1
+
+    return "".join(regex_parts)
+
+
+def convert_pattern_to_regex(pattern: str) -> tuple[str, bool]:
+    """Converts .covignore (gitignore style) pattern to regular expression matching file paths
+
+    Patterns without a slash (before their end) match a file or directory name at any depth,
+    patterns with a slash are relative to the repository directory, and patterns ending with a
+    slash only match directories (so all the files within them).
+
+    Args:
+        pattern (str): pattern from .covignore file
+
+    Returns:
+        tuple[str, bool]: regular expression matching paths (relative to repository directory, using
+            forward slashes) and whether the pattern is negated
+    """
+
+    glob, negated, anchored, directory_only = split_pattern(pattern)
+
+    regex = ("" if anchored else "(?:.*/)?") + convert_glob_to_regex(glob)
+    regex += "/.*" if directory_only else "(?:/.*)?"
+
+    return regex, negated
+
+
+@lru_cache(maxsize=16)
+def compile_patterns(patterns: tuple[str, ...]) -> tuple[tuple[re.Pattern, bool], ...]:
+    """Compiles .covignore patterns into matcher (see is_ignored())
+
+    Consecutive patterns that are all negated (or all not negated) are joined into a single
+    regular expression. Compiled matchers are cached so they're only built once.
+
+    Args:
+        patterns (tuple[str, ...]): patterns from .covignore file
+
+    Returns:
+        tuple[tuple[re.Pattern, bool], ...]: regular expression for each group of patterns and whether
+            the group is negated
+    """
+
+    groups = []
+    for pattern in patterns:
+        regex, negated = convert_pattern_to_regex(pattern)
+        if len(groups) > 0 and groups[-1][1] == negated:
+            groups[-1][0].append(regex)
+        else:
+            groups.append(([regex], negated))
+
+    return tuple(
+        (re.compile("|".join(f"(?:{regex})" for regex in regexes)), negated)
+        for regexes, negated in groups
+    )
+
+
+def is_ignored(
+    file_path: str, compiled_patterns: tuple[tuple[re.Pattern, bool], ...]
+) -> bool:
+    """Checks if file is ignored (as git would), so the last pattern matching the file decides
+
+    Args:
+        file_path (str): path relative to repository directory
+        compiled_patterns (tuple[tuple[re.Pattern, bool], ...]): compiled patterns (see
+            compile_patterns())
+
+    Returns:
+        bool: whether file is ignored
+    """
+
+    file_path = file_path.replace("\\", "/").removeprefix("./")
+    for regex, negated in reversed(compiled_patterns):
+        if regex.fullmatch(file_path):
+            return not negated
+
+    return False
+
+
+def build_ignore_function(patterns_to_ignore: [str] = None) -> Callable[[str], bool]:
+    """Builds function that checks if file is ignored by .covignore patterns
+
+    Args:
+        patterns_to_ignore ([str], optional): patterns from .covignore file. Defaults to None.
+
+    Returns:
+        Callable[[str], bool]: takes path relative to repository directory and returns whether it's
+            ignored
+    """
+
+    if patterns_to_ignore is None:
+        return lambda file_path: False
+
+    compiled_patterns = compile_patterns(tuple(patterns_to_ignore))
+
+    return lambda file_path: is_ignored(file_path, compiled_patterns)
+
+
+def build_omit_patterns(
+    patterns_to_ignore: [str] = None, directory: Path = None
+) -> [str]:
+    """Converts .covignore patterns into coverage omit patterns so ignored files are never traced
+
+    Coverage can't re-include omitted files, so only patterns after the last negated pattern (which
+    no later pattern can re-include files of) are converted. Patterns coverage can't represent
+    (character classes, commas, and "**" within a name) are left out. Files of patterns left out are still
+    removed from the report.
+
+    Args:
+        patterns_to_ignore ([str], optional): patterns from .covignore file. Defaults to None.
+        directory (Path, optional): repository directory anchored patterns are relative to. Defaults
+            to current directory.
+
+    Returns:
+        [str]: coverage omit patterns
+    """
+
+    if patterns_to_ignore is None:
+        return []
+    directory = (Path.cwd() if directory is None else directory).resolve().as_posix()
+
+    # Find patterns after the last negated pattern
+    flags = [split_pattern(pattern) for pattern in patterns_to_ignore]
+    negated_indices = [index for index, flag in enumerate(flags) if flag[1]]
+    start = negated_indices[-1] + 1 if len(negated_indices) > 0 else 0
+
+    omit_patterns = []
+    for glob, _, anchored, directory_only in flags[start:]:
+
+        # Skip patterns coverage can't represent
+        if (
+            glob.strip("*") == ""
+            or "[" in glob
+            or "," in glob
+            or re.search(r"[^/]\*\*|\*\*[^/]", glob)
+            or (anchored and re.search(r"[*?\[]", directory))
+        ):
+            continue
+
+        # Match file (or directory contents) anywhere or relative to repository directory
+        prefix = f"{directory}/" if anchored else "**/"
+        if not directory_only:
+            omit_patterns.append(f"{prefix}{glob}")
+        omit_patterns.append(f"{prefix}{glob}/*")
+
+    return omit_patterns
+
+
+def build_omit_arguments(omit_patterns: [str] = ()) -> [str]:
+    """Builds coverage run command line argument for omit patterns
+
+    Args:
+        omit_patterns ([str], optional): coverage omit patterns (see build_omit_patterns()). Defaults to ().
+
+    Returns:
+        [str]: --omit argument (empty if no patterns)
+    """
+
+    if len(omit_patterns) == 0:
+        return []
+
+    return [f"--omit={','.join(omit_patterns)}"]
@@ -0,0 +1,177 @@
+# Load required libraries
+import os  # handling file paths
+from pathlib import Path  # handling file paths
+import numpy as np  # storing line ranges as compact arrays
+import coverage  # reading coverage data
+
+# Local imports
+from coverage_shield import git_functions
+from coverage_shield import covignore_functions
+from coverage_shield import unittest_coverage_functions
+
+
+def build_interval_index(
+    diff_hunks: dict[str, list[tuple[int, int, int, int]]],
+) -> dict[str, tuple[np.ndarray, np.ndarray]]:
+    """Builds sorted, non-overlapping ranges of changed lines (in new version) of each file
+
+    Args:
+        diff_hunks (dict[str, list[tuple[int, int, int, int]]]): hunks for each changed file (see
+            git_functions.parse_diff_hunks())
+
+    Returns:
+        dict[str, tuple[np.ndarray, np.ndarray]]: starts and ends (inclusive) of changed ranges in each
+            file (files with only deleted lines are left out)
+    """
+
+    interval_index = {}
+    for file_path, hunks in diff_hunks.items():
+
+        # Get ranges of added or changed lines (ordered by start)
+        line_ranges = sorted(
+            (new_start, new_start + new_count - 1)
+            for _, _, new_start, new_count in hunks
+            if new_count > 0
+        )
+        if len(line_ranges) == 0:
+            continue
+
+        # Merge overlapping or adjacent ranges
+        merged_ranges = [list(line_ranges[0])]
+        for start, end in line_ranges[1:]:
+            if start <= merged_ranges[-1][1] + 1:
+                merged_ranges[-1][1] = max(merged_ranges[-1][1], end)
+            else:
+                merged_ranges.append([start, end])
+
+        merged_ranges = np.array(merged_ranges, dtype=np.int64)
+        interval_index[file_path] = (merged_ranges[:, 0], merged_ranges[:, 1])
+
+    return interval_index
+
+
+def count_lines_in_intervals(lines: [int], starts: np.ndarray, ends: np.ndarray) -> int:
+    """Counts lines that fall within sorted, non-overlapping ranges
+
+    Args:
+        lines ([int]): line numbers
+        starts (np.ndarray): starts of ranges (sorted)
+        ends (np.ndarray): ends (inclusive) of ranges
+
+    Returns:
+        int: number of lines within ranges
+    """
+
+    # Find range starting at or before each line and check line is before its end
+    lines = np.asarray(lines, dtype=np.int64)
+    range_indices = np.searchsorted(starts, lines, side="right") - 1
+    in_range = (range_indices >= 0) & (lines <= ends[np.maximum(range_indices, 0)])
+
+    return int(in_range.sum())
+
+
+def calculate_diff_coverage(
+    interval_index: dict[str, tuple[np.ndarray, np.ndarray]],
+    data_file: Path = Path(".coverage"),
+    patterns_to_ignore: [str] = None,
+) -> tuple[int, int]:
+    """Counts statements, and missed statements, on changed lines
+
+    Args:
+        interval_index (dict[str, tuple[np.ndarray, np.ndarray]]): changed ranges of each file (see
+            build_interval_index())
+        data_file (Path, optional): path to coverage data file. Defaults to Path(".coverage").
+        patterns_to_ignore ([str], optional): .covignore (gitignore style) patterns to ignore. Defaults to None.
+
+    Returns:
+        tuple[int, int]: number of statements and missed statements on changed lines
+    """
+
+    # Load the coverage data
+    coverage_object = coverage.Coverage(data_file=str(data_file))
+    coverage_object.load()
+
+    # Note measured files by path relative to current directory
+    measured_files = {
+        Path(os.path.relpath(file_path)).as_posix(): file_path
+        for file_path in coverage_object.get_data().measured_files()
+    }
+    is_ignored = covignore_functions.build_ignore_function(patterns_to_ignore)
+
+    # Count statements on changed lines of each changed and measured file
+    changed_statements, changed_missed = 0, 0
+    for file_path, (starts, ends) in interval_index.items():
+        if file_path not in measured_files or is_ignored(file_path):
+            continue
+
+        try:
+            _, statements, _, missed, _ = coverage_object.analysis2(
+                measured_files[file_path]
+            )
+        except (coverage.exceptions.NoSource, coverage.exceptions.NotPython):
+            continue
+
+        changed_statements += count_lines_in_intervals(statements, starts, ends)
+        changed_missed += count_lines_in_intervals(missed, starts, ends)
+
+    return changed_statements, changed_missed
+
+
+def make_diff_coverage_badge_url(
+    changed_statements: int, changed_missed: int, no_changes_colour: str = "lightgrey"
+) -> str:
+    """Uses shields io to build diff coverage badge
+
+    Args:
+        changed_statements (int): number of statements on changed lines
+        changed_missed (int): number of missed statements on changed lines
+        no_changes_colour (str, optional): colour of badge when no statements changed. Defaults to "lightgrey".
+
+    Returns:
+        str: shields io badge url
+    """
+
+    # Check if any statements changed
+    if changed_statements == 0:
+        return f"https://img.shields.io/badge/diff%20coverage-n%2Fa-{no_changes_colour}"
+
+    # Calculate coverage of changed statements as percentage
+    diff_coverage = round(
+        (changed_statements - changed_missed) / changed_statements * 100, 1
+    )
+
+    # Note badge colour
+    badge_colour = unittest_coverage_functions.get_badge_colour(diff_coverage)
+
+    return f"https://img.shields.io/badge/diff%20coverage-{diff_coverage}%25-{badge_colour[1:]}"
+
+
+def build_diff_coverage_badge_url(
+    base_ref: str = "HEAD", data_file: Path = Path(".coverage")
+) -> str:
+    """Builds diff coverage badge for lines changed since base reference
+
+    Args:
+        base_ref (str, optional): git reference to compare to. Defaults to "HEAD".
+        data_file (Path, optional): path to coverage data file. Defaults to Path(".coverage").
+
+    Returns:
+        str: shields io badge url
+    """
+
+    # Get changed line ranges (untracked files are changed throughout)
+    interval_index = build_interval_index(git_functions.get_diff_hunks(base_ref))
+    for file_path in git_functions.get_untracked_files():
+        interval_index[file_path] = (
+            np.array([1], dtype=np.int64),
+            np.array([np.iinfo(np.int64).max], dtype=np.int64),
+        )
+
+    # Count statements covered on changed lines
+    changed_statements, changed_missed = calculate_diff_coverage(
+        interval_index,
+        data_file,
+        unittest_coverage_functions.load_patterns_to_ignore_in_coverage(),
+    )
+
+    return make_diff_coverage_badge_url(changed_statements, changed_missed)
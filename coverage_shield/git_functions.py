@@ -1,10 +1,26 @@
 # Load required libraries
+from __future__ import annotations  # type hints not evaluated
 import subprocess  # command line commands
+import re  # working with regular expressions
+import os  # building environment of push process
+import sys  # running push process with current python
+import time  # waiting between push attempts
+import warnings  # send warnings
 from pathlib import Path  # handling file paths
 
+# Times a failed push is retried and seconds waited before first retry (doubled each retry)
+PUSH_RETRIES = 4
+PUSH_BACKOFF = 1.0
+
+# Log file of background push
+PUSH_LOG_PATH = Path(".coverage_shield", "git_push.log")
+
 
 def check_if_file_changed_using_git(file_path: Path) -> bool:
-    """Use git to check if file provided has changed in repo
+    """Use git to check if file provided has changed in repo (staged, unstaged, or untracked)
+
+    Reads machine readable (porcelain) git status, which doesn't change between git versions or
+    languages.
 
     Args:
         file_path (Path): path to file that want to check
@@ -15,64 +31,319 @@ def check_if_file_changed_using_git(file_path: Path) -> bool:
     Returns:
         bool: True if files have changed and False otherwise
     """
-    # Run git status command
+
+    # Run git status command (listing nothing if file unchanged)
     command_result = send_command(
-        "git", "status", str(file_path), capture_output=True, text=True
+        "git",
+        "status",
+        "--porcelain",
+        "-z",
+        "--untracked-files=all",
+        "--",
+        str(file_path),
+        capture_output=True,
+        text=True,
     )
 
-    # Check if ran ok
-    if command_result.returncode == 0:  # Passing
-
-        # Check if there is anything to commit
-        if "nothing to commit" in command_result.stdout:
-            return False
-    else:
-        raise subprocess.CalledProcessError(
-            returncode=command_result.returncode,
-            cmd=command_result.args,
-            output=command_result.stdout,
-            stderr=command_result.stderr,
+    return command_result.stdout != ""
+
+
+def commit_changed_files(
+    file_paths: [Path], commit_message: str, commit: bool = True
+) -> [str]:
+    """Uses git to stage and commit the files provided that have changed, in one batch
+
+    Only the files provided are committed (other staged changes are left staged).
+
+    Args:
+        file_paths ([Path]): paths to files to commit
+        commit_message (str): commit message
+        commit (bool, optional): whether to commit the staged changes. Defaults to True.
+
+    Returns:
+        [str]: paths (relative to current directory) of changed files staged (and committed)
+    """
+
+    # Stage any changes (unchanged files are left as they are)
+    file_paths = [str(file_path) for file_path in file_paths]
+    send_command("git", "add", "--all", "--", *file_paths)
+
+    # List files with staged changes
+    command_result = send_command(
+        "git",
+        "diff",
+        "--cached",
+        "--name-only",
+        "--relative",
+        "-z",
+        "--",
+        *file_paths,
+        capture_output=True,
+        text=True,
+    )
+    changed_paths = [path for path in command_result.stdout.split("\0") if path != ""]
+
+    # Commit the changed files
+    if commit and len(changed_paths) > 0:
+        send_command(
+            "git", "commit", "--quiet", "-m", commit_message, "--", *file_paths
         )
 
-    # If got to here there must be changes to commit
-    return True
+    return changed_paths
+
+
+def push_with_retry(retries: int = PUSH_RETRIES, backoff: float = PUSH_BACKOFF) -> bool:
+    """Uses git to push commits, retrying if the push fails (e.g. network errors)
+
+    Waits backoff seconds before the first retry, doubling the wait before each later retry.
+
+    Args:
+        retries (int, optional): number of times to retry. Defaults to PUSH_RETRIES.
+        backoff (float, optional): seconds to wait before first retry. Defaults to PUSH_BACKOFF.
+
+    Returns:
+        bool: True if push succeeded and False otherwise
+    """
+
+    for attempt in range(retries + 1):
+
+        # Push the commits
+        command_result = send_command(
+            "git", "push", "--quiet", check=False, capture_output=True, text=True
+        )
+        if command_result.returncode == 0:
+            print(f"git push succeeded (attempt {attempt + 1})", flush=True)
+            return True
+
+        # Wait before retrying
+        print(
+            f"git push failed (attempt {attempt + 1}): {command_result.stderr.strip()}",
+            flush=True,
+        )
+        if attempt < retries:
+            time.sleep(backoff * 2**attempt)
+
+    return False
+
+
+def start_background_push(
+    retries: int = PUSH_RETRIES,
+    backoff: float = PUSH_BACKOFF,
+    log_path: Path = PUSH_LOG_PATH,
+) -> subprocess.Popen:
+    """Starts git push (see push_with_retry()) in a separate process that keeps running after this
+    one exits
+
+    Args:
+        retries (int, optional): number of times to retry. Defaults to PUSH_RETRIES.
+        backoff (float, optional): seconds to wait before first retry. Defaults to PUSH_BACKOFF.
+        log_path (Path, optional): log file to write push attempts to. Defaults to PUSH_LOG_PATH.
+
+    Returns:
+        subprocess.Popen: push process
+    """
+
+    # Make sure coverage_shield can be imported from the current directory
+    environment = os.environ.copy()
+    environment["PYTHONPATH"] = os.pathsep.join(
+        filter(
+            None,
+            [str(Path(__file__).parent.parent), environment.get("PYTHONPATH")],
+        )
+    )
+
+    # Start the push (in its own session, so it isn't stopped with this process)
+    log_path.parent.mkdir(parents=True, exist_ok=True)
+    with open(log_path, "w") as log_file:
+        return subprocess.Popen(
+            [
+                sys.executable,
+                "-m",
+                "coverage_shield.git_functions",
+                str(retries),
+                str(backoff),
+            ],
+            stdin=subprocess.DEVNULL,
+            stdout=log_file,
+            stderr=subprocess.STDOUT,
+            env=environment,
+            start_new_session=True,
+        )
 
 
 def push_updated_readme(
-    readme_path: Path = Path("README.md"), commit_and_push: bool = True
-):
+    readme_path: Path = Path("README.md"),
+    commit_and_push: bool = True,
+    other_paths: [Path] = (),
+    wait: bool = False,
+) -> subprocess.Popen | None:
     """Uses git to stage, commit, and push changes to README.md (updated badge)
 
+    The changed files are staged and committed together, then pushed in the background (with
+    retries), so this returns as soon as the commit exists.
+
     Args:
         readme_path (Path, optional): path to README.md file. Defaults to Path("README.md").
         commit_and_push (bool, optional): whether to push changes or not. Defaults to True.
+        other_paths ([Path], optional): paths to other files to stage with README (e.g. other files
+            holding badges and badge files rendered locally), committed together. Defaults to ().
+        wait (bool, optional): whether to wait for the push to finish (e.g. in CI jobs that stop
+            leftover processes) instead of pushing in the background. Defaults to False.
+
+    Returns:
+        subprocess.Popen | None: background push process (see start_background_push()), or None if
+            nothing committed or push waited for
+    """
+
+    # Stage (and commit) the changed files
+    changed_paths = commit_changed_files(
+        [readme_path, *other_paths],
+        f"Updated coverage badge in {readme_path}",
+        commit=commit_and_push,
+    )
+    if not commit_and_push or len(changed_paths) == 0:
+        return None
+
+    # Push the commit
+    if wait:
+        if not push_with_retry():
+            warnings.warn("git push failed! The badge update is committed locally.")
+        return None
+    print(
+        f"Committed {', '.join(changed_paths)}. Pushing in the background (see {PUSH_LOG_PATH})."
+    )
+
+    return start_background_push()
+
+
+def parse_diff_hunks(diff_output: str) -> dict[str, list[tuple[int, int, int, int]]]:
+    """Parses hunk headers from unified diff (ideally without context lines, i.e. -U0)
+
+    Args:
+        diff_output (str): output of git diff
+
+    Returns:
+        dict[str, list[tuple[int, int, int, int]]]: for each changed file (new path, or old path if
+            deleted), the start and number of lines of each hunk in the old and new versions of the file
+            (old_start, old_count, new_start, new_count)
     """
 
-    # Check if updated README changed
-    if check_if_file_changed_using_git(readme_path):
+    # Note hunk header pattern (counts are 1 if not given)
+    hunk_pattern = re.compile(r"^@@ -(\d+)(?:,(\d+))? \+(\d+)(?:,(\d+))? @@")
+
+    diff_hunks = {}
+    old_path, file_hunks = None, None
+    for line in diff_output.splitlines():
 
-        # Convert file path to string
-        readme_path_str = str(readme_path)
+        # Note old file path
+        if line.startswith("--- "):
+            old_path = line[4:].rstrip("\t")
+            old_path = old_path[2:] if old_path.startswith("a/") else old_path
 
-        # Stage the changes (updated badge)
-        send_command("git", "add", readme_path_str)
+        # Start new file (using old path if file deleted)
+        elif line.startswith("+++ "):
+            new_path = line[4:].rstrip("\t")
+            file_path = old_path if new_path == "/dev/null" else new_path[2:]
+            file_hunks = diff_hunks.setdefault(file_path, [])
 
-        # Check if committing and pushing
-        if commit_and_push:
+        # Record hunk
+        elif line.startswith("@@"):
+            match = hunk_pattern.match(line)
+            if match is not None and file_hunks is not None:
+                old_start, old_count, new_start, new_count = match.groups()
+                file_hunks.append(
+                    (
+                        int(old_start),
+                        1 if old_count is None else int(old_count),
+                        int(new_start),
+                        1 if new_count is None else int(new_count),
+                    )
+                )
 
-            # Commit changes
-            commit_message = f"Updated coverage badge in {readme_path}"
-            send_command("git", "commit", "-m", commit_message)
+    return diff_hunks
 
-            # Push changes
-            send_command("git", "push")
+
+def get_diff_hunks(
+    base_ref: str = "HEAD",
+) -> dict[str, list[tuple[int, int, int, int]]]:
+    """Uses git to get changed line ranges in current directory compared to base reference
+
+    Compares working tree (including staged and unstaged changes) to base reference. Paths are
+    relative to the current directory.
+
+    Args:
+        base_ref (str, optional): git reference (commit, branch, or tag) to compare to. Defaults to "HEAD".
+
+    Returns:
+        dict[str, list[tuple[int, int, int, int]]]: hunks for each changed file (see parse_diff_hunks())
+    """
+
+    # Get the differences without context lines
+    command_result = send_command(
+        "git",
+        "diff",
+        "-U0",
+        "--no-color",
+        "--no-ext-diff",
+        "--src-prefix=a/",  # Fix prefixes parse_diff_hunks() removes (diff.noprefix can change them)
+        "--dst-prefix=b/",
+        "--relative",
+        base_ref,
+        "--",
+        capture_output=True,
+        text=True,
+    )
+
+    return parse_diff_hunks(command_result.stdout)
+
+
+def get_untracked_files() -> [str]:
+    """Uses git to list untracked (but not ignored) files in current directory
+
+    Returns:
+        [str]: paths to untracked files relative to current directory
+    """
+
+    # List untracked files
+    command_result = send_command(
+        "git",
+        "ls-files",
+        "--others",
+        "--exclude-standard",
+        capture_output=True,
+        text=True,
+    )
+
+    return command_result.stdout.splitlines()
+
+
+def get_commit(reference: str = "HEAD") -> str:
+    """Uses git to get SHA of commit reference points to
+
+    Args:
+        reference (str, optional): git reference (commit, branch, or tag). Defaults to "HEAD".
+
+    Returns:
+        str: SHA of commit
+    """
+
+    command_result = send_command(
+        "git",
+        "rev-parse",
+        "--verify",
+        f"{reference}^{{commit}}",
+        capture_output=True,
+        text=True,
+    )
+
+    return command_result.stdout.strip()
 
 
 def send_command(*args, **kwargs):
     """Send a command in the terminal
 
     Uses subprocess.run(). Note by default sets check to True to
-    check if command runs without failing.
+    check if command runs without failing (unless check=False given).
 
     Args:
         command ([str]): command to run in terminal
@@ -80,5 +351,20 @@ def send_command(*args, **kwargs):
     """
 
     # Run the command
-    result = subprocess.run(args, check=True, **kwargs)
+    result = subprocess.run(args, **{"check": True, **kwargs})
     return result
+
+
+def run_push_with_retry(arguments: [str] = sys.argv[1:]):
+    """Runs push_with_retry() in background push process (see start_background_push())
+
+    Args:
+        arguments ([str], optional): number of retries and backoff seconds. Defaults to sys.argv[1:].
+    """
+
+    retries, backoff = arguments
+    sys.exit(0 if push_with_retry(int(retries), float(backoff)) else 1)
+
+
+if __name__ == "__main__":
+    run_push_with_retry()
@@ -0,0 +1,407 @@
+# Load required libraries
+from __future__ import annotations  # type hints not evaluated (lazy imports)
+import sqlite3  # storing coverage history
+import subprocess  # catching git command errors
+import warnings  # send warnings
+from datetime import datetime, timezone  # noting when runs were recorded
+from pathlib import Path  # handling file paths
+from typing import TYPE_CHECKING, Iterable, NamedTuple  # type hints
+from urllib.parse import quote  # encoding badge url
+
+if TYPE_CHECKING:
+    from coverage_shield.coverage_data_functions import CoverageRecord
+
+# Local imports
+# (coverage_data_functions imported when needed so cached runs showing the trend badge start quickly)
+from coverage_shield import git_functions
+
+# Default location of coverage history
+HISTORY_PATH = Path(".coverage_shield", "history.sqlite3")
+
+# Tables of coverage history: a row for each run (totals, keyed by commit) and a row for each file
+# of each run. Runs are only ever added, and the latest run of a commit is used by queries.
+HISTORY_SCHEMA = """
+CREATE TABLE IF NOT EXISTS runs (
+    run_id INTEGER PRIMARY KEY,
+    commit_sha TEXT NOT NULL,
+    recorded_at TEXT NOT NULL,
+    statements INTEGER NOT NULL,
+    missed INTEGER NOT NULL,
+    branches INTEGER NOT NULL,
+    partial_branches INTEGER NOT NULL
+);
+CREATE INDEX IF NOT EXISTS runs_by_commit ON runs (commit_sha, run_id);
+CREATE TABLE IF NOT EXISTS files (
+    run_id INTEGER NOT NULL REFERENCES runs (run_id),
+    name TEXT NOT NULL,
+    statements INTEGER NOT NULL,
+    missed INTEGER NOT NULL,
+    branches INTEGER NOT NULL,
+    partial_branches INTEGER NOT NULL,
+    PRIMARY KEY (run_id, name)
+) WITHOUT ROWID;
+CREATE VIEW IF NOT EXISTS commits AS
+    SELECT *, CASE WHEN statements = 0 THEN 100.0
+        ELSE ROUND((statements - missed) * 100.0 / statements, 1) END AS coverage
+    FROM runs WHERE run_id IN (SELECT MAX(run_id) FROM runs GROUP BY commit_sha);
+"""
+
+# Characters used to draw sparklines (lowest to highest)
+SPARKLINE_CHARACTERS = "▁▂▃▄▅▆▇█"
+
+
+class HistoryRecord(NamedTuple):
+    """Coverage of a commit (from its latest recorded run)"""
+
+    commit: str
+    recorded_at: str
+    statements: int
+    missed: int
+    coverage: float
+
+
+class Regression(NamedTuple):
+    """Drop in coverage between a commit and the commit recorded before it"""
+
+    commit: str
+    previous_commit: str
+    coverage: float
+    previous_coverage: float
+
+
+class FileDelta(NamedTuple):
+    """Change in coverage of a file between two commits (None where file not measured in a commit)"""
+
+    name: str
+    statements: int
+    missed: int
+    base_statements: int
+    base_missed: int
+
+
+def open_history(history_path: Path = HISTORY_PATH) -> sqlite3.Connection:
+    """Opens coverage history (creating it if needed)
+
+    Args:
+        history_path (Path, optional): path to history database. Defaults to HISTORY_PATH.
+
+    Returns:
+        sqlite3.Connection: connection to history database
+    """
+
+    Path(history_path).parent.mkdir(parents=True, exist_ok=True)
+    connection = sqlite3.connect(history_path)
+    connection.executescript(HISTORY_SCHEMA)
+
+    return connection
+
+
+def record_coverage(
+    connection: sqlite3.Connection,
+    commit: str,
+    coverage_records: Iterable[CoverageRecord],
+) -> CoverageRecord | None:
+    """Adds run to coverage history, summing statistics of each file as they're stored
+
+    Args:
+        connection (sqlite3.Connection): connection to history database (see open_history())
+        commit (str): SHA of commit coverage was measured at
+        coverage_records (Iterable[CoverageRecord]): statistics of each file (streamed records are
+            read as they're stored)
+
+    Returns:
+        CoverageRecord | None: total statistics (named "TOTAL") or None if there were no records (in
+            which case nothing is stored)
+    """
+
+    from coverage_shield.coverage_data_functions import CoverageRecord
+
+    # Count files and sum statistics as records are stored
+    totals = [0, 0, 0, 0, 0]
+
+    def count_records():
+        for coverage_record in coverage_records:
+            totals[0] += 1
+            totals[1] += coverage_record.statements
+            totals[2] += coverage_record.missed
+            totals[3] += coverage_record.branches
+            totals[4] += coverage_record.partial_branches
+            yield (run_id, *coverage_record)
+
+    with connection:
+
+        # Add run, then its files (noting totals as they're added)
+        run_id = connection.execute(
+            "INSERT INTO runs VALUES (NULL, ?, ?, 0, 0, 0, 0)",
+            (commit, datetime.now(timezone.utc).isoformat(timespec="seconds")),
+        ).lastrowid
+        connection.executemany(
+            "INSERT OR REPLACE INTO files VALUES (?, ?, ?, ?, ?, ?)", count_records()
+        )
+
+        # Remove run if coverage failed
+        if totals[0] == 0:
+            connection.execute("DELETE FROM runs WHERE run_id = ?", (run_id,))
+            return None
+
+        connection.execute(
+            "UPDATE runs SET statements = ?, missed = ?, branches = ?, partial_branches = ? "
+            "WHERE run_id = ?",
+            (*totals[1:], run_id),
+        )
+
+    return CoverageRecord("TOTAL", *totals[1:])
+
+
+def record_coverage_history(
+    coverage_records: Iterable[CoverageRecord], history_path: Path = HISTORY_PATH
+) -> CoverageRecord | None:
+    """Records coverage of current commit in coverage history
+
+    Args:
+        coverage_records (Iterable[CoverageRecord]): statistics of each file
+        history_path (Path, optional): path to history database. Defaults to HISTORY_PATH.
+
+    Returns:
+        CoverageRecord | None: total statistics (named "TOTAL") or None if there were no records
+    """
+
+    # Get current commit (history can't be recorded outside git repositories)
+    try:
+        commit = git_functions.get_commit()
+    except (subprocess.CalledProcessError, FileNotFoundError):
+        warnings.warn(
+            "Coverage history not recorded as directory isn't a git repository (with commits)."
+        )
+        from coverage_shield import coverage_data_functions
+
+        return coverage_data_functions.sum_coverage_records(coverage_records)
+
+    # Record coverage
+    connection = open_history(history_path)
+    try:
+        return record_coverage(connection, commit, coverage_records)
+    finally:
+        connection.close()
+
+
+def get_coverage_trend(
+    connection: sqlite3.Connection, n_commits: int = None
+) -> list[HistoryRecord]:
+    """Gets coverage of most recently recorded commits
+
+    Args:
+        connection (sqlite3.Connection): connection to history database
+        n_commits (int, optional): number of commits to get. All commits if None. Defaults to None.
+
+    Returns:
+        list[HistoryRecord]: coverage of each commit (oldest first)
+    """
+
+    rows = connection.execute(
+        "SELECT commit_sha, recorded_at, statements, missed, coverage FROM commits "
+        "ORDER BY run_id DESC LIMIT ?",
+        (-1 if n_commits is None else n_commits,),
+    ).fetchall()
+
+    return [HistoryRecord(*row) for row in reversed(rows)]
+
+
+def find_regressions(
+    connection: sqlite3.Connection, min_drop: float = 0.0
+) -> list[Regression]:
+    """Finds commits whose coverage dropped compared to the commit recorded before them
+
+    Args:
+        connection (sqlite3.Connection): connection to history database
+        min_drop (float, optional): drops in coverage (percentage points) up to this are ignored.
+            Defaults to 0.0.
+
+    Returns:
+        list[Regression]: drops in coverage (oldest first)
+    """
+
+    rows = connection.execute(
+        "SELECT commit_sha, previous_commit, coverage, previous_coverage FROM ("
+        "SELECT run_id, commit_sha, coverage, "
+        "LAG(commit_sha) OVER (ORDER BY run_id) AS previous_commit, "
+        "LAG(coverage) OVER (ORDER BY run_id) AS previous_coverage FROM commits) "
+        "WHERE previous_coverage - coverage > ? ORDER BY run_id",
+        (min_drop,),
+    ).fetchall()
+
+    return [Regression(*row) for row in rows]
+
+
+def get_file_deltas(
+    connection: sqlite3.Connection, commit: str, base_commit: str
+) -> list[FileDelta]:
+    """Gets files whose statistics changed between two recorded commits
+
+    Args:
+        connection (sqlite3.Connection): connection to history database
+        commit (str): SHA of commit
+        base_commit (str): SHA of commit to compare to
+
+    Returns:
+        list[FileDelta]: statistics of each changed file in both commits (sorted by name)
+    """
+
+    rows = connection.execute(
+        "WITH current AS (SELECT files.* FROM files JOIN commits USING (run_id) "
+        "WHERE commit_sha = :commit), "
+        "base AS (SELECT files.* FROM files JOIN commits USING (run_id) "
+        "WHERE commit_sha = :base_commit) "
+        "SELECT current.name, current.statements, current.missed, base.statements, base.missed "
+        "FROM current LEFT JOIN base USING (name) "
+        "WHERE base.name IS NULL OR current.statements != base.statements "
+        "OR current.missed != base.missed "
+        "UNION ALL "
+        "SELECT base.name, NULL, NULL, base.statements, base.missed "
+        "FROM base LEFT JOIN current USING (name) WHERE current.name IS NULL "
+        "ORDER BY 1",
+        {"commit": commit, "base_commit": base_commit},
+    ).fetchall()
+
+    return [FileDelta(*row) for row in rows]
+
+
+def make_sparkline(
+    values: [float], minimum: float = None, maximum: float = None
+) -> str:
+    """Draws values as a line of block characters (e.g. "▃▄▄▆█")
+
+    Args:
+        values ([float]): values to draw
+        minimum (float, optional): value drawn as lowest block. Smallest value if None. Defaults to None.
+        maximum (float, optional): value drawn as highest block. Largest value if None. Defaults to None.
+
+    Returns:
+        str: sparkline
+    """
+
+    if len(values) == 0:
+        return ""
+
+    minimum = min(values) if minimum is None else minimum
+    maximum = max(values) if maximum is None else maximum
+    value_range = maximum - minimum
+    n_levels = len(SPARKLINE_CHARACTERS) - 1
+
+    return "".join(
+        SPARKLINE_CHARACTERS[
+            (
+                n_levels
+                if value_range == 0
+                else min(
+                    max(round((value - minimum) / value_range * n_levels), 0), n_levels
+                )
+            )
+        ]
+        for value in values
+    )
+
+
+def make_trend_badge_url(history_records: [HistoryRecord], colour: str = "blue") -> str:
+    """Uses shields io to build badge showing sparkline of coverage of recent commits
+
+    Args:
+        history_records ([HistoryRecord]): coverage of each commit (oldest first)
+        colour (str, optional): colour of badge. Defaults to "blue".
+
+    Returns:
+        str: shields io badge url
+    """
+
+    if len(history_records) == 0:
+        return "https://img.shields.io/badge/coverage%20trend-no%20history-lightgrey"
+
+    sparkline = make_sparkline([record.coverage for record in history_records])
+
+    return f"https://img.shields.io/badge/coverage%20trend-{quote(sparkline)}-{colour}"
+
+
+def build_trend_badge_url(
+    history_path: Path = HISTORY_PATH, n_commits: int = 20
+) -> str:
+    """Builds badge showing sparkline of coverage of recently recorded commits
+
+    Args:
+        history_path (Path, optional): path to history database. Defaults to HISTORY_PATH.
+        n_commits (int, optional): number of recent commits to show. Defaults to 20.
+
+    Returns:
+        str: shields io badge url
+    """
+
+    connection = open_history(history_path)
+    try:
+        return make_trend_badge_url(get_coverage_trend(connection, n_commits))
+    finally:
+        connection.close()
+
+
+def format_history_report(connection: sqlite3.Connection, n_commits: int = 10) -> str:
+    """Formats coverage of recent commits, drops in coverage, and files changed by latest commit
+
+    Args:
+        connection (sqlite3.Connection): connection to history database
+        n_commits (int, optional): number of recent commits to report. Defaults to 10.
+
+    Returns:
+        str: report
+    """
+
+    trend = get_coverage_trend(connection, n_commits)
+    if len(trend) == 0:
+        return "No coverage history recorded."
+
+    # Report coverage of recent commits
+    lines = [
+        f"Coverage of last {len(trend)} commits: "
+        + make_sparkline([record.coverage for record in trend])
+    ]
+    lines += [
+        f"  {record.commit[:10]}  {record.recorded_at}  {record.coverage:5.1f}%  "
+        f"({record.statements - record.missed}/{record.statements} statements)"
+        for record in trend
+    ]
+
+    # Report drops in coverage
+    regressions = find_regressions(connection)
+    lines.append(f"Drops in coverage: {len(regressions)}")
+    lines += [
+        f"  {regression.commit[:10]}  {regression.previous_coverage:.1f}% -> "
+        f"{regression.coverage:.1f}% (since {regression.previous_commit[:10]})"
+        for regression in regressions[-n_commits:]
+    ]
+
+    # Report files changed by latest commit
+    if len(trend) > 1:
+        file_deltas = get_file_deltas(connection, trend[-1].commit, trend[-2].commit)
+        lines.append(f"Files changed since {trend[-2].commit[:10]}: {len(file_deltas)}")
+        lines += [
+            f"  {file_delta.name}  "
+            f"{format_file_coverage(file_delta.base_statements, file_delta.base_missed)} -> "
+            f"{format_file_coverage(file_delta.statements, file_delta.missed)}"
+            for file_delta in file_deltas
+        ]
+
+    return "\n".join(lines)
+
+
+def format_file_coverage(statements: int, missed: int) -> str:
+    """Formats coverage of a file (e.g. "8/10")
+
+    Args:
+        statements (int): number of statements (None if file not measured)
+        missed (int): number of missed statements (None if file not measured)
+
+    Returns:
+        str: covered and total statements ("-" if file not measured)
+    """
+
+    if statements is None:
+        return "-"
+
+    return f"{statements - missed}/{statements}"
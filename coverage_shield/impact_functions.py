@@ -0,0 +1,512 @@
+# Load required libraries
+from __future__ import annotations  # type hints not evaluated (lazy imports)
+import json  # reading and writing test index
+import os  # handling file paths
+import re  # matching coverage contexts
+import warnings  # send warnings
+from pathlib import Path  # handling file paths
+import coverage  # measuring code coverage with test contexts
+from typing import TYPE_CHECKING, Iterator  # type hints
+
+if TYPE_CHECKING:
+    import pandas as pd  # working with dataframes
+
+# Local imports
+from coverage_shield import git_functions
+from coverage_shield import cache_functions
+from coverage_shield import unittest_coverage_functions
+from coverage_shield import parallel_coverage_functions
+from coverage_shield import output_functions
+from coverage_shield.coverage_data_functions import CoverageRecord
+
+# Files storing coverage data of all tests and index of lines each test runs
+BASELINE_DATA_PATH = Path(".coverage_shield", "baseline.coverage")
+TEST_INDEX_PATH = Path(".coverage_shield", "test_index.json")
+
+
+def convert_context_to_test_id(context: str, tester: str = "unittest") -> str:
+    """Converts coverage test function context into test id tester accepts
+
+    Args:
+        context (str): coverage dynamic context (e.g. tests.test_x.TestX.test_y)
+        tester (str, optional): unit test package to use ("unittest" or "pytest"). Defaults to "unittest".
+
+    Returns:
+        str: unittest name (context unchanged) or pytest node id (e.g. tests/test_x.py::TestX::test_y)
+    """
+
+    if tester == "unittest" or context == "":
+        return context
+
+    # Find module file in dotted name and convert rest to pytest node id
+    parts = context.split(".")
+    for index in range(1, len(parts)):
+        module_path = Path(*parts[:index]).with_suffix(".py")
+        if module_path.is_file():
+            return "::".join([module_path.as_posix(), *parts[index:]])
+
+    return context
+
+
+def convert_lines_to_ranges(lines: [int]) -> [[int]]:
+    """Collapses line numbers into ranges of consecutive lines
+
+    Args:
+        lines ([int]): sorted line numbers
+
+    Returns:
+        [[int]]: start and end (inclusive) of each range
+    """
+
+    line_ranges = []
+    for line in lines:
+        if len(line_ranges) > 0 and line == line_ranges[-1][1] + 1:
+            line_ranges[-1][1] = line
+        else:
+            line_ranges.append([line, line])
+
+    return line_ranges
+
+
+def hash_source_files() -> dict:
+    """Hashes contents of python files (and .covignore) in current directory
+
+    Returns:
+        dict: hash of each file (relative to current directory, using forward slashes)
+    """
+
+    return {
+        file_path.as_posix(): cache_functions.hash_file(file_path)
+        for file_path in cache_functions.get_source_files()
+    }
+
+
+def find_changed_files(file_hashes: dict, current_hashes: dict) -> [str]:
+    """Finds files added, removed, or changed since file hashes were recorded
+
+    Args:
+        file_hashes (dict): recorded hash of each file (see hash_source_files())
+        current_hashes (dict): current hash of each file (see hash_source_files())
+
+    Returns:
+        [str]: sorted paths of changed files
+    """
+
+    return sorted(
+        file_path
+        for file_path in file_hashes.keys() | current_hashes.keys()
+        if file_hashes.get(file_path) != current_hashes.get(file_path)
+    )
+
+
+def build_test_index(
+    coverage_data: coverage.CoverageData,
+    tester: str = "unittest",
+    file_hashes: dict = None,
+) -> dict:
+    """Builds index of lines in each file run by each test from coverage data with test contexts
+
+    Lines run outside tests (e.g. when modules are imported) are recorded against empty test id ("").
+
+    Args:
+        coverage_data (coverage.CoverageData): coverage data recorded with test_function dynamic context
+        tester (str, optional): unit test package to use ("unittest" or "pytest"). Defaults to "unittest".
+        file_hashes (dict, optional): hash of each source file when coverage data were recorded (see
+            hash_source_files()). Defaults to None.
+
+    Returns:
+        dict: tester ("tester"), test ids ("tests"), for each file (relative to current directory,
+            using forward slashes) the line ranges run by each test (keyed by position in test ids)
+            ("files"), and hash of each source file ("hashes")
+    """
+
+    test_ids, test_positions, files = [], {}, {}
+    for file_path in sorted(coverage_data.measured_files()):
+
+        # Note lines run by each test in file
+        test_lines = {}
+        for line, contexts in coverage_data.contexts_by_lineno(file_path).items():
+            for context in contexts:
+                test_lines.setdefault(context, []).append(line)
+
+        # Store line ranges against test positions
+        file_tests = {}
+        for context, lines in test_lines.items():
+            test_id = convert_context_to_test_id(context, tester)
+            if test_id not in test_positions:
+                test_positions[test_id] = len(test_ids)
+                test_ids.append(test_id)
+            file_tests[str(test_positions[test_id])] = convert_lines_to_ranges(
+                sorted(lines)
+            )
+        files[Path(os.path.relpath(file_path)).as_posix()] = file_tests
+
+    return {
+        "tester": tester,
+        "tests": test_ids,
+        "files": files,
+        "hashes": {} if file_hashes is None else file_hashes,
+    }
+
+
+def write_test_index(test_index: dict, index_path: Path = TEST_INDEX_PATH):
+    """Writes test index to json file
+
+    Args:
+        test_index (dict): test index (see build_test_index())
+        index_path (Path, optional): path to file. Defaults to TEST_INDEX_PATH.
+    """
+
+    index_path.parent.mkdir(parents=True, exist_ok=True)
+    with open(index_path, "w") as file:
+        json.dump(test_index, file, separators=(",", ":"))
+
+
+def read_test_index(index_path: Path = TEST_INDEX_PATH) -> dict:
+    """Reads test index from json file
+
+    Args:
+        index_path (Path, optional): path to file. Defaults to TEST_INDEX_PATH.
+
+    Returns:
+        dict: test index (see build_test_index()) or None if file doesn't exist
+    """
+
+    if not index_path.is_file():
+        return None
+
+    with open(index_path) as file:
+        return json.load(file)
+
+
+def select_impacted_tests(
+    test_index: dict,
+    changed_files: [str],
+    tester: str = "unittest",
+) -> [str]:
+    """Selects tests that ran any line of the changed files (and changed test modules)
+
+    Whole files, rather than changed lines, are used so the coverage data of the changed files can
+    be replaced by that of the selected tests (tests that ran other lines of a changed file would
+    otherwise lose their coverage of it).
+
+    Args:
+        test_index (dict): test index (see build_test_index())
+        changed_files ([str]): changed files (relative to current directory, using forward slashes)
+        tester (str, optional): unit test package to use ("unittest" or "pytest"). Defaults to "unittest".
+
+    Returns:
+        [str]: test ids and test modules to run or None if all tests should be run (e.g. a changed
+            python file was only run when imported or isn't in index, or .covignore changed)
+    """
+
+    test_ids, test_modules, deleted_modules = set(), set(), set()
+    for file_path in changed_files:
+
+        # Run all tests if files ignored changed
+        if Path(file_path).name == ".covignore":
+            return None
+
+        # Ignore non-python files
+        if not file_path.endswith(".py"):
+            continue
+
+        # Run whole module if test module changed (may contain new tests)
+        if parallel_coverage_functions.is_test_file(file_path, tester):
+            test_module = parallel_coverage_functions.convert_test_path(
+                Path(file_path), tester
+            )
+            if Path(file_path).is_file():
+                test_modules.add(test_module)
+            else:
+                deleted_modules.add(test_module)
+            continue
+
+        # Run all tests if changed file isn't in index (new, or not imported by tests)
+        file_tests = test_index["files"].get(file_path)
+        if file_tests is None:
+            if not Path(file_path).is_file():
+                continue
+            return None
+
+        # Find tests that ran the file
+        file_test_ids = {
+            test_index["tests"][int(test_position)] for test_position in file_tests
+        }
+        file_test_ids.discard("")
+        if len(file_test_ids) == 0:
+            return None
+        test_ids.update(file_test_ids)
+
+    # Remove tests already run as part of modules (or in deleted modules)
+    separator = "::" if tester == "pytest" else "."
+    test_ids = {
+        test_id
+        for test_id in test_ids
+        if not any(
+            test_id.startswith(test_module + separator)
+            for test_module in test_modules | deleted_modules
+        )
+    }
+
+    return sorted(test_ids | test_modules)
+
+
+def is_context_of_tests(
+    context: str, test_ids: set, test_files: [str], tester: str = "unittest"
+) -> bool:
+    """Checks if coverage context was recorded by one of the tests (or test files) provided
+
+    Args:
+        context (str): coverage dynamic context (e.g. tests.test_x.TestX.test_y)
+        test_ids (set): test ids (see convert_context_to_test_id())
+        test_files ([str]): test files (relative to current directory, using forward slashes). Can
+            include deleted files
+        tester (str, optional): unit test package to use ("unittest" or "pytest"). Defaults to "unittest".
+
+    Returns:
+        bool: True if context recorded by tests and False otherwise
+    """
+
+    if context == "":
+        return False
+
+    # Check if context belongs to test
+    test_id = convert_context_to_test_id(context, tester)
+    if test_id in test_ids:
+        return True
+
+    # Check if context belongs to test file (as dotted module name or pytest node id)
+    return any(
+        context.startswith(".".join(Path(test_file).with_suffix("").parts) + ".")
+        or test_id.startswith(f"{test_file}::")
+        for test_file in test_files
+    )
+
+
+def copy_coverage_data(
+    coverage_data: coverage.CoverageData,
+    contexts: set,
+    file_paths: [str],
+    data_path: Path,
+) -> coverage.CoverageData:
+    """Copies coverage data of the contexts and files provided into new coverage data file
+
+    Args:
+        coverage_data (coverage.CoverageData): coverage data recorded with test_function dynamic context
+        contexts (set): contexts to copy
+        file_paths ([str]): measured files to copy (as recorded in coverage data)
+        data_path (Path): path to new coverage data file (replaced if exists)
+
+    Returns:
+        coverage.CoverageData: new coverage data
+    """
+
+    data_path.unlink(missing_ok=True)
+    copied_data = coverage.CoverageData(basename=str(data_path))
+
+    if coverage_data.has_arcs():
+
+        # Copy arcs of each context (arcs can only be queried by context)
+        copied_data.add_arcs({})
+        for context in contexts:
+            coverage_data.set_query_contexts([f"^{re.escape(context)}$"])
+            context_arcs = {
+                file_path: coverage_data.arcs(file_path) for file_path in file_paths
+            }
+            copied_data.set_context(context)
+            copied_data.add_arcs(
+                {file_path: arcs for file_path, arcs in context_arcs.items() if arcs}
+            )
+        coverage_data.set_query_contexts(None)
+
+    else:
+
+        # Group lines of each file by context
+        context_lines = {}
+        for file_path in file_paths:
+            for line, line_contexts in coverage_data.contexts_by_lineno(
+                file_path
+            ).items():
+                for context in line_contexts:
+                    if context in contexts:
+                        context_lines.setdefault(context, {}).setdefault(
+                            file_path, []
+                        ).append(line)
+
+        # Copy lines of each context
+        copied_data.add_lines({})
+        for context, file_lines in context_lines.items():
+            copied_data.set_context(context)
+            copied_data.add_lines(file_lines)
+
+    # Keep files without any lines run (e.g. empty __init__.py)
+    copied_data.touch_files(file_paths)
+
+    return copied_data
+
+
+def run_impacted_tests(
+    tester: str = "unittest",
+    test_ids: [str] = None,
+    changed_files: [str] = (),
+    timings_path: Path = None,
+    log_path: Path = None,
+) -> bool:
+    """Runs tests in current process, recording which test ran each line, and merges their coverage
+    into baseline
+
+    The baseline is rebuilt from the data of the tests that weren't run (dropping the data of the
+    changed files and changed, or deleted, test files) and the data of the tests run, so every test
+    that ran a changed file must be run (see select_impacted_tests()). The baseline is replaced if all
+    tests run (test_ids is None) or no baseline exists. If no tests are run (empty test_ids), the data
+    of the changed files are still dropped from the baseline.
+
+    Args:
+        tester (str, optional): unit test package to use ("unittest" or "pytest"). Defaults to "unittest".
+        test_ids ([str], optional): tests to run. Runs all tests if None. Defaults to None.
+        changed_files ([str], optional): changed files (relative to current directory, using forward
+            slashes). Defaults to ().
+        timings_path (Path, optional): file to write duration of each test to. Not recorded if None.
+            Defaults to None.
+        log_path (Path, optional): log file to write test output to. Console if None. Defaults to None.
+
+    Returns:
+        bool: whether tests passed (baseline unchanged if not)
+    """
+
+    # Run the tests, recording which test ran each line
+    fresh_data_path = Path(".coverage_shield", "incremental.coverage")
+    fresh_data_path.parent.mkdir(parents=True, exist_ok=True)
+    fresh_data = None
+    if test_ids is None or len(test_ids) > 0:
+        coverage_object = coverage.Coverage(
+            data_file=str(fresh_data_path),
+            source=["."],
+            omit=unittest_coverage_functions.get_omit_patterns(),
+        )
+        coverage_object.set_option("run:dynamic_context", "test_function")
+        with output_functions.redirect_output(log_path):
+            tests_passed = unittest_coverage_functions.measure_tests_in_process(
+                coverage_object, tester, timings_path, test_ids
+            )
+        coverage_object.save()
+        if not tests_passed:
+            return False
+        fresh_data = coverage_object.get_data()
+
+    # Store fresh data as baseline
+    if test_ids is None or not BASELINE_DATA_PATH.is_file():
+        os.replace(fresh_data_path, BASELINE_DATA_PATH)
+        return True
+
+    # Rebuild baseline from data of tests not run (outside changed files) and fresh data
+    baseline_data = coverage.CoverageData(basename=str(BASELINE_DATA_PATH))
+    baseline_data.read()
+    changed_test_files = [
+        file_path
+        for file_path in changed_files
+        if parallel_coverage_functions.is_test_file(file_path, tester)
+    ]
+    kept_contexts = {
+        context
+        for context in baseline_data.measured_contexts()
+        if not is_context_of_tests(context, set(test_ids), changed_test_files, tester)
+    }
+    kept_files = [
+        file_path
+        for file_path in baseline_data.measured_files()
+        if Path(os.path.relpath(file_path)).as_posix() not in changed_files
+    ]
+    merged_data_path = Path(".coverage_shield", "merged.coverage")
+    merged_data = copy_coverage_data(
+        baseline_data, kept_contexts, kept_files, merged_data_path
+    )
+    if fresh_data is not None:
+        merged_data.update(fresh_data)
+    merged_data.write()
+    merged_data.close()
+    baseline_data.close()
+    os.replace(merged_data_path, BASELINE_DATA_PATH)
+    fresh_data_path.unlink(missing_ok=True)
+
+    return True
+
+
+def run_incremental_code_coverage(
+    tester: str = "unittest",
+    base_ref: str = None,
+    timings_path: Path = None,
+    stream: bool = False,
+    log_path: Path = None,
+) -> pd.DataFrame | Iterator[CoverageRecord]:
+    """Runs tests impacted by changes since baseline was recorded and merges their coverage into baseline
+
+    Changed files are found by comparing file contents to the hashes stored in the test index when
+    the baseline was last updated (so uncommitted changes, and reverting them, are found). Tests run
+    in current process with coverage recording which test ran each line. If no baseline exists (or a
+    changed python file isn't in the test index), all tests are run and stored as the baseline.
+
+    Will send warning if the tests fail and return empty report
+
+    Args:
+        tester (str, optional): unit test package to use ("unittest" or "pytest"). Defaults to "unittest".
+        base_ref (str, optional): git reference to also treat files changed since as changed. Only
+            files changed since baseline was recorded if None. Defaults to None.
+        timings_path (Path, optional): file to write duration of each test to. Not recorded if None.
+            Defaults to None.
+        stream (bool, optional): whether to return report as streamed records instead of dataframe.
+            Defaults to False.
+        log_path (Path, optional): log file to write test output to. Console if None. Defaults to None.
+
+    Returns:
+        pd.DataFrame | Iterator[CoverageRecord]: coverage report as dataframe (or records) if tests
+            passing; empty report if tests failing
+    """
+
+    # Select the tests impacted by changes since baseline
+    test_index = read_test_index()
+    file_hashes = hash_source_files()
+    test_ids, changed_files = None, []
+    if (
+        test_index is not None
+        and test_index["tester"] == tester
+        and "hashes" in test_index
+        and BASELINE_DATA_PATH.is_file()
+    ):
+        changed_files = find_changed_files(test_index["hashes"], file_hashes)
+        if base_ref is not None:
+            changed_files = sorted(
+                {*changed_files, *git_functions.get_diff_hunks(base_ref)}
+            )
+        test_ids = select_impacted_tests(test_index, changed_files, tester)
+
+    # Check if any tests to run
+    if test_ids is None:
+        print("Running all tests to record baseline coverage.")
+    elif len(test_ids) == 0:
+        print("No tests impacted by changes. Using baseline coverage.")
+    else:
+        print(f"Running {len(test_ids)} tests impacted by changes since baseline.")
+
+    # Run the tests, merging their coverage into baseline (dropping data of changed files)
+    if test_ids is None or any(
+        file_path.endswith(".py") for file_path in changed_files
+    ):
+        if not run_impacted_tests(
+            tester, test_ids, changed_files, timings_path, log_path
+        ):
+            warnings.warn(f"Running {tester} tests in process failed!")
+            return unittest_coverage_functions.build_empty_report(stream)
+
+    # Update the test index
+    baseline_object = coverage.Coverage(data_file=str(BASELINE_DATA_PATH), source=["."])
+    baseline_object.load()
+    write_test_index(build_test_index(baseline_object.get_data(), tester, file_hashes))
+
+    # Build the report from the baseline data
+    return unittest_coverage_functions.build_coverage_report(
+        baseline_object,
+        unittest_coverage_functions.load_patterns_to_ignore_in_coverage(),
+        stream,
+    )
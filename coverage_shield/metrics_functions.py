@@ -0,0 +1,226 @@
+# Load required libraries
+import json  # writing metrics file
+import sys  # checking platform
+import time  # timing phases
+from contextlib import contextmanager  # recording phases with a with statement
+from datetime import datetime, timezone  # noting when metrics recorded
+from pathlib import Path  # handling file paths
+from typing import Iterator  # type hints
+
+try:
+    import resource  # measuring cpu time and peak memory (not on Windows)
+except ImportError:
+    resource = None
+
+# Version of metrics file format (increase if fields change)
+METRICS_FORMAT_VERSION = 1
+
+# Phases recorded so far (see record_phase()) and names of the phases currently running
+recorded_phases = []
+running_phases = []
+
+
+def convert_max_rss_to_mb(max_rss: int) -> float:
+    """Converts peak resident set size reported by resource.getrusage() to megabytes
+
+    Args:
+        max_rss (int): ru_maxrss value (kilobytes on Linux, bytes on macOS)
+
+    Returns:
+        float: peak resident set size in megabytes
+    """
+
+    bytes_per_unit = 1 if sys.platform == "darwin" else 1024
+
+    return max_rss * bytes_per_unit / (1024 * 1024)
+
+
+def measure_resources() -> dict[str, float]:
+    """Measures wall time, cpu time, and peak memory of current process and its finished child processes
+
+    Child process cpu time and memory only include children that have been waited for (e.g. by
+    subprocess.run()). Cpu time and memory are None where the resource module isn't available (Windows).
+
+    Returns:
+        dict[str, float]: wall_seconds (arbitrary start), cpu_seconds, child_cpu_seconds, peak_rss_mb,
+            and child_peak_rss_mb (largest child)
+    """
+
+    resources = {
+        "wall_seconds": time.perf_counter(),
+        "cpu_seconds": None,
+        "child_cpu_seconds": None,
+        "peak_rss_mb": None,
+        "child_peak_rss_mb": None,
+    }
+    if resource is not None:
+        self_usage = resource.getrusage(resource.RUSAGE_SELF)
+        child_usage = resource.getrusage(resource.RUSAGE_CHILDREN)
+        resources["cpu_seconds"] = self_usage.ru_utime + self_usage.ru_stime
+        resources["child_cpu_seconds"] = child_usage.ru_utime + child_usage.ru_stime
+        resources["peak_rss_mb"] = convert_max_rss_to_mb(self_usage.ru_maxrss)
+        resources["child_peak_rss_mb"] = convert_max_rss_to_mb(child_usage.ru_maxrss)
+
+    return resources
+
+
+def calculate_phase_metrics(
+    start_resources: dict[str, float], end_resources: dict[str, float]
+) -> dict[str, float]:
+    """Calculates resources used between two measurements (see measure_resources())
+
+    Times are differences and peak memory is the peak at the end (peaks never decrease).
+
+    Args:
+        start_resources (dict[str, float]): resources measured at start of phase
+        end_resources (dict[str, float]): resources measured at end of phase
+
+    Returns:
+        dict[str, float]: wall_seconds, cpu_seconds, child_cpu_seconds, peak_rss_mb, and
+            child_peak_rss_mb of phase (rounded)
+    """
+
+    phase_metrics = {}
+    for name, end_value in end_resources.items():
+        if end_value is None:
+            phase_metrics[name] = None
+        elif name.endswith("_seconds"):
+            phase_metrics[name] = round(end_value - start_resources[name], 4)
+        else:
+            phase_metrics[name] = round(end_value, 1)
+
+    return phase_metrics
+
+
+@contextmanager
+def record_phase(phase: str) -> Iterator[None]:
+    """Records wall time, cpu time, and peak memory of code run in with statement as a phase
+
+    Phases can be nested, in which case they're named by their path (e.g. "run_coverage/run_tests").
+    Phases are listed in the order they start and are recorded even if the code raises an error.
+
+    Args:
+        phase (str): name of phase
+    """
+
+    # Note phase (phases listed in the order they start)
+    running_phases.append(phase)
+    phase_metrics = {"phase": "/".join(running_phases)}
+    recorded_phases.append(phase_metrics)
+
+    start_resources = measure_resources()
+    try:
+        yield
+    finally:
+        phase_metrics.update(
+            calculate_phase_metrics(start_resources, measure_resources())
+        )
+        running_phases.pop()
+
+
+def reset_phases():
+    """Forgets phases recorded so far"""
+
+    recorded_phases.clear()
+    running_phases.clear()
+
+
+def build_metrics(
+    phases: [dict], total_metrics: dict[str, float], arguments: [str] = ()
+) -> dict:
+    """Builds metrics (for writing to file) from recorded phases
+
+    Args:
+        phases ([dict]): recorded phases (see record_phase())
+        total_metrics (dict[str, float]): resources used by the whole run (see calculate_phase_metrics())
+        arguments ([str], optional): command line arguments of run. Defaults to ().
+
+    Returns:
+        dict: metrics with format version, time recorded, arguments, total, and phases
+    """
+
+    return {
+        "version": METRICS_FORMAT_VERSION,
+        "recorded_at": datetime.now(timezone.utc).isoformat(timespec="seconds"),
+        "python": sys.version.split()[0],
+        "arguments": list(arguments),
+        "total": total_metrics,
+        "phases": phases,
+    }
+
+
+def write_metrics(metrics: dict, metrics_path: Path):
+    """Writes metrics to json file (creating its directory if needed)
+
+    Args:
+        metrics (dict): metrics (see build_metrics())
+        metrics_path (Path): path to json file
+    """
+
+    Path(metrics_path).parent.mkdir(parents=True, exist_ok=True)
+    with open(metrics_path, "w") as file:
+        json.dump(metrics, file, indent=4)
+
+
+def format_metrics_summary(metrics: dict) -> str:
+    """Formats metrics as a single summary line
+
+    Args:
+        metrics (dict): metrics (see build_metrics())
+
+    Returns:
+        str: summary like "coverage_shield 3.2s (cpu 0.4s + child 2.7s, peak 95MB) | run_coverage 3.0s | ..."
+    """
+
+    # Summarise whole run
+    total = metrics["total"]
+    summary = f"coverage_shield {total['wall_seconds']:.2f}s"
+    if total["cpu_seconds"] is not None:
+        peak_rss_mb = max(total["peak_rss_mb"], total["child_peak_rss_mb"])
+        summary += f" (cpu {total['cpu_seconds']:.2f}s + child {total['child_cpu_seconds']:.2f}s, peak {peak_rss_mb:.0f}MB)"
+
+    # Add top level phases (nested phases are in metrics file)
+    phase_summaries = [
+        f"{phase['phase']} {phase['wall_seconds']:.2f}s"
+        for phase in metrics["phases"]
+        if "/" not in phase["phase"]
+    ]
+
+    return " | ".join([summary, *phase_summaries])
+
+
+def sum_phase_times(
+    phase: str, phases: [dict] = None
+) -> tuple[float, float | None] | None:
+    """Sums wall time and cpu time (including child processes) of recorded phases with name
+
+    Args:
+        phase (str): name of phase (matched at any depth, e.g. "run_tests" matches "run_coverage/run_tests")
+        phases ([dict], optional): recorded phases (see record_phase()). Phases recorded so far if None.
+            Defaults to None.
+
+    Returns:
+        tuple[float, float | None] | None: wall seconds and cpu seconds (None if cpu time not measured,
+            e.g. on Windows), or None if no finished phases with name
+    """
+
+    phases = recorded_phases if phases is None else phases
+    matching_phases = [
+        phase_metrics
+        for phase_metrics in phases
+        if phase_metrics["phase"].split("/")[-1] == phase
+        and "wall_seconds" in phase_metrics
+    ]
+    if len(matching_phases) == 0:
+        return None
+
+    wall_seconds = sum(
+        phase_metrics["wall_seconds"] for phase_metrics in matching_phases
+    )
+    if any(phase_metrics["cpu_seconds"] is None for phase_metrics in matching_phases):
+        return wall_seconds, None
+
+    return wall_seconds, sum(
+        phase_metrics["cpu_seconds"] + phase_metrics["child_cpu_seconds"]
+        for phase_metrics in matching_phases
+    )
@@ -0,0 +1,180 @@
+# Load required libraries
+import codecs  # decoding output as it arrives
+import os  # building environment of command
+import subprocess  # running commands
+import sys  # writing to console
+from collections import deque  # keeping last lines of output
+from contextlib import (
+    contextmanager,
+    nullcontext,
+    redirect_stderr,
+    redirect_stdout,
+)  # sending output to console or log file
+from pathlib import Path  # handling file paths
+from typing import ContextManager, Iterator, NamedTuple, TextIO  # type hints
+
+# Number of lines of output kept for error messages (by default)
+DEFAULT_TAIL_LINES = 20
+
+# Bytes of output read at once and characters of a line kept (very long lines are cut)
+CHUNK_SIZE = 65536
+MAX_LINE_LENGTH = 10000
+
+
+class StreamedResult(NamedTuple):
+    """Result of a command whose output was streamed (see run_streamed_command())"""
+
+    returncode: int
+    tail: tuple[str, ...]
+
+
+def open_output(log_path: Path = None) -> ContextManager[TextIO]:
+    """Opens file to stream command output to
+
+    Args:
+        log_path (Path, optional): log file to write output to (overwritten). Output sent to console
+            (standard output) if None. Defaults to None.
+
+    Returns:
+        ContextManager[TextIO]: context manager providing file to write to (console isn't closed)
+    """
+
+    if log_path is None:
+        return nullcontext(sys.stdout)
+
+    return open(log_path, "w")
+
+
+@contextmanager
+def redirect_output(log_path: Path = None) -> Iterator[None]:
+    """Sends output written in python (standard output and error) to log file within with statement
+
+    Used for tests run in the current process, whose output is written as they run.
+
+    Args:
+        log_path (Path, optional): log file to write output to (overwritten). Output left going to
+            console if None. Defaults to None.
+    """
+
+    if log_path is None:
+        yield
+        return
+
+    with open(log_path, "w") as log_file, redirect_stdout(log_file), redirect_stderr(
+        log_file
+    ):
+        yield
+
+
+def run_streamed_command(
+    command: [str],
+    env: dict = None,
+    output: TextIO = None,
+    tail_lines: int = DEFAULT_TAIL_LINES,
+    prefix: str = "",
+) -> StreamedResult:
+    """Runs command writing its output (standard output and error) as it's produced
+
+    Only the last lines of output are kept in memory (for error messages), so memory use doesn't grow
+    with the amount of output. Python commands are run unbuffered so their progress (e.g. unittest's
+    dots) is seen live.
+
+    Args:
+        command ([str]): command to run
+        env (dict, optional): environment variables of command. Inherits environment if None. Defaults to None.
+        output (TextIO, optional): file to write output to. Console (standard output) if None. Defaults to None.
+        tail_lines (int, optional): number of last lines of output to keep. Defaults to DEFAULT_TAIL_LINES.
+        prefix (str, optional): text added to start of each line (e.g. to tell parallel commands
+            apart). Defaults to "".
+
+    Returns:
+        StreamedResult: return code and last lines of output
+    """
+
+    output = sys.stdout if output is None else output
+    tail = deque(maxlen=tail_lines)
+    decoder = codecs.getincrementaldecoder("utf-8")(errors="replace")
+    line = ""
+
+    # Run command (with standard error sent to standard output so both read in order)
+    with subprocess.Popen(
+        command,
+        stdout=subprocess.PIPE,
+        stderr=subprocess.STDOUT,
+        env={**(os.environ if env is None else env), "PYTHONUNBUFFERED": "1"},
+    ) as process:
+
+        # Write output as it arrives, so progress is shown before lines end (or line by line with a
+        # single write per line if prefixed, so lines of commands run in parallel aren't mixed)
+        while True:
+            chunk = process.stdout.read1(CHUNK_SIZE)
+            text = decoder.decode(chunk, final=len(chunk) == 0)
+            for part in text.splitlines(keepends=True):
+                line += part
+                if prefix == "":
+                    output.write(part)
+                if line.endswith("\n"):
+                    if prefix != "":
+                        output.write(f"{prefix}{line}")
+                    tail.append(line.rstrip("\r\n"))
+                    line = ""
+                elif len(line) > MAX_LINE_LENGTH:
+                    if prefix != "":
+                        output.write(f"{prefix}{line}\n")
+                        tail.append(line)
+                        line = ""
+                    else:
+                        line = line[-MAX_LINE_LENGTH:]
+            output.flush()
+            if len(chunk) == 0:
+                break
+
+    # Note any last line without a newline
+    if line != "":
+        if prefix != "":
+            output.write(f"{prefix}{line}\n")
+        tail.append(line)
+
+    return StreamedResult(process.returncode, tuple(tail))
+
+
+def copy_output(
+    file_path: Path, output: TextIO = None, tail_lines: int = DEFAULT_TAIL_LINES
+) -> tuple[str, ...]:
+    """Copies output saved in a file line by line (e.g. output of a forked worker)
+
+    Args:
+        file_path (Path): file containing output
+        output (TextIO, optional): file to write output to. Console (standard output) if None. Defaults to None.
+        tail_lines (int, optional): number of last lines of output to keep. Defaults to DEFAULT_TAIL_LINES.
+
+    Returns:
+        tuple[str, ...]: last lines of output
+    """
+
+    output = sys.stdout if output is None else output
+    tail = deque(maxlen=tail_lines)
+    if Path(file_path).is_file():
+        with open(file_path, errors="replace") as file:
+            for line in file:
+                output.write(line)
+                tail.append(line.rstrip("\n"))
+        output.flush()
+
+    return tuple(tail)
+
+
+def format_tail(tail: tuple[str, ...]) -> str:
+    """Formats last lines of output for an error message
+
+    Args:
+        tail (tuple[str, ...]): last lines of output
+
+    Returns:
+        str: lines under a heading (empty if no output)
+    """
+
+    if len(tail) == 0:
+        return ""
+
+    return f"\nLast {len(tail)} lines of output:\n" + "\n".join(tail)
@@ -0,0 +1,348 @@
+# Load required libraries
+import os  # counting cores, file sizes and finding test files
+import re  # matching test file and module names
+import subprocess  # collecting pytest tests in a separate process
+import sys  # finding current python interpreter
+import warnings  # send warnings
+import fnmatch  # matching test file names
+from pathlib import Path  # handling file paths
+from typing import TextIO  # type hints
+from concurrent.futures import (
+    ThreadPoolExecutor,
+)  # waiting on shard processes concurrently
+import numpy as np  # storing coverage statistics as compact arrays
+import coverage  # combining coverage data
+
+# Local imports
+from coverage_shield import profiling_functions
+from coverage_shield import metrics_functions
+from coverage_shield import output_functions
+from coverage_shield import covignore_functions
+
+
+def get_test_file_patterns(tester: str = "unittest") -> [str]:
+    """Gets file name patterns of test modules each tester discovers by default
+
+    Args:
+        tester (str, optional): unit test package to use ("unittest" or "pytest"). Defaults to "unittest".
+
+    Returns:
+        [str]: file name patterns
+    """
+
+    return ["test*.py"] if tester == "unittest" else ["test_*.py", "*_test.py"]
+
+
+def is_test_file(file_path: Path, tester: str = "unittest") -> bool:
+    """Checks if file name matches test modules tester discovers by default
+
+    Args:
+        file_path (Path): path to file
+        tester (str, optional): unit test package to use ("unittest" or "pytest"). Defaults to "unittest".
+
+    Returns:
+        bool: True if file is a test module and False otherwise
+    """
+
+    return any(
+        fnmatch.fnmatch(Path(file_path).name, file_pattern)
+        for file_pattern in get_test_file_patterns(tester)
+    )
+
+
+def convert_test_path(test_path: Path, tester: str = "unittest") -> str:
+    """Converts path to test module into the form the tester accepts on the command line
+
+    Args:
+        test_path (Path): path to test module relative to current directory
+        tester (str, optional): unit test package to use ("unittest" or "pytest"). Defaults to "unittest".
+
+    Returns:
+        str: dotted module name (unittest) or file path (pytest)
+    """
+
+    if tester == "unittest":
+        return ".".join(Path(test_path).with_suffix("").parts)
+
+    return str(test_path)
+
+
+def find_unittest_files(start_directory: Path = Path(".")) -> [Path]:
+    """Finds test files unittest discovers in directory (without importing them)
+
+    Follows the rules of unittest.TestLoader.discover(): only directories that are packages (have an
+    __init__.py) are searched and file names must be valid module names.
+
+    Args:
+        start_directory (Path, optional): directory to search. Defaults to Path(".").
+
+    Returns:
+        [Path]: paths to test files relative to start_directory
+    """
+
+    test_paths = []
+    for directory, directory_names, file_names in os.walk(start_directory):
+        directory_names[:] = sorted(
+            name
+            for name in directory_names
+            if not name.startswith(".")
+            and Path(directory, name, "__init__.py").is_file()
+        )
+        test_paths.extend(
+            Path(directory, file_name).relative_to(start_directory)
+            for file_name in sorted(file_names)
+            if re.fullmatch(r"[_a-z]\w*\.py", file_name, re.IGNORECASE)
+            and is_test_file(file_name, "unittest")
+        )
+
+    return test_paths
+
+
+def collect_pytest_files(start_directory: Path = Path(".")) -> [Path]:
+    """Finds test files pytest collects tests from in directory (using pytest's collection)
+
+    Collection runs in a separate process, so the test modules aren't imported by this one.
+
+    Args:
+        start_directory (Path, optional): directory to search. Defaults to Path(".").
+
+    Returns:
+        [Path]: paths to test files relative to start_directory
+    """
+
+    command_result = subprocess.run(
+        [
+            sys.executable,
+            "-m",
+            "pytest",
+            "--collect-only",
+            "-qq",
+            f"--rootdir={Path(start_directory).resolve()}",
+        ],
+        cwd=start_directory,
+        capture_output=True,
+        text=True,
+    )
+
+    # Check collection worked (exit code 5 means no tests found)
+    if command_result.returncode not in (0, 5):
+        tail = output_functions.format_tail(
+            tuple(
+                command_result.stdout.splitlines()[
+                    -output_functions.DEFAULT_TAIL_LINES :
+                ]
+            )
+        )
+        warnings.warn(
+            f"Collecting tests with pytest failed! Exit code: {command_result.returncode}.{tail}"
+        )
+
+    # Read the test files from the number of tests collected in each (e.g. "tests/test_one.py: 2")
+    return [
+        Path(match.group(1))
+        for match in re.finditer(
+            r"^(.+\.py): \d+$", command_result.stdout, re.MULTILINE
+        )
+    ]
+
+
+def discover_test_modules(
+    tester: str = "unittest", start_directory: Path = Path(".")
+) -> [str]:
+    """Finds test modules in directory in the form the tester accepts on the command line
+
+    Finds the same test modules running the tester discovers (see find_unittest_files() and
+    collect_pytest_files()).
+
+    Args:
+        tester (str, optional): unit test package to use ("unittest" or "pytest"). Defaults to "unittest".
+        start_directory (Path, optional): directory to search. Defaults to Path(".").
+
+    Returns:
+        [str]: dotted module names (unittest) or file paths (pytest) of test modules
+    """
+
+    # Find test files
+    if tester == "unittest":
+        test_paths = find_unittest_files(start_directory)
+    else:
+        test_paths = collect_pytest_files(start_directory)
+
+    return [convert_test_path(test_path, tester) for test_path in sorted(test_paths)]
+
+
+def split_into_shards(
+    test_modules: [str], module_sizes: [int], n_shards: int
+) -> [[str]]:
+    """Splits test modules into shards with similar total sizes
+
+    Modules are assigned largest first to the shard with the smallest total size so far.
+
+    Args:
+        test_modules ([str]): test modules to split
+        module_sizes ([int]): size of each module (e.g. file size) used to balance shards
+        n_shards (int): number of shards to create
+
+    Returns:
+        [[str]]: test modules in each (non-empty) shard
+    """
+
+    # Assign each module, largest first, to least loaded shard
+    shards = [[] for _ in range(n_shards)]
+    shard_sizes = np.zeros(n_shards, dtype=np.int64)
+    for index in np.argsort(module_sizes, kind="stable")[::-1]:
+        shard_index = int(np.argmin(shard_sizes))
+        shards[shard_index].append(test_modules[index])
+        shard_sizes[shard_index] += module_sizes[index]
+
+    return [shard for shard in shards if len(shard) > 0]
+
+
+def run_coverage_shard(
+    tester: str,
+    test_modules: [str],
+    timings_path: Path = None,
+    omit_patterns: [str] = (),
+    output: TextIO = None,
+    tail_lines: int = output_functions.DEFAULT_TAIL_LINES,
+    prefix: str = "",
+) -> output_functions.StreamedResult:
+    """Runs coverage on a shard of test modules writing a parallel (uniquely named) data file
+
+    Args:
+        tester (str): unit test package to use ("unittest" or "pytest")
+        test_modules ([str]): test modules to run
+        timings_path (Path, optional): file to write duration of each test to. Not recorded if None.
+            Defaults to None.
+        omit_patterns ([str], optional): coverage omit patterns of files not to trace. Defaults to ().
+        output (TextIO, optional): file to stream test output to. Console if None. Defaults to None.
+        tail_lines (int, optional): number of last lines of test output kept for warnings. Defaults
+            to output_functions.DEFAULT_TAIL_LINES.
+        prefix (str, optional): text added to start of each line of output. Defaults to "".
+
+    Returns:
+        output_functions.StreamedResult: return code and last lines of output of the coverage command
+    """
+
+    coverage_command = [
+        sys.executable,
+        "-m",
+        "coverage",
+        "run",
+        "--parallel-mode",
+        "--source=.",
+        *covignore_functions.build_omit_arguments(omit_patterns),
+        *profiling_functions.get_tester_arguments(tester, timings_path),
+        *test_modules,
+    ]
+
+    return output_functions.run_streamed_command(
+        coverage_command,
+        env=profiling_functions.get_timing_environment(timings_path),
+        output=output,
+        tail_lines=tail_lines,
+        prefix=prefix,
+    )
+
+
+def run_parallel_code_coverage(
+    tester: str = "unittest",
+    jobs: int = 0,
+    timings_path: Path = None,
+    omit_patterns: [str] = (),
+    log_path: Path = None,
+    tail_lines: int = output_functions.DEFAULT_TAIL_LINES,
+) -> coverage.Coverage:
+    """Runs test modules in parallel shards under coverage and combines the shard data
+
+    The output of each shard is streamed as the tests run, each line starting with the shard's
+    number (e.g. "[2] ").
+
+    Args:
+        tester (str, optional): unit test package to use ("unittest" or "pytest"). Defaults to "unittest".
+        jobs (int, optional): number of shards to run at once. Uses all cores if 0. Defaults to 0.
+        timings_path (Path, optional): file to write duration of each test (across all shards) to. Not
+            recorded if None. Defaults to None.
+        omit_patterns ([str], optional): coverage omit patterns of files not to trace. Defaults to ().
+        log_path (Path, optional): log file to write test output to. Console if None. Defaults to None.
+        tail_lines (int, optional): number of last lines of each shard's output kept for warnings.
+            Defaults to output_functions.DEFAULT_TAIL_LINES.
+
+    Returns:
+        coverage.Coverage: coverage object holding combined data or None if any shard failed
+    """
+
+    # Note number of jobs
+    jobs = os.cpu_count() if jobs == 0 else jobs
+
+    # Find and split the test modules
+    test_modules = discover_test_modules(tester)
+    if len(test_modules) == 0:
+        warnings.warn("No test modules found to run in parallel!")
+        return None
+    module_sizes = [
+        os.path.getsize(
+            module if tester == "pytest" else module.replace(".", os.sep) + ".py"
+        )
+        for module in test_modules
+    ]
+    shards = split_into_shards(test_modules, module_sizes, jobs)
+
+    # Remove data from previous runs
+    coverage_object = coverage.Coverage()
+    coverage_object.erase()
+
+    # Note where each shard writes its test durations
+    shard_timings_paths = [
+        None if timings_path is None else Path(f"{timings_path}.{index}")
+        for index in range(len(shards))
+    ]
+
+    # Run the shards
+    with output_functions.open_output(log_path) as output, ThreadPoolExecutor(
+        max_workers=jobs
+    ) as executor:
+        shard_results = list(
+            executor.map(
+                lambda index, shard, shard_timings_path: run_coverage_shard(
+                    tester,
+                    shard,
+                    shard_timings_path,
+                    omit_patterns,
+                    output,
+                    tail_lines,
+                    prefix=f"[{index + 1}] ",
+                ),
+                range(len(shards)),
+                shards,
+                shard_timings_paths,
+            )
+        )
+
+    # Merge the test durations from each shard
+    if timings_path is not None:
+        profiling_functions.write_test_durations(
+            profiling_functions.read_test_durations(shard_timings_paths),
+            timings_path,
+        )
+        for shard_timings_path in shard_timings_paths:
+            shard_timings_path.unlink(missing_ok=True)
+
+    # Check the results
+    shards_passed = True
+    for shard, shard_result in zip(shards, shard_results):
+        if shard_result.returncode != 0:
+            warnings.warn(
+                f"Running coverage on test modules ({', '.join(shard)}) failed! Return code: {shard_result.returncode}.{output_functions.format_tail(shard_result.tail)}"
+            )
+            shards_passed = False
+
+    if not shards_passed:
+        return None
+
+    # Combine the shard data files
+    with metrics_functions.record_phase("combine_coverage_data"):
+        coverage_object.combine()
+        coverage_object.save()
+
+    return coverage_object
@@ -0,0 +1,285 @@
+# Load required libraries
+from __future__ import annotations  # type hints not evaluated (lazy imports)
+import unittest  # running unittest tests
+import time  # timing tests
+import json  # reading and writing test durations
+import os  # reading environment variables
+import sys  # exiting with test status
+from pathlib import Path  # handling file paths
+from typing import TYPE_CHECKING  # importing modules only used in type hints
+
+if TYPE_CHECKING:
+    import pandas as pd  # working with dataframes
+
+# Environment variable used to tell test processes where to write test durations
+TIMINGS_PATH_VARIABLE = "COVERAGE_SHIELD_TIMINGS_PATH"
+
+# Durations recorded by pytest hooks when module used as pytest plugin (-p)
+pytest_test_durations = {}
+
+
+class TimedTextTestResult(unittest.TextTestResult):
+    """unittest result that also records the wall time of each test"""
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.test_durations = {}
+        self._test_start_time = None
+
+    def startTest(self, test):
+        self._test_start_time = time.perf_counter()
+        super().startTest(test)
+
+    def stopTest(self, test):
+        super().stopTest(test)
+        self.test_durations[test.id()] = time.perf_counter() - self._test_start_time
+
+
+class PytestTimingPlugin:
+    """pytest plugin that records the wall time (setup, call, and teardown) of each test"""
+
+    def __init__(self):
+        self.test_durations = {}
+
+    def pytest_runtest_logreport(self, report):
+        self.test_durations[report.nodeid] = (
+            self.test_durations.get(report.nodeid, 0.0) + report.duration
+        )
+
+
+def pytest_runtest_logreport(report):
+    """pytest hook recording test durations when module used as pytest plugin (-p)"""
+    pytest_test_durations[report.nodeid] = (
+        pytest_test_durations.get(report.nodeid, 0.0) + report.duration
+    )
+
+
+def pytest_sessionfinish(session):
+    """pytest hook writing test durations when module used as pytest plugin (-p)"""
+    timings_path = os.environ.get(TIMINGS_PATH_VARIABLE)
+    if timings_path is not None:
+        write_test_durations(pytest_test_durations, Path(timings_path))
+
+
+def get_tester_arguments(tester: str, timings_path: Path = None) -> [str]:
+    """Gets python command line arguments to run tester (recording test durations if requested)
+
+    Args:
+        tester (str): unit test package to use ("unittest" or "pytest")
+        timings_path (Path, optional): file to write test durations to. Test durations not recorded if
+            None. Defaults to None.
+
+    Returns:
+        [str]: python command line arguments to run tester
+    """
+
+    # Check if recording test durations
+    if timings_path is None:
+        return ["-m", tester]
+
+    # Use timed test runner (unittest) or timing plugin (pytest)
+    if tester == "pytest":
+        return ["-m", "pytest", "-p", "coverage_shield.profiling_functions"]
+    return ["-m", "coverage_shield.profiling_functions"]
+
+
+def get_timing_environment(timings_path: Path = None) -> dict:
+    """Gets environment for a test process telling it where to write test durations
+
+    Args:
+        timings_path (Path, optional): file to write test durations to. Defaults to None.
+
+    Returns:
+        dict: environment variables (None if not recording test durations, i.e. inherit environment)
+    """
+
+    if timings_path is None:
+        return None
+
+    return {**os.environ, TIMINGS_PATH_VARIABLE: str(timings_path)}
+
+
+def write_test_durations(test_durations: dict, timings_path: Path):
+    """Writes test durations to json file
+
+    Args:
+        test_durations (dict): duration (seconds) of each test
+        timings_path (Path): path to file
+    """
+
+    with open(timings_path, "w") as file:
+        json.dump(test_durations, file, separators=(",", ":"))
+
+
+def read_test_durations(timings_paths: [Path]) -> dict:
+    """Reads and merges test durations from json files (missing files are skipped)
+
+    Args:
+        timings_paths ([Path]): paths to files containing test durations
+
+    Returns:
+        dict: duration (seconds) of each test
+    """
+
+    test_durations = {}
+    for timings_path in timings_paths:
+        if Path(timings_path).is_file():
+            with open(timings_path) as file:
+                test_durations.update(json.load(file))
+
+    return test_durations
+
+
+def get_test_module(test_id: str) -> str:
+    """Gets module from test id
+
+    Args:
+        test_id (str): unittest test id (module.Class.method) or pytest node id (path::Class::function)
+
+    Returns:
+        str: test module
+    """
+
+    # pytest node ids start with module path
+    if "::" in test_id:
+        return test_id.split("::")[0]
+
+    # unittest ids end with class and method names
+    return ".".join(test_id.split(".")[:-2])
+
+
+def update_test_timing_history(
+    test_durations: dict,
+    run_duration: float,
+    history_path: Path = Path(".coverage_shield", "test_durations.json"),
+) -> dict:
+    """Stores test durations of latest run, keeping those of previous run for comparison
+
+    Args:
+        test_durations (dict): duration (seconds) of each test in latest run
+        run_duration (float): wall time (seconds) of whole coverage run
+        history_path (Path, optional): path to file storing test durations. Defaults to
+            Path(".coverage_shield", "test_durations.json").
+
+    Returns:
+        dict: previous ("previous") and latest ("latest") runs, each with test durations ("tests") and
+            run duration ("run_duration")
+    """
+
+    # Get latest run from history (will become previous run)
+    previous_run = None
+    if history_path.is_file():
+        with open(history_path) as file:
+            previous_run = json.load(file).get("latest")
+
+    # Store rounded durations to keep file compact
+    timing_history = {
+        "previous": previous_run,
+        "latest": {
+            "run_duration": round(run_duration, 4),
+            "tests": {
+                test_id: round(duration, 4)
+                for test_id, duration in test_durations.items()
+            },
+        },
+    }
+
+    # Write history to file
+    history_path.parent.mkdir(parents=True, exist_ok=True)
+    with open(history_path, "w") as file:
+        json.dump(timing_history, file, separators=(",", ":"))
+
+    return timing_history
+
+
+def build_hotspot_report(
+    timing_history: dict, top_n: int = 10, by_module: bool = False
+) -> pd.DataFrame:
+    """Ranks slowest tests (or test modules) from latest run
+
+    Args:
+        timing_history (dict): previous and latest runs (see update_test_timing_history())
+        top_n (int, optional): number of slowest tests to report. Defaults to 10.
+        by_module (bool, optional): whether to report test modules instead of tests. Defaults to False.
+
+    Returns:
+        pd.DataFrame: slowest tests with their duration ("Seconds"), share of total test time ("Share"),
+            and change in duration since previous run ("Change", NaN for new tests)
+    """
+
+    import pandas as pd  # working with dataframes (slow, so imported when needed)
+
+    # Get test durations for latest and previous runs
+    latest = pd.Series(timing_history["latest"]["tests"], dtype=float)
+    previous_run = timing_history["previous"]
+    previous = pd.Series(
+        {} if previous_run is None else previous_run["tests"], dtype=float
+    )
+
+    # Sum durations by module if requested
+    if by_module:
+        latest = latest.groupby(latest.index.map(get_test_module)).sum()
+        previous = previous.groupby(previous.index.map(get_test_module)).sum()
+
+    # Rank the tests
+    latest = latest.sort_values(ascending=False)
+    hotspot_report = pd.DataFrame(
+        {
+            "Test": latest.index,
+            "Seconds": latest.values,
+            "Share": latest.values / latest.sum() * 100 if latest.sum() > 0 else 0.0,
+            "Change": (latest - previous.reindex(latest.index)).values,
+        }
+    )
+    hotspot_report.index = hotspot_report.index + 1
+
+    return hotspot_report.head(top_n)
+
+
+def print_hotspot_report(timing_history: dict, top_n: int = 10):
+    """Prints slowest tests and test modules with the time spent outside the tests
+
+    Args:
+        timing_history (dict): previous and latest runs (see update_test_timing_history())
+        top_n (int, optional): number of slowest tests to report. Defaults to 10.
+    """
+
+    # Note time spent in tests and elsewhere (starting python, importing, tracing setup, and reporting)
+    latest_run = timing_history["latest"]
+    test_time = sum(latest_run["tests"].values())
+    overhead = latest_run["run_duration"] - test_time
+
+    print(
+        f"Coverage run took {latest_run['run_duration']:.3f}s: {test_time:.3f}s in tests and {overhead:.3f}s outside tests (including coverage overhead)"
+    )
+    print(
+        f"\nSlowest tests:\n{build_hotspot_report(timing_history, top_n).round(3).to_string()}"
+    )
+    print(
+        f"\nSlowest test modules:\n{build_hotspot_report(timing_history, top_n, by_module=True).round(3).to_string()}"
+    )
+
+
+def run_unittest_with_timings():
+    """Runs unittest (as python -m unittest would) recording test durations
+
+    Durations are written to file named in COVERAGE_SHIELD_TIMINGS_PATH environment variable.
+    """
+
+    # Run the tests
+    test_program = unittest.main(
+        module=None,
+        testRunner=unittest.TextTestRunner(resultclass=TimedTextTestResult),
+        exit=False,
+    )
+
+    # Write the test durations
+    timings_path = os.environ.get(TIMINGS_PATH_VARIABLE)
+    if timings_path is not None:
+        write_test_durations(test_program.result.test_durations, Path(timings_path))
+
+    sys.exit(not test_program.result.wasSuccessful())
+
+
+if __name__ == "__main__":
+    run_unittest_with_timings()
@@ -0,0 +1,619 @@
+# Load required libraries
+from __future__ import annotations  # type hints not evaluated (lazy imports)
+import heapq  # choosing tests that cover most lines per second first
+import json  # reading and writing reduced test suite
+import tempfile  # storing test durations temporarily
+import time  # timing test runs
+import warnings  # send warnings
+from pathlib import Path  # handling file paths
+from typing import TYPE_CHECKING, Iterable, Iterator, NamedTuple  # type hints
+import coverage  # measuring code coverage with test contexts
+
+if TYPE_CHECKING:
+    import pandas as pd  # working with dataframes
+
+# Local imports
+from coverage_shield import api_functions
+from coverage_shield import impact_functions
+from coverage_shield import unittest_coverage_functions
+from coverage_shield import profiling_functions
+from coverage_shield import output_functions
+from coverage_shield import coverage_data_functions
+from coverage_shield.coverage_data_functions import CoverageRecord
+
+# File storing reduced test suite
+REDUCED_TESTS_PATH = Path(".coverage_shield", "reduced_tests.json")
+
+# Largest number of tests the exact search is used for (it takes exponential time)
+EXACT_MAX_TESTS = 25
+
+# Duration given to tests too quick to time (so every test has a cost)
+MIN_DURATION = 1e-6
+
+
+class TestSelection(NamedTuple):
+    """Tests selected to cover the same lines as the full test suite (see select_tests())
+
+    duration is the summed duration of the selected tests, full_duration that of all tests, and
+    n_lines the number of lines run by the tests. exact is True if the selection has the smallest
+    possible duration (rather than found by the greedy search). test_files are the files tests are
+    defined in, whose lines aren't covered (only the code under test is).
+    """
+
+    tests: tuple[str, ...]
+    duration: float
+    full_duration: float
+    n_lines: int
+    exact: bool
+    test_files: tuple[str, ...]
+
+
+def get_test_file(test_id: str) -> str:
+    """Gets path of file test is defined in
+
+    Args:
+        test_id (str): unittest test id (module.Class.method) or pytest node id (path::Class::function)
+
+    Returns:
+        str: path to test module (using forward slashes)
+    """
+
+    test_module = profiling_functions.get_test_module(test_id)
+    if test_module.endswith(".py"):
+        return test_module
+
+    return test_module.replace(".", "/") + ".py"
+
+
+def build_test_line_sets(test_index: dict) -> dict[str, int]:
+    """Builds set of lines each test runs (as bits of an integer, so sets are combined quickly)
+
+    Lines of the files tests are defined in are left out (the lines of each test are only run by that
+    test, so every test would be needed to cover them). Lines run outside tests (e.g. module level
+    code run on import) are counted as a single line of their file, run by any test that runs other
+    lines of the file (so the file is imported when only the selected tests are run).
+
+    Args:
+        test_index (dict): test index (see impact_functions.build_test_index())
+
+    Returns:
+        dict[str, int]: lines run by each test, with a bit set for each (file, line) it runs
+    """
+
+    # Note tests defined in each file and position of lines run outside tests
+    file_tests_defined = {}
+    for test_position, test_id in enumerate(test_index["tests"]):
+        if test_id != "":
+            file_tests_defined.setdefault(get_test_file(test_id), []).append(
+                test_position
+            )
+    outside_position = (
+        str(test_index["tests"].index("")) if "" in test_index["tests"] else None
+    )
+
+    # Number each line run by any test
+    line_positions, test_positions = {}, {}
+    for file_path, file_tests in test_index["files"].items():
+        if file_path in file_tests_defined:
+            continue
+        for test_position, line_ranges in file_tests.items():
+            if test_position == outside_position:
+                continue
+            positions = test_positions.setdefault(int(test_position), [])
+            for start, end in line_ranges:
+                for line in range(start, end + 1):
+                    positions.append(
+                        line_positions.setdefault(
+                            (file_path, line), len(line_positions)
+                        )
+                    )
+
+        # Note tests that import file (if lines run outside tests)
+        if outside_position in file_tests:
+            import_position = line_positions.setdefault(
+                (file_path, None), len(line_positions)
+            )
+            importing_positions = {
+                int(test_position)
+                for test_position in file_tests
+                if test_position != outside_position
+            }
+            for test_position in importing_positions:
+                test_positions.setdefault(test_position, []).append(import_position)
+
+    # Convert each test's lines into bits
+    n_bytes = (len(line_positions) + 7) // 8
+    test_lines = {}
+    for test_position, positions in test_positions.items():
+        bits = bytearray(n_bytes)
+        for position in positions:
+            bits[position >> 3] |= 1 << (position & 7)
+        test_lines[test_index["tests"][test_position]] = int.from_bytes(bits, "little")
+
+    return test_lines
+
+
+def remove_redundant_tests(
+    selected_tests: [str], test_lines: dict[str, int], test_durations: dict[str, float]
+) -> [str]:
+    """Removes selected tests whose lines are all run by other selected tests (slowest first)
+
+    Args:
+        selected_tests ([str]): selected tests
+        test_lines (dict[str, int]): lines run by each test (see build_test_line_sets())
+        test_durations (dict[str, float]): duration of each test
+
+    Returns:
+        [str]: selected tests without redundant tests
+    """
+
+    selected_tests = list(selected_tests)
+    for test_id in sorted(selected_tests, key=lambda test_id: -test_durations[test_id]):
+        other_lines = 0
+        for other_test_id in selected_tests:
+            if other_test_id != test_id:
+                other_lines |= test_lines[other_test_id]
+        if test_lines[test_id] & ~other_lines == 0:
+            selected_tests.remove(test_id)
+
+    return selected_tests
+
+
+def select_tests_greedy(
+    test_lines: dict[str, int], test_durations: dict[str, float]
+) -> [str]:
+    """Selects tests covering all lines by repeatedly choosing the test covering most new lines per second
+
+    Args:
+        test_lines (dict[str, int]): lines run by each test (see build_test_line_sets())
+        test_durations (dict[str, float]): duration of each test
+
+    Returns:
+        [str]: selected tests
+    """
+
+    # Note lines left to cover and queue tests by lines covered per second (best first)
+    uncovered = 0
+    for lines in test_lines.values():
+        uncovered |= lines
+    queue = [
+        (-lines.bit_count() / test_durations[test_id], test_id)
+        for test_id, lines in test_lines.items()
+    ]
+    heapq.heapify(queue)
+
+    # Choose tests until all lines covered (rescoring queued tests only when they reach the front,
+    # as a test's score never increases)
+    selected_tests = []
+    while uncovered != 0 and len(queue) > 0:
+        _, test_id = heapq.heappop(queue)
+        new_lines = test_lines[test_id] & uncovered
+        if new_lines == 0:
+            continue
+        score = -new_lines.bit_count() / test_durations[test_id]
+        if len(queue) > 0 and score > queue[0][0]:
+            heapq.heappush(queue, (score, test_id))
+            continue
+        selected_tests.append(test_id)
+        uncovered &= ~new_lines
+
+    return remove_redundant_tests(selected_tests, test_lines, test_durations)
+
+
+def select_tests_exact(
+    test_lines: dict[str, int],
+    test_durations: dict[str, float],
+    initial_tests: [str] = None,
+) -> [str]:
+    """Selects quickest tests covering all lines by searching every combination (branch and bound)
+
+    Takes exponential time, so only suitable for small test suites (see EXACT_MAX_TESTS).
+
+    Args:
+        test_lines (dict[str, int]): lines run by each test (see build_test_line_sets())
+        test_durations (dict[str, float]): duration of each test
+        initial_tests ([str], optional): tests covering all lines (e.g. from select_tests_greedy()),
+            whose duration bounds the search. Defaults to None.
+
+    Returns:
+        [str]: selected tests
+    """
+
+    # Start from initial selection (if provided)
+    all_lines = 0
+    for lines in test_lines.values():
+        all_lines |= lines
+    best_tests = list(test_lines) if initial_tests is None else list(initial_tests)
+    best_duration = [sum(test_durations[test_id] for test_id in best_tests)]
+    test_ids = sorted(test_lines, key=lambda test_id: test_durations[test_id])
+
+    def search(uncovered: int, selected_tests: [str], duration: float):
+
+        # Stop if selection can't be quicker than best found
+        if duration >= best_duration[0]:
+            return
+        if uncovered == 0:
+            best_tests[:] = selected_tests
+            best_duration[0] = duration
+            return
+
+        # Branch on each test covering the first uncovered line (one of them must be selected)
+        first_line = uncovered & -uncovered
+        for test_id in test_ids:
+            if test_lines[test_id] & first_line:
+                search(
+                    uncovered & ~test_lines[test_id],
+                    selected_tests + [test_id],
+                    duration + test_durations[test_id],
+                )
+
+    search(all_lines, [], 0.0)
+
+    return best_tests
+
+
+def select_tests(
+    test_index: dict, test_durations: dict[str, float], mode: str = "greedy"
+) -> TestSelection:
+    """Selects quickest tests that run the same lines as the full test suite (weighted set cover)
+
+    Args:
+        test_index (dict): test index (see impact_functions.build_test_index())
+        test_durations (dict[str, float]): duration (seconds) of each test
+        mode (str, optional): "greedy" (quick, near optimal) or "exact" (quickest selection, used if
+            the suite has at most EXACT_MAX_TESTS tests covering lines). Defaults to "greedy".
+
+    Returns:
+        TestSelection: selected tests and their duration
+    """
+
+    # Check mode option provided
+    mode_options = ["greedy", "exact"]
+    if not mode in mode_options:
+        raise ValueError(
+            f"The reduction mode provided ({mode}) was not recognised. Must be one of: {', '.join(mode_options)}"
+        )
+
+    # Build lines and durations of each test
+    test_lines = build_test_line_sets(test_index)
+    test_lines = {test_id: lines for test_id, lines in test_lines.items() if lines != 0}
+    durations = {
+        test_id: max(test_durations.get(test_id, 0.0), MIN_DURATION)
+        for test_id in test_lines
+    }
+    all_lines = 0
+    for lines in test_lines.values():
+        all_lines |= lines
+
+    # Select tests
+    selected_tests = select_tests_greedy(test_lines, durations)
+    exact = mode == "exact" and len(test_lines) <= EXACT_MAX_TESTS
+    if exact:
+        selected_tests = select_tests_exact(test_lines, durations, selected_tests)
+
+    return TestSelection(
+        tuple(sorted(selected_tests)),
+        sum(durations[test_id] for test_id in selected_tests),
+        sum(test_durations.values()),
+        all_lines.bit_count(),
+        exact,
+        tuple(
+            sorted(
+                {
+                    get_test_file(test_id)
+                    for test_id in test_index["tests"]
+                    if test_id != ""
+                }
+            )
+        ),
+    )
+
+
+def get_tested_code_patterns(
+    test_files: [str], patterns_to_ignore: [str] = None
+) -> [str]:
+    """Adds patterns ignoring the files tests are defined in to patterns to ignore, so reports only
+    hold the code under test (whose coverage the reduced test suite keeps and is compared on)
+
+    Args:
+        test_files ([str]): files tests are defined in (see TestSelection)
+        patterns_to_ignore ([str], optional): .covignore (gitignore style) patterns. Defaults to None.
+
+    Returns:
+        [str]: patterns to ignore (None if none)
+    """
+
+    patterns = [
+        *([] if patterns_to_ignore is None else patterns_to_ignore),
+        *(f"/{test_file}" for test_file in test_files),
+    ]
+
+    return None if len(patterns) == 0 else patterns
+
+
+def build_reduced_coverage_records(
+    coverage_records: Iterable[CoverageRecord],
+    test_selection: TestSelection,
+    test_file_records: [CoverageRecord],
+) -> tuple[[CoverageRecord], CoverageRecord | None]:
+    """Builds coverage report of reduced test suite from its coverage of the code under test and the
+    full test suite's coverage of the files tests are defined in
+
+    The tests that weren't selected don't run, so the files tests are defined in are taken from the
+    full test suite (the report then matches the full test suite's if the code under test's does).
+
+    Args:
+        coverage_records (Iterable[CoverageRecord]): statistics of each file by reduced test suite
+        test_selection (TestSelection): selected tests
+        test_file_records ([CoverageRecord]): statistics of each file tests are defined in by full
+            test suite
+
+    Returns:
+        tuple[[CoverageRecord], CoverageRecord | None]: statistics of each file and total statistics
+            of code under test by reduced test suite (empty report and None if it failed)
+    """
+
+    # Keep the code under test
+    tested_records = list(
+        coverage_data_functions.filter_coverage_records(
+            coverage_records, get_tested_code_patterns(test_selection.test_files)
+        )
+    )
+    if len(tested_records) == 0:
+        return [], None
+
+    # Add the files tests are defined in (unless now ignored)
+    coverage_records = sorted(
+        [
+            *tested_records,
+            *coverage_data_functions.filter_coverage_records(
+                test_file_records,
+                unittest_coverage_functions.load_patterns_to_ignore_in_coverage(),
+            ),
+        ],
+        key=lambda coverage_record: coverage_record.name,
+    )
+
+    return coverage_records, unittest_coverage_functions.calculate_coverage_total(
+        tested_records
+    )
+
+
+def write_test_selection(
+    test_selection: TestSelection,
+    tester: str,
+    coverage_total: CoverageRecord,
+    test_file_records: [CoverageRecord] = (),
+    selection_path: Path = REDUCED_TESTS_PATH,
+):
+    """Writes reduced test suite (and coverage of full test suite) to json file
+
+    Args:
+        test_selection (TestSelection): selected tests
+        tester (str): unit test package tests were selected for
+        coverage_total (CoverageRecord): total statistics of code under test by full test suite
+        test_file_records ([CoverageRecord], optional): statistics of each file tests are defined in
+            by full test suite. Defaults to ().
+        selection_path (Path, optional): path to file. Defaults to REDUCED_TESTS_PATH.
+    """
+
+    selection_path.parent.mkdir(parents=True, exist_ok=True)
+    with open(selection_path, "w") as file:
+        json.dump(
+            {
+                "tester": tester,
+                **test_selection._asdict(),
+                "statements": coverage_total.statements,
+                "missed": coverage_total.missed,
+                "test_file_records": [list(record) for record in test_file_records],
+            },
+            file,
+            indent=1,
+        )
+
+
+def read_test_selection(
+    tester: str, selection_path: Path = REDUCED_TESTS_PATH
+) -> tuple[TestSelection, CoverageRecord, [CoverageRecord]] | None:
+    """Reads reduced test suite (and coverage of full test suite) from json file
+
+    Args:
+        tester (str): unit test package to use
+        selection_path (Path, optional): path to file. Defaults to REDUCED_TESTS_PATH.
+
+    Returns:
+        tuple[TestSelection, CoverageRecord, [CoverageRecord]] | None: selected tests, total
+            statistics of code under test by full test suite, and statistics of each file tests are
+            defined in by full test suite, or None if no tests selected for tester
+    """
+
+    if not selection_path.is_file():
+        return None
+    with open(selection_path) as file:
+        selection = json.load(file)
+    if selection["tester"] != tester or "test_file_records" not in selection:
+        return None
+
+    return (
+        TestSelection(
+            tuple(selection["tests"]),
+            selection["duration"],
+            selection["full_duration"],
+            selection["n_lines"],
+            selection["exact"],
+            tuple(selection["test_files"]),
+        ),
+        CoverageRecord("TOTAL", selection["statements"], selection["missed"], 0, 0),
+        [CoverageRecord(*record) for record in selection["test_file_records"]],
+    )
+
+
+def format_reduction_summary(
+    test_selection: TestSelection,
+    full_total: CoverageRecord,
+    reduced_total: CoverageRecord,
+    reduced_seconds: float = None,
+) -> str:
+    """Formats time saved by reduced test suite and whether its coverage matches full test suite
+
+    Coverage is compared for the code under test only (see get_tested_code_patterns()).
+
+    Args:
+        test_selection (TestSelection): selected tests
+        full_total (CoverageRecord): total statistics of code under test by full test suite
+        reduced_total (CoverageRecord): total statistics of code under test by reduced test suite
+            (None if it failed)
+        reduced_seconds (float, optional): seconds taken to run reduced test suite (with coverage).
+            Not reported if None. Defaults to None.
+
+    Returns:
+        str: summary
+    """
+
+    # Report time saved
+    saving = (
+        1 - test_selection.duration / test_selection.full_duration
+        if test_selection.full_duration > 0
+        else 0
+    )
+    summary = (
+        f"Reduced test suite ({'exact' if test_selection.exact else 'greedy'}): "
+        f"{len(test_selection.tests)} tests taking {test_selection.duration:.2f}s of "
+        f"{test_selection.full_duration:.2f}s ({saving:.0%} saved)"
+    )
+    if reduced_seconds is not None:
+        summary += f", run in {reduced_seconds:.2f}s"
+
+    # Report whether coverage matches
+    if reduced_total is None:
+        return summary + ". Reduced test suite failed."
+    reduced_coverage = api_functions.calculate_coverage_percentage(reduced_total)
+    if (reduced_total.statements, reduced_total.missed) == (
+        full_total.statements,
+        full_total.missed,
+    ):
+        return summary + f". Coverage matches full test suite ({reduced_coverage}%)."
+
+    return (
+        summary
+        + f". Coverage doesn't match full test suite ({reduced_coverage}% vs "
+        + f"{api_functions.calculate_coverage_percentage(full_total)}%, "
+        + f"{reduced_total.missed - full_total.missed:+d} missed statements)."
+    )
+
+
+def run_reduced_code_coverage(
+    tester: str = "unittest",
+    mode: str = "greedy",
+    timings_path: Path = None,
+    stream: bool = False,
+    log_path: Path = None,
+) -> pd.DataFrame | Iterator[CoverageRecord]:
+    """Runs full test suite recording lines and duration of each test, selects quickest tests covering
+    the same lines, and checks their coverage matches
+
+    Tests run in current process and the full test suite's coverage data are saved (as coverage run
+    would). The selected tests are stored in REDUCED_TESTS_PATH (see run_code_coverage() test_ids to
+    run them), along with the full test suite's coverage of the files tests are defined in (see
+    build_reduced_coverage_records()). Coverage is compared for the code under test only (see
+    get_tested_code_patterns()).
+
+    Will send warning if the tests fail and return empty report
+
+    Args:
+        tester (str, optional): unit test package to use ("unittest" or "pytest"). Defaults to "unittest".
+        mode (str, optional): "greedy" or "exact" (see select_tests()). Defaults to "greedy".
+        timings_path (Path, optional): json file to also keep the duration of each test in (see
+            profiling_functions.read_test_durations()). Temporary if None. Defaults to None.
+        stream (bool, optional): whether to return report as streamed records instead of dataframe.
+            Defaults to False.
+        log_path (Path, optional): log file to write test output to. Console if None. Defaults to None.
+
+    Returns:
+        pd.DataFrame | Iterator[CoverageRecord]: coverage report of full test suite as dataframe (or
+            records) if tests passing; empty report if tests failing
+    """
+
+    patterns_to_ignore = (
+        unittest_coverage_functions.load_patterns_to_ignore_in_coverage()
+    )
+    omit_patterns = unittest_coverage_functions.get_omit_patterns()
+
+    # Run all tests, recording which test ran each line and how long each test took
+    with tempfile.TemporaryDirectory() as temporary_directory:
+        if timings_path is None:
+            timings_path = Path(temporary_directory, "test_durations.json")
+        coverage_object = coverage.Coverage(source=["."], omit=omit_patterns)
+        coverage_object.set_option("run:dynamic_context", "test_function")
+        with output_functions.redirect_output(log_path):
+            tests_passed = unittest_coverage_functions.measure_tests_in_process(
+                coverage_object, tester, timings_path
+            )
+        coverage_object.save()
+        if not tests_passed:
+            warnings.warn(f"Running {tester} tests in process failed!")
+            return unittest_coverage_functions.build_empty_report(stream)
+
+        # Select the tests
+        test_selection = select_tests(
+            impact_functions.build_test_index(coverage_object.get_data(), tester),
+            profiling_functions.read_test_durations([timings_path]),
+            mode,
+        )
+        tested_code_patterns = get_tested_code_patterns(
+            test_selection.test_files, patterns_to_ignore
+        )
+        full_records = list(
+            unittest_coverage_functions.build_coverage_records(
+                coverage_object, patterns_to_ignore
+            )
+        )
+        tested_records = list(
+            coverage_data_functions.filter_coverage_records(
+                full_records, tested_code_patterns
+            )
+        )
+        full_total = unittest_coverage_functions.calculate_coverage_total(
+            tested_records
+        )
+        write_test_selection(
+            test_selection,
+            tester,
+            full_total,
+            [record for record in full_records if record not in tested_records],
+        )
+
+        # Check selected tests reach same coverage (data kept in memory, durations recorded so the
+        # same code runs as for the full test suite)
+        reduced_object = coverage.Coverage(
+            data_file=None, source=["."], omit=omit_patterns
+        )
+        start_time = time.perf_counter()
+        with output_functions.redirect_output(log_path):
+            reduced_passed = unittest_coverage_functions.measure_tests_in_process(
+                reduced_object,
+                tester,
+                Path(temporary_directory, "reduced_test_durations.json"),
+                list(test_selection.tests),
+            )
+            reduced_object.get_data()  # collect measured data
+        reduced_seconds = time.perf_counter() - start_time
+    reduced_total = (
+        unittest_coverage_functions.calculate_coverage_total(
+            unittest_coverage_functions.build_coverage_records(
+                reduced_object, tested_code_patterns
+            )
+        )
+        if reduced_passed
+        else None
+    )
+    print(
+        format_reduction_summary(
+            test_selection, full_total, reduced_total, reduced_seconds
+        )
+    )
+
+    # Build the report of the full test suite
+    return unittest_coverage_functions.build_coverage_report(
+        coverage_object, patterns_to_ignore, stream
+    )
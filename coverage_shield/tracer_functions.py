@@ -0,0 +1,225 @@
+# Load required libraries
+import os  # setting coverage core environment variable
+import sys  # checking python version and getting python executable
+import importlib.util  # checking C tracer is installed
+import warnings  # send warnings
+from contextlib import contextmanager  # choosing core within a with statement
+from pathlib import Path  # handling file paths
+from typing import Iterator  # type hints
+
+# Local imports
+from coverage_shield import profiling_functions
+from coverage_shield import metrics_functions
+from coverage_shield import output_functions
+
+# Environment variable coverage reads its measurement core from (inherited by test processes)
+CORE_VARIABLE = "COVERAGE_CORE"
+
+# Measurement cores (fastest first) and option to pick the fastest available
+CORES = ["sysmon", "ctrace", "pytrace"]
+CORE_OPTIONS = ["auto", *CORES]
+
+
+def get_available_cores(branch: bool = False, dynamic_contexts: bool = False) -> [str]:
+    """Gets measurement cores coverage can use on the current interpreter (fastest first)
+
+    - sysmon: sys.monitoring (python 3.12+, and 3.14+ for branch coverage), without dynamic contexts
+    - ctrace: C tracer (if coverage was installed with its compiled extension)
+    - pytrace: python tracer (always available, but slowest)
+
+    Args:
+        branch (bool, optional): whether branch coverage is measured. Defaults to False.
+        dynamic_contexts (bool, optional): whether dynamic contexts (e.g. the test running each line)
+            are recorded. Defaults to False.
+
+    Returns:
+        [str]: names of available cores
+    """
+
+    available_cores = []
+    if sys.version_info >= ((3, 14) if branch else (3, 12)) and not dynamic_contexts:
+        available_cores.append("sysmon")
+    if importlib.util.find_spec("coverage.tracer") is not None:
+        available_cores.append("ctrace")
+    available_cores.append("pytrace")
+
+    return available_cores
+
+
+def choose_core(
+    core: str = "auto", branch: bool = False, dynamic_contexts: bool = False
+) -> str:
+    """Chooses measurement core, checking it's available
+
+    Args:
+        core (str, optional): core to use (see CORE_OPTIONS), or "auto" for the fastest available.
+            Defaults to "auto".
+        branch (bool, optional): whether branch coverage is measured. Defaults to False.
+        dynamic_contexts (bool, optional): whether dynamic contexts are recorded. Defaults to False.
+
+    Returns:
+        str: name of core
+    """
+
+    # Check core option provided
+    if not core in CORE_OPTIONS:
+        raise ValueError(
+            f"The core option provided ({core}) was not recognised. Must be one of: {', '.join(CORE_OPTIONS)}"
+        )
+
+    # Check core available
+    available_cores = get_available_cores(branch, dynamic_contexts)
+    if core == "auto":
+        return available_cores[0]
+    if not core in available_cores:
+        raise ValueError(
+            f"The {core} core isn't available on this python ({sys.version.split()[0]}) for this run. Available cores: {', '.join(available_cores)}"
+        )
+
+    return core
+
+
+def is_branch_measured() -> bool:
+    """Checks if coverage configuration (e.g. .coveragerc) in current directory measures branches
+
+    Returns:
+        bool: True if branch coverage measured and False otherwise
+    """
+
+    import coverage  # reading coverage configuration (imported when needed so cached runs start quickly)
+
+    return bool(coverage.Coverage().config.branch)
+
+
+@contextmanager
+def use_core(core: str = None) -> Iterator[None]:
+    """Sets measurement core used by coverage (in this and test processes) within with statement
+
+    Args:
+        core (str, optional): name of core (see choose_core()). Coverage's default core used if None.
+            Defaults to None.
+    """
+
+    if core is None:
+        yield
+        return
+
+    previous_core = os.environ.get(CORE_VARIABLE)
+    os.environ[CORE_VARIABLE] = core
+    try:
+        yield
+    finally:
+        if previous_core is None:
+            del os.environ[CORE_VARIABLE]
+        else:
+            os.environ[CORE_VARIABLE] = previous_core
+
+
+def run_uninstrumented_tests(
+    tester: str = "unittest",
+    engine: str = "api",
+    jobs: int = 1,
+    test_ids: [str] = None,
+    tail_lines: int = output_functions.DEFAULT_TAIL_LINES,
+) -> bool:
+    """Runs unit tests without coverage (output hidden), as a baseline to measure tracing overhead
+
+    The tests run the way the engine runs them with coverage, so the baseline has the same start up
+    costs: in the current process for the "api" engine (one job), and in a separate python process
+    otherwise. Recorded as the "uninstrumented_tests" phase (see metrics_functions.record_phase()).
+
+    Will send warning if the tests fail
+
+    Args:
+        tester (str, optional): unit test package to use ("unittest" or "pytest"). Defaults to "unittest".
+        engine (str, optional): engine the tests were run with coverage by (see
+            unittest_coverage_functions.run_code_coverage()). Defaults to "api".
+        jobs (int, optional): number of processes the tests were run with coverage in. Defaults to 1.
+        test_ids ([str], optional): ids of tests to run. Runs all tests if None. Defaults to None.
+        tail_lines (int, optional): number of last lines of test output kept for warnings. Defaults
+            to output_functions.DEFAULT_TAIL_LINES.
+
+    Returns:
+        bool: True if tests passed and False otherwise
+    """
+
+    # Run the tests in the current process (as the api engine does)
+    if engine == "api" and jobs == 1:
+        from coverage_shield import unittest_coverage_functions  # imports coverage
+
+        with metrics_functions.record_phase(
+            "uninstrumented_tests"
+        ), output_functions.redirect_output(Path(os.devnull)):
+            tests_passed = unittest_coverage_functions.measure_tests_in_process(
+                None, tester, test_ids=test_ids
+            )
+        if not tests_passed:
+            warnings.warn(f"Running {tester} tests in process without coverage failed!")
+        return tests_passed
+
+    # Run the tests in a separate python process
+    test_command = [
+        sys.executable,
+        *profiling_functions.get_tester_arguments(tester),
+        *([] if test_ids is None else test_ids),
+    ]
+    with metrics_functions.record_phase("uninstrumented_tests"), open(
+        os.devnull, "w"
+    ) as output:
+        result = output_functions.run_streamed_command(
+            test_command, output=output, tail_lines=tail_lines
+        )
+    if result.returncode != 0:
+        warnings.warn(
+            f"Running {tester} tests without coverage failed! Return code: {result.returncode}.{output_functions.format_tail(result.tail)}"
+        )
+        return False
+
+    return True
+
+
+def format_overhead_summary(
+    core: str,
+    instrumented_times: tuple[float, float | None],
+    uninstrumented_times: tuple[float, float | None],
+) -> str:
+    """Formats how much slower tests were with coverage than without (their tracing overhead)
+
+    The overhead is calculated from cpu time (including test processes) where measured, so it doesn't
+    depend on how many processes the tests were split across, and from wall time otherwise.
+
+    Args:
+        core (str): name of core used (None for coverage's default)
+        instrumented_times (tuple[float, float | None]): wall and cpu seconds of tests with coverage
+            (see metrics_functions.sum_phase_times())
+        uninstrumented_times (tuple[float, float | None]): wall and cpu seconds of tests without coverage
+
+    Returns:
+        str: summary
+    """
+
+    # Note times compared
+    instrumented_wall, instrumented_cpu = instrumented_times
+    uninstrumented_wall, uninstrumented_cpu = uninstrumented_times
+    if instrumented_cpu is not None and uninstrumented_cpu is not None:
+        instrumented, uninstrumented, measure = (
+            instrumented_cpu,
+            uninstrumented_cpu,
+            "cpu",
+        )
+    else:
+        instrumented, uninstrumented, measure = (
+            instrumented_wall,
+            uninstrumented_wall,
+            "wall",
+        )
+
+    # Calculate overhead
+    overhead = (
+        f"{instrumented / uninstrumented - 1:+.0%}" if uninstrumented > 0 else "n/a"
+    )
+
+    return (
+        f"Tracing overhead ({'default' if core is None else core} core): {overhead} {measure} time "
+        f"(tests took {instrumented_wall:.2f}s with coverage and {uninstrumented_wall:.2f}s without)"
+    )
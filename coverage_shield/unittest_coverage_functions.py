@@ -1,12 +1,31 @@
 # Load required libraries
+from __future__ import annotations  # type hints not evaluated (lazy imports)
 import subprocess  # command line commands
-import coverage  # not used directly but run in command line
+import coverage  # measuring code coverage (in process or in command line)
+import unittest  # running unittest tests in process
+import sys  # accessing loaded modules, python path, and python executable
+import os  # getting current working directory
 from io import StringIO  # reading byte string (returned by coverage)
-import pandas as pd  # working with dataframes
 from pathlib import Path  # handling file paths
 import re  # working with regular expressions
+import functools  # caching compiled patterns
+import shutil  # copying file permissions
+import tempfile  # writing files atomically
 import warnings  # send warnings
-import seaborn  # create colour palette
+from typing import TYPE_CHECKING, Iterable, Iterator  # type hints
+
+if TYPE_CHECKING:
+    import pandas as pd  # working with dataframes
+
+# Local imports
+from coverage_shield import coverage_data_functions
+from coverage_shield import parallel_coverage_functions
+from coverage_shield import profiling_functions
+from coverage_shield import covignore_functions
+from coverage_shield import metrics_functions
+from coverage_shield import output_functions
+from coverage_shield.badge_palettes import BADGE_PALETTES
+from coverage_shield.coverage_data_functions import CoverageRecord
 
 
 def parse_coverage_report(
@@ -21,6 +40,8 @@ def parse_coverage_report(
         pd.DataFrame: coverage report as dataframe
     """
 
+    import pandas as pd  # working with dataframes (slow, so imported when needed)
+
     # Convert the byte string into pandas dataframe
     coverage_dataframe = pd.read_csv(StringIO(coverage_report_string), sep="\s+")
 
@@ -31,75 +52,580 @@ def parse_coverage_report(
     # Remove percent sign from coverage column and convert to float
     coverage_dataframe.Cover = coverage_dataframe.Cover.str[:-1].astype(float)
 
+    # Remove any files matching patterns to ignore
+    coverage_dataframe = filter_coverage_dataframe(
+        coverage_dataframe, patterns_to_ignore
+    )
+
+    return coverage_dataframe
+
+
+def filter_coverage_dataframe(
+    coverage_dataframe: pd.DataFrame, patterns_to_ignore: [str] = None
+) -> pd.DataFrame:
+    """Removes files from coverage report that are ignored by any of the patterns to ignore
+
+    Args:
+        coverage_dataframe (pd.DataFrame): coverage report as dataframe
+        patterns_to_ignore ([str], optional): .covignore (gitignore style) patterns to ignore. Defaults to None.
+
+    Returns:
+        pd.DataFrame: coverage report without ignored files
+    """
+
     # Check if any patterns to ignore
     if not patterns_to_ignore == None:
-        patterns_to_ignore = "|".join(patterns_to_ignore)
+        is_ignored = covignore_functions.build_ignore_function(patterns_to_ignore)
         coverage_dataframe = coverage_dataframe[
-            ~coverage_dataframe.Name.str.contains(patterns_to_ignore)
+            ~coverage_dataframe.Name.map(is_ignored).astype(bool)
         ]
 
     return coverage_dataframe
 
 
-def run_code_coverage(tester: str = "unittest") -> pd.DataFrame:
-    """Runs coverage tool in command line and returns report
+def run_code_coverage(
+    tester: str = "unittest",
+    engine: str = "api",
+    jobs: int = 1,
+    timings_path: Path = None,
+    stream: bool = False,
+    log_path: Path = None,
+    tail_lines: int = output_functions.DEFAULT_TAIL_LINES,
+    test_ids: [str] = None,
+) -> pd.DataFrame | Iterator[CoverageRecord]:
+    """Runs coverage tool and returns report
 
-    Will send warning if running coverage package is failing and return empty dataframe
+    Will send warning if running coverage package is failing and return empty report
+
+    Args:
+        tester (str, optional): unit test package to use ("unittest" or "pytest"). Defaults to "unittest".
+        engine (str, optional): how to run coverage. "api" drives coverage.Coverage in the current
+            process, "subprocess" runs coverage in the command line (slower but isolated), and "fork"
+            imports the project's dependencies once and runs the tests in workers forked from the
+            current process (isolated without the start up cost, not on Windows). Defaults to "api".
+        jobs (int, optional): number of processes to split the test modules across. If not 1, the test
+            modules are run in parallel coverage processes (forked workers for the "fork" engine) and
+            their data combined. Uses all cores if 0. Defaults to 1.
+        timings_path (Path, optional): file to write duration of each test to (see
+            profiling_functions.read_test_durations()). Not recorded if None. Defaults to None.
+        stream (bool, optional): whether to return report as records streamed one file at a time
+            (see build_coverage_records()) instead of dataframe. Uses less memory for large
+            repositories. Defaults to False.
+        log_path (Path, optional): log file to write test output to (overwritten). Test output is
+            written to the console, as the tests run, if None. Defaults to None.
+        tail_lines (int, optional): number of last lines of test output (of tests run in separate
+            processes) kept for warnings. Defaults to output_functions.DEFAULT_TAIL_LINES.
+        test_ids ([str], optional): ids of tests to run (e.g. a reduced test suite, see
+            reduction_functions.select_tests()), with the "api" or "subprocess" engine only. Runs all
+            tests if None. Defaults to None.
 
     Returns:
-        pd.DataFrame : coverage report as dataframe if coverage passing; empty dataframe if coverage failing
+        pd.DataFrame | Iterator[CoverageRecord]: coverage report as dataframe (or records) if coverage
+            passing; empty report if coverage failing
     """
 
     # Check tester option provided
     tester_options = ["unittest", "pytest"]
     if not tester in tester_options:
-        raise ValueError(f"The tester option provided ({tester}) was not recognised. Must be one of: {tester_options.join(', ')}")
+        raise ValueError(
+            f"The tester option provided ({tester}) was not recognised. Must be one of: {', '.join(tester_options)}"
+        )
+
+    # Check engine option provided
+    engine_options = ["api", "subprocess", "fork"]
+    if not engine in engine_options:
+        raise ValueError(
+            f"The engine option provided ({engine}) was not recognised. Must be one of: {', '.join(engine_options)}"
+        )
+
+    # Check selected tests can be run
+    if test_ids is not None and (engine == "fork" or jobs != 1):
+        raise ValueError(
+            "Selected tests (test_ids) can only be run with the api or subprocess engine (and one job)."
+        )
+
+    # Check if running tests in forked workers
+    if engine == "fork":
+        return run_forked_code_coverage(
+            tester, jobs, timings_path, stream, log_path, tail_lines
+        )
+
+    # Check if running tests in parallel
+    if jobs != 1:
+        return run_parallel_code_coverage(
+            tester, jobs, timings_path, stream, log_path, tail_lines
+        )
+
+    # Check if running coverage in current process
+    if engine == "api":
+        return run_code_coverage_in_process(
+            tester, timings_path, stream, log_path, test_ids
+        )
 
     # Run code coverage calculation
     # Check out useful subprocess function docs: https://www.datacamp.com/tutorial/python-subprocess
     coverage_command = [
-        "python3",
+        sys.executable,
         "-m",
         "coverage",
         "run",
         "--source=.",
-        "-m",
-        tester,
+        *covignore_functions.build_omit_arguments(get_omit_patterns()),
+        *profiling_functions.get_tester_arguments(tester, timings_path),
+        *([] if test_ids is None else test_ids),
     ]
-    command_result = subprocess.run(coverage_command, capture_output=True, text=True)
+    # (test output streamed line by line, keeping only the last lines for warnings)
+    with metrics_functions.record_phase("run_tests"), output_functions.open_output(
+        log_path
+    ) as output:
+        command_result = output_functions.run_streamed_command(
+            coverage_command,
+            env=profiling_functions.get_timing_environment(timings_path),
+            output=output,
+            tail_lines=tail_lines,
+        )
 
     # Check the result
     if command_result.returncode == 0:  # Passing
 
-        # Show result from command
-        # - For some reason unit testing progress sent to standard error
-        # - Any prints from unit tests sent to standard output so ignoring these for the moment
-        print(command_result.stderr)
+        # Get patterns to ignore
+        patterns_to_ignore = load_patterns_to_ignore_in_coverage()
 
-        # Generate the report
-        report_command = ["python3", "-m", "coverage", "report"]
+        # Stream the report straight from the coverage data file (no json report needed)
+        if stream:
+            coverage_object = coverage.Coverage()
+            coverage_object.load()
+            return build_coverage_records(coverage_object, patterns_to_ignore)
+
+        # Generate the report (json report written to standard output)
+        report_command = [sys.executable, "-m", "coverage", "json", "-q", "-o", "-"]
         try:
-            coverage_report = subprocess.check_output(report_command, text=True)
+            with metrics_functions.record_phase("coverage_report"):
+                coverage_json = subprocess.check_output(report_command, text=True)
 
         except subprocess.CalledProcessError as error:
-            print(
+            warnings.warn(
                 f"Generating coverage report command ({' '.join(report_command)}) failed! Return code: {error.returncode}"
             )
+            return build_empty_report(stream)
 
-        # Get patterns to ignore
-        patterns_to_ignore = load_patterns_to_ignore_in_coverage()
-
-        # Convert coverage report output to dataframe
-        report_dataframe = parse_coverage_report(coverage_report, patterns_to_ignore)
+        # Convert coverage json report to dataframe
+        with metrics_functions.record_phase("parse_coverage_report"):
+            coverage_arrays = coverage_data_functions.filter_coverage_arrays(
+                coverage_data_functions.parse_coverage_json(coverage_json),
+                patterns_to_ignore,
+            )
+            coverage_report = coverage_data_functions.coverage_arrays_to_dataframe(
+                coverage_arrays
+            )
 
     else:
         warnings.warn(
-            f"Running coverage package command ({' '.join(coverage_command)}) failed! Return code: {command_result.returncode}. \nError Output:\n{command_result.stderr}"
+            f"Running coverage package command ({' '.join(coverage_command)}) failed! Return code: {command_result.returncode}.{output_functions.format_tail(command_result.tail)}"
+        )
+
+        coverage_report = build_empty_report(stream)
+
+    return coverage_report
+
+
+def run_parallel_code_coverage(
+    tester: str = "unittest",
+    jobs: int = 0,
+    timings_path: Path = None,
+    stream: bool = False,
+    log_path: Path = None,
+    tail_lines: int = output_functions.DEFAULT_TAIL_LINES,
+) -> pd.DataFrame | Iterator[CoverageRecord]:
+    """Runs test modules in parallel coverage processes and returns combined report
+
+    Will send warning if running coverage on any of the test modules fails and return empty report
+
+    Args:
+        tester (str, optional): unit test package to use ("unittest" or "pytest"). Defaults to "unittest".
+        jobs (int, optional): number of processes to run at once. Uses all cores if 0. Defaults to 0.
+        timings_path (Path, optional): file to write duration of each test to. Not recorded if None.
+            Defaults to None.
+        stream (bool, optional): whether to return report as streamed records instead of dataframe.
+            Defaults to False.
+        log_path (Path, optional): log file to write test output to. Console if None. Defaults to None.
+        tail_lines (int, optional): number of last lines of test output kept for warnings. Defaults
+            to output_functions.DEFAULT_TAIL_LINES.
+
+    Returns:
+        pd.DataFrame | Iterator[CoverageRecord]: coverage report as dataframe (or records) if coverage
+            passing; empty report if coverage failing
+    """
+
+    # Run the tests in parallel
+    with metrics_functions.record_phase("run_tests"):
+        coverage_object = parallel_coverage_functions.run_parallel_code_coverage(
+            tester, jobs, timings_path, get_omit_patterns(), log_path, tail_lines
+        )
+    if coverage_object is None:
+        return build_empty_report(stream)
+
+    return build_coverage_report(
+        coverage_object, load_patterns_to_ignore_in_coverage(), stream
+    )
+
+
+def run_forked_code_coverage(
+    tester: str = "unittest",
+    jobs: int = 1,
+    timings_path: Path = None,
+    stream: bool = False,
+    log_path: Path = None,
+    tail_lines: int = output_functions.DEFAULT_TAIL_LINES,
+) -> pd.DataFrame | Iterator[CoverageRecord]:
+    """Runs test modules in workers forked from the current process and returns combined report
+
+    Will send warning if running coverage on any of the test modules fails and return empty report
+
+    Args:
+        tester (str, optional): unit test package to use ("unittest" or "pytest"). Defaults to "unittest".
+        jobs (int, optional): number of workers to split the test modules across. Uses all cores if 0.
+            Defaults to 1.
+        timings_path (Path, optional): file to write duration of each test to. Not recorded if None.
+            Defaults to None.
+        stream (bool, optional): whether to return report as streamed records instead of dataframe.
+            Defaults to False.
+        log_path (Path, optional): log file to write test output to. Console if None. Defaults to None.
+        tail_lines (int, optional): number of last lines of test output kept for warnings. Defaults
+            to output_functions.DEFAULT_TAIL_LINES.
+
+    Returns:
+        pd.DataFrame | Iterator[CoverageRecord]: coverage report as dataframe (or records) if coverage
+            passing; empty report if coverage failing
+    """
+
+    # Imported when needed (as it imports this module)
+    from coverage_shield import worker_pool_functions
+
+    # Run the tests in forked workers
+    with metrics_functions.record_phase("run_tests"):
+        coverage_object = worker_pool_functions.run_worker_pool(
+            tester, jobs, timings_path, get_omit_patterns(), log_path, tail_lines
+        )
+    if coverage_object is None:
+        return build_empty_report(stream)
+
+    return build_coverage_report(
+        coverage_object, load_patterns_to_ignore_in_coverage(), stream
+    )
+
+
+def run_code_coverage_in_process(
+    tester: str = "unittest",
+    timings_path: Path = None,
+    stream: bool = False,
+    log_path: Path = None,
+    test_ids: [str] = None,
+) -> pd.DataFrame | Iterator[CoverageRecord]:
+    """Runs unit tests under coverage.Coverage in the current process and returns report
+
+    Avoids starting separate python processes to run the tests and generate the report.
+
+    Will send warning if the tests fail and return empty report
+
+    Args:
+        tester (str, optional): unit test package to use ("unittest" or "pytest"). Defaults to "unittest".
+        timings_path (Path, optional): file to write duration of each test to. Not recorded if None.
+            Defaults to None.
+        stream (bool, optional): whether to return report as streamed records instead of dataframe.
+            Defaults to False.
+        log_path (Path, optional): log file to write test output to. Console if None. Defaults to None.
+        test_ids ([str], optional): ids of tests to run (see run_tests_in_process()). Runs all tests if
+            None. Defaults to None.
+
+    Returns:
+        pd.DataFrame | Iterator[CoverageRecord]: coverage report as dataframe (or records) if tests
+            passing; empty report if tests failing
+    """
+
+    # Run the tests whilst measuring coverage (not tracing ignored files)
+    coverage_object = coverage.Coverage(source=["."], omit=get_omit_patterns())
+    with metrics_functions.record_phase("run_tests"), output_functions.redirect_output(
+        log_path
+    ):
+        tests_passed = measure_tests_in_process(
+            coverage_object, tester, timings_path, test_ids
+        )
+
+        # Save the coverage data (as coverage run would)
+        coverage_object.save()
+
+    # Check the result
+    if not tests_passed:
+        warnings.warn(f"Running {tester} tests in process failed!")
+        return build_empty_report(stream)
+
+    # Get patterns to ignore
+    patterns_to_ignore = load_patterns_to_ignore_in_coverage()
+
+    # Build the report straight from the coverage data
+    return build_coverage_report(coverage_object, patterns_to_ignore, stream)
+
+
+def measure_tests_in_process(
+    coverage_object: coverage.Coverage | None,
+    tester: str = "unittest",
+    timings_path: Path = None,
+    test_ids: [str] = None,
+) -> bool:
+    """Runs unit tests in the current process whilst coverage object measures coverage
+
+    Modules from the current directory are unloaded before the tests run (so their imports are
+    measured) and restored afterwards.
+
+    Args:
+        coverage_object (coverage.Coverage | None): coverage object to measure with (not started).
+            Tests run without coverage if None (e.g. to time them uninstrumented).
+        tester (str, optional): unit test package to use ("unittest" or "pytest"). Defaults to "unittest".
+        timings_path (Path, optional): file to write duration of each test to. Not recorded if None.
+            Defaults to None.
+        test_ids ([str], optional): ids of tests to run (see run_tests_in_process()). Runs all tests if
+            None. Defaults to None.
+
+    Returns:
+        bool: True if tests passed and False otherwise
+    """
+
+    # Note the loaded modules and python path so we can restore them after tests
+    directory = os.getcwd()
+    loaded_modules = sys.modules.copy()
+    python_path = sys.path.copy()
+
+    # Unload any modules from current directory (so importing them is measured)
+    for module_name, module in loaded_modules.items():
+        module_file = getattr(module, "__file__", None)
+        if (
+            module_name != "__main__"
+            and module_file is not None
+            and module_file.startswith(directory + os.sep)
+        ):
+            del sys.modules[module_name]
+
+    # Make modules in current directory importable (as "python -m" would)
+    sys.path.insert(0, directory)
+
+    # Run the tests whilst measuring coverage
+    if coverage_object is not None:
+        coverage_object.start()
+    try:
+        tests_passed = run_tests_in_process(tester, timings_path, test_ids)
+    finally:
+        if coverage_object is not None:
+            coverage_object.stop()
+
+        # Restore modules and python path
+        for module_name in list(sys.modules):
+            if module_name not in loaded_modules:
+                del sys.modules[module_name]
+        sys.modules.update(loaded_modules)
+        sys.path[:] = python_path
+
+    return tests_passed
+
+
+def run_tests_in_process(
+    tester: str = "unittest", timings_path: Path = None, test_ids: [str] = None
+) -> bool:
+    """Runs unit tests found in current directory in the current process
+
+    Args:
+        tester (str, optional): unit test package to use ("unittest" or "pytest"). Defaults to "unittest".
+        timings_path (Path, optional): file to write duration of each test to. Not recorded if None.
+            Defaults to None.
+        test_ids ([str], optional): ids of tests to run, unittest names (e.g. tests.test_x.TestX.test_y)
+            or pytest node ids (e.g. tests/test_x.py::TestX::test_y). Runs all tests if None. Defaults to None.
+
+    Returns:
+        bool: True if tests passed and False otherwise
+    """
+
+    if tester == "pytest":
+        import pytest  # only needed if using pytest
+
+        timing_plugin = profiling_functions.PytestTimingPlugin()
+        exit_code = pytest.main(
+            [] if test_ids is None else list(test_ids), plugins=[timing_plugin]
+        )
+        tests_passed = exit_code == 0
+        test_durations = timing_plugin.test_durations
+
+    else:
+        # Discover and run tests (progress sent to standard error like python -m unittest)
+        test_loader = unittest.TestLoader()
+        test_suite = (
+            test_loader.discover(".")
+            if test_ids is None
+            else test_loader.loadTestsFromNames(test_ids)
+        )
+        test_result = unittest.TextTestRunner(
+            resultclass=profiling_functions.TimedTextTestResult
+        ).run(test_suite)
+        tests_passed = test_result.wasSuccessful()
+        test_durations = test_result.test_durations
+
+    # Write the test durations
+    if timings_path is not None:
+        profiling_functions.write_test_durations(test_durations, timings_path)
+
+    return tests_passed
+
+
+def build_coverage_dataframe(
+    coverage_object: coverage.Coverage, patterns_to_ignore: [str] = None
+) -> pd.DataFrame:
+    """Builds coverage report dataframe from coverage.Coverage object data
+
+    Args:
+        coverage_object (coverage.Coverage): coverage object that has measured some code
+        patterns_to_ignore ([str], optional): patterns in file names to ignore. Defaults to None.
+
+    Returns:
+        pd.DataFrame: coverage report as dataframe (same columns as coverage report)
+    """
+
+    # Get statistics for each measured file
+    coverage_arrays = coverage_data_functions.coverage_object_to_arrays(coverage_object)
+
+    # Remove any files matching patterns to ignore
+    coverage_arrays = coverage_data_functions.filter_coverage_arrays(
+        coverage_arrays, patterns_to_ignore
+    )
+
+    return coverage_data_functions.coverage_arrays_to_dataframe(coverage_arrays)
+
+
+def build_coverage_records(
+    coverage_object: coverage.Coverage, patterns_to_ignore: [str] = None
+) -> Iterator[CoverageRecord]:
+    """Streams coverage report records from coverage.Coverage object data, one file at a time
+
+    The full report is never held in memory, so memory use doesn't grow with the number of files.
+
+    Args:
+        coverage_object (coverage.Coverage): coverage object that has measured some code
+        patterns_to_ignore ([str], optional): patterns in file names to ignore. Defaults to None.
+
+    Returns:
+        Iterator[CoverageRecord]: statistics of each file not ignored (can only be read once)
+    """
+
+    return coverage_data_functions.filter_coverage_records(
+        coverage_data_functions.iterate_coverage_records(coverage_object),
+        patterns_to_ignore,
+    )
+
+
+def build_coverage_report(
+    coverage_object: coverage.Coverage,
+    patterns_to_ignore: [str] = None,
+    stream: bool = False,
+) -> pd.DataFrame | Iterator[CoverageRecord]:
+    """Builds coverage report as dataframe or streamed records from coverage.Coverage object data
+
+    Args:
+        coverage_object (coverage.Coverage): coverage object that has measured some code
+        patterns_to_ignore ([str], optional): patterns in file names to ignore. Defaults to None.
+        stream (bool, optional): whether to stream records instead of building dataframe. Defaults to False.
+
+    Returns:
+        pd.DataFrame | Iterator[CoverageRecord]: coverage report
+    """
+
+    if stream:
+        return build_coverage_records(coverage_object, patterns_to_ignore)
+
+    with metrics_functions.record_phase("build_coverage_report"):
+        return build_coverage_dataframe(coverage_object, patterns_to_ignore)
+
+
+def build_empty_report(stream: bool = False) -> pd.DataFrame | Iterator[CoverageRecord]:
+    """Builds empty coverage report (returned when coverage fails)
+
+    Args:
+        stream (bool, optional): whether report is streamed records instead of dataframe. Defaults to False.
+
+    Returns:
+        pd.DataFrame | Iterator[CoverageRecord]: empty dataframe (or records)
+    """
+
+    if stream:
+        return iter(())
+
+    import pandas as pd  # working with dataframes (slow, so imported when needed)
+
+    return pd.DataFrame()
+
+
+def calculate_coverage_total(
+    coverage_report: pd.DataFrame | Iterable[CoverageRecord],
+) -> CoverageRecord | None:
+    """Sums statements and missed statements across files of coverage report
+
+    Args:
+        coverage_report (pd.DataFrame | Iterable[CoverageRecord]): coverage report as dataframe or
+            records (streamed records are read as they're summed)
+
+    Returns:
+        CoverageRecord | None: total statistics (named "TOTAL") or None if report empty (coverage failed)
+    """
+
+    # Check if report is a dataframe (rather than records)
+    if hasattr(coverage_report, "empty"):
+        if coverage_report.empty:
+            return None
+
+        return coverage_data_functions.CoverageRecord(
+            "TOTAL",
+            int(coverage_report.Stmts.sum()),
+            int(coverage_report.Miss.sum()),
+            int(coverage_report.Branch.sum()) if "Branch" in coverage_report else 0,
+            int(coverage_report.BrPart.sum()) if "BrPart" in coverage_report else 0,
         )
 
-        report_dataframe = pd.DataFrame()
+    return coverage_data_functions.sum_coverage_records(coverage_report)
 
-    return report_dataframe
+
+def iterate_coverage_report(
+    coverage_report: pd.DataFrame | Iterable[CoverageRecord],
+) -> Iterator[CoverageRecord]:
+    """Yields statistics of each file of coverage report
+
+    Args:
+        coverage_report (pd.DataFrame | Iterable[CoverageRecord]): coverage report as dataframe or
+            records (streamed records are passed on as they're read)
+
+    Yields:
+        CoverageRecord: statistics of a file
+    """
+
+    # Check if report is records (rather than a dataframe)
+    if not hasattr(coverage_report, "empty"):
+        yield from coverage_report
+        return
+
+    # Convert rows of dataframe (reports parsed from coverage's text report may not have branches)
+    if coverage_report.empty:
+        return
+    n_files = len(coverage_report)
+    for name, statements, missed, branches, partial_branches in zip(
+        coverage_report.Name,
+        coverage_report.Stmts,
+        coverage_report.Miss,
+        coverage_report.Branch if "Branch" in coverage_report else [0] * n_files,
+        coverage_report.BrPart if "BrPart" in coverage_report else [0] * n_files,
+    ):
+        yield CoverageRecord(
+            str(name),
+            int(statements),
+            int(missed),
+            int(branches),
+            int(partial_branches),
+        )
 
 
 def get_badge_colour(
@@ -110,16 +636,21 @@ def get_badge_colour(
 
     Args:
         value (float): coverage value
-        colour_palette (str): name of colour palette to use (see: https://holypython.com/python-visualization-tutorial/colors-with-python/)
+        colour_palette (str): name of colour palette to use (see: https://holypython.com/python-visualization-tutorial/colors-with-python/).
+            Palettes in badge_palettes.BADGE_PALETTES don't need seaborn.
 
     Returns:
         str: colour for badge
     """
 
-    # Create colour palette
+    # Get colour palette (precomputed for common palettes as seaborn is slow to import)
     # Note shields io accepts hex colours (without hash!)
     # (as well as many other formats! https://shields.io/badges)
-    palette = list(seaborn.color_palette(colour_palette, 100).as_hex())
+    palette = BADGE_PALETTES.get(colour_palette)
+    if palette is None:
+        import seaborn  # create colour palette
+
+        palette = list(seaborn.color_palette(colour_palette, 100).as_hex())
 
     # Get colour for value
     value_index = round(value) - 1 if value >= 0.5 else 0
@@ -129,28 +660,33 @@ def get_badge_colour(
 
 
 def make_coverage_badge_url(
-    coverage_dataframe: pd.DataFrame | str,
+    coverage_report: pd.DataFrame | Iterable[CoverageRecord],
     failing_colour: str = "red",
 ) -> str:
     """Uses shields io to build coverage badge
 
     Args:
-        coverage_dataframe (pd.DataFrame | str): coverage report as dataframe. If coverage failed this will be string ("failing")
+        coverage_report (pd.DataFrame | Iterable[CoverageRecord]): coverage report as dataframe or
+            records (see build_coverage_records()). Empty if coverage failed.
         failing_colour (str, optional): colour of badge when failing. Defaults to "red".
 
     Returns:
         str: shields io badge url
     """
 
+    # Sum statements across files
+    coverage_total = calculate_coverage_total(coverage_report)
+
     # Check if coverage report available
-    if not coverage_dataframe.empty:
+    if coverage_total is not None:
 
-        # Calculate the average code coverage
-        total_statements = sum(coverage_dataframe.Stmts)
-        total_statements_missed = sum(coverage_dataframe.Miss)
+        # Calculate the average code coverage (files without statements are fully covered)
         average_coverage = (
-            total_statements - total_statements_missed
-        ) / total_statements
+            (coverage_total.statements - coverage_total.missed)
+            / coverage_total.statements
+            if coverage_total.statements > 0
+            else 1
+        )
 
         # Convert to percentage and round
         average_coverage = round(average_coverage * 100, 1)
@@ -169,45 +705,262 @@ def make_coverage_badge_url(
     return badge_url
 
 
+@functools.lru_cache(maxsize=None)
+def build_badge_pattern(badge_name: str) -> re.Pattern:
+    """Builds (compiled) pattern matching badge in README (e.g. ![Code Coverage](...))
+
+    Args:
+        badge_name (str): name of badge
+
+    Returns:
+        re.Pattern: compiled pattern
+    """
+
+    return re.compile(rf"\!\[{re.escape(badge_name)}\]\(.+\)")
+
+
+def write_file_atomically(file_path: Path, content: str):
+    """Writes file by writing temporary file alongside it and renaming it
+
+    The rename replaces the file in one step, so a run that is interrupted (or runs at the same time)
+    never leaves a partly written file.
+
+    Args:
+        file_path (Path): path to file
+        content (str): content to write
+    """
+
+    file_path = Path(file_path)
+    file_descriptor, temporary_path = tempfile.mkstemp(
+        dir=file_path.parent, prefix=f".{file_path.name}.", suffix=".tmp"
+    )
+    try:
+        with open(file_descriptor, "w") as file:
+            file.write(content)
+        if file_path.exists():
+            shutil.copymode(file_path, temporary_path)
+        os.replace(temporary_path, file_path)
+    except BaseException:
+        Path(temporary_path).unlink(missing_ok=True)
+        raise
+
+
 def replace_regex_in_file(
-    file_path: Path, pattern_regex: str, replacement: str, add_to_file: bool = True
-):
+    file_path: Path,
+    pattern_regex: str | re.Pattern,
+    replacement: str,
+    add_to_file: bool = True,
+) -> bool:
     """Replace pattern in file with string
 
-    Note if pattern not present this will add string to first line by default
+    Note if pattern not present this will add string to first line by default. Only the first line
+    starting with the pattern is updated and the file is only written (atomically, see
+    write_file_atomically()) if its content changes.
 
     Args:
         file_path (Path): path to file
-        pattern_regex (str): pattern to find
+        pattern_regex (str | re.Pattern): pattern to find (compiled patterns, e.g. from
+            build_badge_pattern(), avoid compiling the pattern each call)
         replacement (str): string to replace pattern when found
         add_to_file (bool): if regex not present will add to top of file if True. Defaults to True
+
+    Returns:
+        bool: True if file changed
     """
 
     # Read in file contents
-    file_lines = []
+    pattern = re.compile(pattern_regex)
     with open(file_path) as file:
-        file_lines = file.read().splitlines()
+        file_content = file.read()
+    file_lines = file_content.splitlines()
+
+    # Check if badge present (stopping at first line it is found on)
+    badge_index = next(
+        (index for index, line in enumerate(file_lines) if pattern.match(line)), None
+    )
+    if badge_index is not None:
+        # If it is, update
+        file_lines[badge_index] = pattern.sub(replacement, file_lines[badge_index])
 
-    # Check if badge present
-    badge_present = any(bool(re.match(pattern_regex, line)) for line in file_lines)
-    if (badge_present == False) & add_to_file:
+    elif add_to_file:
         # If not add at top
         file_lines.insert(0, replacement)
 
     else:
-        # If it is, update
-        file_lines = [re.sub(pattern_regex, replacement, line) for line in file_lines]
+        # Update pattern wherever it is found
+        file_lines = [pattern.sub(replacement, line) for line in file_lines]
+
+    # Write file lines back to file (if changed)
+    new_content = "\n".join(file_lines) + "\n"
+    if new_content == file_content:
+        return False
+    write_file_atomically(file_path, new_content)
+
+    return True
+
+
+# Formats of badges in documentation files (reStructuredText for .rst files, otherwise markdown):
+# pattern of badge (with group holding badge name), badge, and lines added to top of file if missing
+BADGE_FORMATS = {
+    "markdown": (r"\!\[({names})\]\(.+\)", "![{name}]({url})", ["![{name}]({url})"]),
+    "rst": (
+        r"\.\. \|({names})\| image:: \S+",
+        ".. |{name}| image:: {url}",
+        ["|{name}|", "", ".. |{name}| image:: {url}", ""],
+    ),
+}
+
 
-    # Write file lines back to file
-    with open(file_path, "w") as file:
-        file.write("\n".join(file_lines) + "\n")
+def get_badge_format(file_path: Path) -> str:
+    """Gets format of badges in documentation file from its suffix
+
+    Args:
+        file_path (Path): path to documentation file
+
+    Returns:
+        str: badge format (key of BADGE_FORMATS)
+    """
+
+    return "rst" if Path(file_path).suffix.lower() == ".rst" else "markdown"
+
+
+@functools.lru_cache(maxsize=None)
+def build_badges_pattern(badge_names: tuple[str, ...], badge_format: str) -> re.Pattern:
+    """Builds (compiled) pattern matching any of the badges, so a file is scanned once for all badges
+
+    Args:
+        badge_names (tuple[str, ...]): names of badges
+        badge_format (str): badge format (key of BADGE_FORMATS)
+
+    Returns:
+        re.Pattern: compiled pattern (group 1 holds badge name)
+    """
+
+    return re.compile(
+        BADGE_FORMATS[badge_format][0].format(
+            names="|".join(re.escape(badge_name) for badge_name in badge_names)
+        )
+    )
+
+
+def update_badges_in_file(file_path: Path, badge_urls: dict[str, str]) -> bool:
+    """Updates badges in documentation file, scanning it once for all the badges
+
+    Badges are written in the format of the file (see get_badge_format()). The first line holding each
+    badge is updated and badges not found are added to the top of the file. The file is only written
+    (atomically, see write_file_atomically()) if its content changes.
+
+    Args:
+        file_path (Path): path to documentation file (e.g. README.md, docs/index.md, or README.rst)
+        badge_urls (dict[str, str]): url (or path) of each badge (keyed by badge name)
+
+    Returns:
+        bool: True if file changed
+    """
+
+    # Read in file contents
+    badge_format = get_badge_format(file_path)
+    _, badge_template, missing_templates = BADGE_FORMATS[badge_format]
+    pattern = build_badges_pattern(tuple(badge_urls), badge_format)
+    with open(file_path) as file:
+        file_content = file.read()
+    file_lines = file_content.splitlines()
+
+    # Update first line holding each badge (stopping once all badges found)
+    badges_to_find = set(badge_urls)
+    for index, line in enumerate(file_lines):
+        badge_match = pattern.match(line)
+        if badge_match is None or badge_match.group(1) not in badges_to_find:
+            continue
+        badge_name = badge_match.group(1)
+        file_lines[index] = pattern.sub(
+            lambda _: badge_template.format(
+                name=badge_name, url=badge_urls[badge_name]
+            ),
+            line,
+            count=1,
+        )
+        badges_to_find.remove(badge_name)
+        if len(badges_to_find) == 0:
+            break
+
+    # Add missing badges to top of file (in order provided)
+    missing_lines = [
+        template.format(name=badge_name, url=badge_url)
+        for badge_name, badge_url in badge_urls.items()
+        if badge_name in badges_to_find
+        for template in missing_templates
+    ]
+    file_lines = missing_lines + file_lines
+
+    # Write file lines back to file (if changed)
+    new_content = "\n".join(file_lines) + "\n"
+    if new_content == file_content:
+        return False
+    write_file_atomically(file_path, new_content)
+
+    return True
+
+
+def update_badges_in_files(
+    badge_urls: dict[str, str], target_paths: [Path], badge_directory: Path = None
+) -> [Path]:
+    """Updates badges in each documentation file (see update_badges_in_file()), rendering them as SVG
+    files first if badge directory provided
+
+    Args:
+        badge_urls (dict[str, str]): shields io badge url for each badge (keyed by badge name)
+        target_paths ([Path]): paths to documentation files (e.g. README.md)
+        badge_directory (Path, optional): directory to write SVG files to (see
+            badge_functions.write_local_badges()). Badges link to shields io if None. Defaults to None.
+
+    Returns:
+        [Path]: paths of the SVG files written (those that changed)
+    """
+
+    badge_paths = []
+    for target_path in target_paths:
+
+        # Render badges as SVG files (if requested, linking to them instead of shields io)
+        target_urls = badge_urls
+        if badge_directory is not None:
+            from coverage_shield import badge_functions
+
+            target_urls, written_paths = badge_functions.write_local_badges(
+                badge_urls, badge_directory, target_path
+            )
+            badge_paths += written_paths
+
+        update_badges_in_file(target_path, target_urls)
+
+    return badge_paths
+
+
+def find_badge_targets(patterns: [str], directory: Path = Path(".")) -> [Path]:
+    """Finds documentation files to add badges to from paths or glob patterns
+
+    Args:
+        patterns ([str]): paths or glob patterns (e.g. "packages/*/README.md") relative to directory
+        directory (Path, optional): directory patterns are relative to. Defaults to Path(".").
+
+    Returns:
+        [Path]: unique files (in order found)
+    """
+
+    file_paths = {}
+    for pattern in patterns:
+        for file_path in sorted(Path(directory).glob(pattern)):
+            if file_path.is_file():
+                file_paths.setdefault(file_path.resolve(), None)
+
+    return list(file_paths)
 
 
 def load_patterns_to_ignore_in_coverage(file_path: Path = Path(".covignore")) -> [str]:
     """Loads patterns from simple text file lines into list
 
-    Note file is like .gitignore so each line represents a pattern to ignore. Commented lines
-    can start with hash (#) and empty lines are ignored.
+    Note file is like .gitignore so each line represents a pattern to ignore (see
+    covignore_functions). Commented lines can start with hash (#) and empty lines are ignored.
     Args:
         file_path (Path): path to file containing patterns
 
@@ -236,3 +989,18 @@ def load_patterns_to_ignore_in_coverage(file_path: Path = Path(".covignore")) ->
 
     else:
         return None
+
+
+def get_omit_patterns(file_path: Path = Path(".covignore")) -> [str]:
+    """Gets coverage omit patterns for files ignored in .covignore, so they're never traced
+
+    Args:
+        file_path (Path): path to file containing patterns
+
+    Returns:
+        [str]: coverage omit patterns (see covignore_functions.build_omit_patterns())
+    """
+
+    return covignore_functions.build_omit_patterns(
+        load_patterns_to_ignore_in_coverage(file_path)
+    )
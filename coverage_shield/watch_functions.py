@@ -0,0 +1,445 @@
+# Load required libraries
+import ctypes  # calling inotify functions in C library
+import ctypes.util  # finding C library
+import os  # reading inotify events and walking directories
+import select  # waiting for inotify events
+import struct  # unpacking inotify events
+import sys  # checking platform
+import time  # debouncing changes
+from pathlib import Path  # handling file paths
+import coverage  # measuring code coverage with test contexts
+
+# Local imports
+from coverage_shield import unittest_coverage_functions
+from coverage_shield import impact_functions
+
+# inotify event flags (see: man inotify)
+IN_CLOSE_WRITE = 0x00000008
+IN_MOVED_FROM = 0x00000040
+IN_MOVED_TO = 0x00000080
+IN_CREATE = 0x00000100
+IN_DELETE = 0x00000200
+IN_ISDIR = 0x40000000
+WATCH_MASK = IN_CLOSE_WRITE | IN_MOVED_FROM | IN_MOVED_TO | IN_CREATE | IN_DELETE
+EVENT_HEADER = struct.Struct("iIII")  # watch descriptor, mask, cookie, name length
+
+
+def is_watched_directory(directory: Path) -> bool:
+    """Checks if directory should be watched (hidden and cache directories aren't)
+
+    Args:
+        directory (Path): directory
+
+    Returns:
+        bool: whether directory is watched
+    """
+
+    return not (directory.name.startswith(".") or directory.name == "__pycache__")
+
+
+def is_watched_file(file_path: Path) -> bool:
+    """Checks if a change to file could change the coverage (python files and .covignore)
+
+    Args:
+        file_path (Path): file path
+
+    Returns:
+        bool: whether file is watched
+    """
+
+    return file_path.suffix == ".py" or file_path.name == ".covignore"
+
+
+def find_watched_directories(directory: Path = Path(".")) -> [Path]:
+    """Finds directory and all its watched sub-directories
+
+    Args:
+        directory (Path, optional): top directory. Defaults to Path(".").
+
+    Returns:
+        [Path]: directories to watch
+    """
+
+    directories = []
+    for parent, sub_directories, _ in os.walk(directory):
+        sub_directories[:] = [
+            name for name in sub_directories if is_watched_directory(Path(name))
+        ]
+        directories.append(Path(parent))
+
+    return directories
+
+
+class InotifyWatcher:
+    """Watches directory tree for changed files using Linux inotify (called through ctypes)"""
+
+    def __init__(self, directory: Path = Path(".")):
+        """Starts watching directory and its sub-directories
+
+        Args:
+            directory (Path, optional): directory to watch. Defaults to Path(".").
+
+        Raises:
+            OSError: if inotify isn't available
+        """
+
+        self.libc = ctypes.CDLL(ctypes.util.find_library("c"), use_errno=True)
+        self.file_descriptor = self.libc.inotify_init1(os.O_NONBLOCK | os.O_CLOEXEC)
+        if self.file_descriptor < 0:
+            raise OSError(ctypes.get_errno(), "inotify_init1 failed")
+
+        self.watched_directories = {}
+        for watched_directory in find_watched_directories(directory):
+            self.add_directory(watched_directory)
+
+    def add_directory(self, directory: Path):
+        """Starts watching a directory (not its sub-directories)
+
+        Args:
+            directory (Path): directory to watch
+        """
+
+        watch_descriptor = self.libc.inotify_add_watch(
+            self.file_descriptor, os.fsencode(directory), WATCH_MASK
+        )
+        if watch_descriptor >= 0:
+            self.watched_directories[watch_descriptor] = directory
+
+    def read_changes(self, timeout: float = None) -> set[Path]:
+        """Waits for changes and returns changed files (new directories are watched too)
+
+        Args:
+            timeout (float, optional): maximum seconds to wait. Waits until change if None. Defaults to None.
+
+        Returns:
+            set[Path]: changed (created, modified, moved, or deleted) files
+        """
+
+        # Wait for events
+        readable, _, _ = select.select([self.file_descriptor], [], [], timeout)
+        if len(readable) == 0:
+            return set()
+        try:
+            events = os.read(self.file_descriptor, 65536)
+        except BlockingIOError:
+            return set()
+
+        # Unpack each event
+        changed_files, offset = set(), 0
+        while offset < len(events):
+            watch_descriptor, mask, _, name_length = EVENT_HEADER.unpack_from(
+                events, offset
+            )
+            offset += EVENT_HEADER.size
+            name = os.fsdecode(events[offset : offset + name_length].rstrip(b"\0"))
+            offset += name_length
+
+            directory = self.watched_directories.get(watch_descriptor)
+            if directory is None or name == "":
+                continue
+
+            # Watch new directories (and report the files already in them)
+            file_path = Path(directory, name)
+            if mask & IN_ISDIR:
+                if mask & (IN_CREATE | IN_MOVED_TO) and is_watched_directory(file_path):
+                    for new_directory in find_watched_directories(file_path):
+                        self.add_directory(new_directory)
+                        changed_files.update(new_directory.iterdir())
+                continue
+
+            changed_files.add(file_path)
+
+        return changed_files
+
+    def close(self):
+        """Stops watching"""
+
+        os.close(self.file_descriptor)
+
+
+class PollingWatcher:
+    """Watches directory tree for changed files by comparing file modification times"""
+
+    def __init__(self, directory: Path = Path("."), interval: float = 0.25):
+        """Notes modification times of watched files
+
+        Args:
+            directory (Path, optional): directory to watch. Defaults to Path(".").
+            interval (float, optional): seconds between checks. Defaults to 0.25.
+        """
+
+        self.directory = directory
+        self.interval = interval
+        self.file_times = self.get_file_times()
+
+    def get_file_times(self) -> dict[Path, tuple[int, int]]:
+        """Gets modification time and size of each watched file
+
+        Returns:
+            dict[Path, tuple[int, int]]: modification time (nanoseconds) and size of each file
+        """
+
+        file_times = {}
+        for directory in find_watched_directories(self.directory):
+            with os.scandir(directory) as entries:
+                for entry in entries:
+                    if entry.is_file() and is_watched_file(Path(entry.name)):
+                        file_status = entry.stat()
+                        file_times[Path(directory, entry.name)] = (
+                            file_status.st_mtime_ns,
+                            file_status.st_size,
+                        )
+
+        return file_times
+
+    def read_changes(self, timeout: float = None) -> set[Path]:
+        """Checks for changed files until some are found (or timeout reached)
+
+        Args:
+            timeout (float, optional): maximum seconds to wait. Waits until change if None. Defaults to None.
+
+        Returns:
+            set[Path]: changed (created, modified, or deleted) files
+        """
+
+        end_time = None if timeout is None else time.monotonic() + timeout
+        while True:
+
+            # Compare file times with previous check
+            file_times = self.get_file_times()
+            changed_files = {
+                file_path
+                for file_path in file_times.keys() | self.file_times.keys()
+                if file_times.get(file_path) != self.file_times.get(file_path)
+            }
+            self.file_times = file_times
+            if len(changed_files) > 0:
+                return changed_files
+
+            # Check if time left to wait
+            if end_time is not None and time.monotonic() >= end_time:
+                return set()
+            time.sleep(
+                self.interval
+                if end_time is None
+                else max(0, min(self.interval, end_time - time.monotonic()))
+            )
+
+    def close(self):
+        """Stops watching"""
+
+
+def create_watcher(
+    directory: Path = Path("."),
+) -> InotifyWatcher | PollingWatcher:
+    """Creates inotify watcher on Linux, falling back on polling elsewhere (or if inotify fails)
+
+    Args:
+        directory (Path, optional): directory to watch. Defaults to Path(".").
+
+    Returns:
+        InotifyWatcher | PollingWatcher: watcher
+    """
+
+    if sys.platform.startswith("linux"):
+        try:
+            return InotifyWatcher(directory)
+        except (OSError, AttributeError, TypeError):
+            pass
+
+    return PollingWatcher(directory)
+
+
+def wait_for_changes(
+    watcher: InotifyWatcher | PollingWatcher, debounce: float = 0.1
+) -> set[Path]:
+    """Waits for watched files to change, then until no more changes for debounce seconds
+
+    Editors often write a file several times when it's saved, so bursts of changes are collected.
+
+    Args:
+        watcher (InotifyWatcher | PollingWatcher): watcher
+        debounce (float, optional): seconds without changes to wait. Defaults to 0.1.
+
+    Returns:
+        set[Path]: changed watched files
+    """
+
+    changed_files = set()
+    while len(changed_files) == 0:
+        changed_files = {
+            file_path
+            for file_path in watcher.read_changes()
+            if is_watched_file(file_path)
+        }
+
+    while True:
+        new_changes = {
+            file_path
+            for file_path in watcher.read_changes(timeout=debounce)
+            if is_watched_file(file_path)
+        }
+        if len(new_changes) == 0:
+            return changed_files
+        changed_files.update(new_changes)
+
+
+def update_watched_badges(
+    target_paths: [Path],
+    tester: str = "unittest",
+    tests_passed: bool = True,
+    file_hashes: dict = None,
+    badge_directory: Path = None,
+    diff_ref: str = None,
+) -> dict[str, str]:
+    """Builds badges from baseline coverage data and updates them in documentation files
+
+    Args:
+        target_paths ([Path]): paths to documentation files (README first)
+        tester (str, optional): unit test package to use ("unittest" or "pytest"). Defaults to "unittest".
+        tests_passed (bool, optional): whether the tests passed (failing badge if not). Defaults to True.
+        file_hashes (dict, optional): hash of each source file before tests ran (see
+            impact_functions.hash_source_files()). Defaults to None.
+        badge_directory (Path, optional): directory to render badges as SVG files in (see
+            unittest_coverage_functions.update_badges_in_files()). Badges link to shields io if None.
+            Defaults to None.
+        diff_ref (str, optional): git reference to add diff coverage badge for lines changed since.
+            No diff coverage badge if None. Defaults to None.
+
+    Returns:
+        dict[str, str]: shields io badge url for each badge (keyed by badge name)
+    """
+
+    # Build the badge from baseline data (and update the test index)
+    if tests_passed:
+        baseline_object = coverage.Coverage(
+            data_file=str(impact_functions.BASELINE_DATA_PATH), source=["."]
+        )
+        baseline_object.load()
+        impact_functions.write_test_index(
+            impact_functions.build_test_index(
+                baseline_object.get_data(), tester, file_hashes
+            )
+        )
+        coverage_report = unittest_coverage_functions.build_coverage_records(
+            baseline_object,
+            unittest_coverage_functions.load_patterns_to_ignore_in_coverage(),
+        )
+    else:
+        coverage_report = []
+    badge_urls = {
+        "Code Coverage": unittest_coverage_functions.make_coverage_badge_url(
+            coverage_report
+        )
+    }
+
+    # Build diff coverage badge (if requested and tests passed)
+    if diff_ref is not None and tests_passed:
+        from coverage_shield import diff_coverage_functions
+
+        badge_urls["Diff Coverage"] = (
+            diff_coverage_functions.build_diff_coverage_badge_url(
+                diff_ref, data_file=impact_functions.BASELINE_DATA_PATH
+            )
+        )
+
+    # Update badges in README (and other documentation files)
+    unittest_coverage_functions.update_badges_in_files(
+        badge_urls, target_paths, badge_directory
+    )
+
+    return badge_urls
+
+
+def run_watch_mode(
+    target_paths: [Path],
+    tester: str = "unittest",
+    debounce: float = 0.1,
+    badge_directory: Path = None,
+    diff_ref: str = None,
+):
+    """Keeps running, rerunning tests affected by saved changes and updating badges in README (and
+    other documentation files)
+
+    Tests run in current process, so packages the tests use stay imported between runs. Stops on
+    keyboard interrupt (Ctrl+C).
+
+    Args:
+        target_paths ([Path]): paths to documentation files (README first)
+        tester (str, optional): unit test package to use ("unittest" or "pytest"). Defaults to "unittest".
+        debounce (float, optional): seconds without changes to wait before running tests. Defaults to 0.1.
+        badge_directory (Path, optional): directory to render badges as SVG files in. Badges link to
+            shields io if None. Defaults to None.
+        diff_ref (str, optional): git reference to add diff coverage badge for lines changed since.
+            No diff coverage badge if None. Defaults to None.
+    """
+
+    # Start watching before first run (so changes during run aren't missed)
+    watcher = create_watcher(Path("."))
+    print(f"Watching for changes using {type(watcher).__name__} (Ctrl+C to stop).")
+
+    # Run all tests to record baseline
+    start_time = time.perf_counter()
+    file_hashes = impact_functions.hash_source_files()
+    tests_passed = impact_functions.run_impacted_tests(tester)
+    badge_urls = update_watched_badges(
+        target_paths, tester, tests_passed, file_hashes, badge_directory, diff_ref
+    )
+    print(
+        f"Updated badges in {time.perf_counter() - start_time:.3f}s: "
+        + ", ".join(badge_urls.values())
+    )
+
+    try:
+        while True:
+
+            # Wait for changes
+            watched_files = wait_for_changes(watcher, debounce)
+            start_time = time.perf_counter()
+
+            # Select the tests affected by files changed since baseline, found from their hashes so
+            # changes made while tests ran aren't missed (all tests if last run failed)
+            file_hashes = impact_functions.hash_source_files()
+            test_ids = None
+            if tests_passed:
+                test_index = impact_functions.read_test_index()
+                changed_files = impact_functions.find_changed_files(
+                    test_index["hashes"], file_hashes
+                )
+                if len(changed_files) == 0:
+                    continue
+                test_ids = impact_functions.select_impacted_tests(
+                    test_index, changed_files, tester
+                )
+            else:
+                changed_files = sorted(
+                    Path(os.path.relpath(file_path)).as_posix()
+                    for file_path in watched_files
+                )
+
+            # Run the tests and update the badge
+            print(
+                f"{', '.join(changed_files)} changed. Running "
+                + ("all tests." if test_ids is None else f"{len(test_ids)} tests.")
+            )
+            tests_passed = impact_functions.run_impacted_tests(
+                tester, test_ids, changed_files
+            )
+            badge_urls = update_watched_badges(
+                target_paths,
+                tester,
+                tests_passed,
+                file_hashes,
+                badge_directory,
+                diff_ref,
+            )
+            print(
+                f"Updated badges in {time.perf_counter() - start_time:.3f}s: "
+                + ", ".join(badge_urls.values())
+            )
+
+    except KeyboardInterrupt:
+        print("Stopped watching.")
+
+    finally:
+        watcher.close()
@@ -0,0 +1,443 @@
+# Load required libraries
+import ast  # finding imports in python files
+import importlib  # importing dependencies before forking
+import importlib.util  # finding where modules are installed
+import os  # forking processes and handling file paths
+import sys  # flushing output before forking
+import tempfile  # storing output of each worker
+import threading  # checking for threads before forking
+import traceback  # reporting errors in workers
+import warnings  # send warnings
+from pathlib import Path  # handling file paths
+import coverage  # measuring code coverage in workers and combining their data
+
+# Local imports
+from coverage_shield import unittest_coverage_functions
+from coverage_shield import parallel_coverage_functions
+from coverage_shield import profiling_functions
+from coverage_shield import metrics_functions
+from coverage_shield import output_functions
+
+
+def find_imported_modules(file_path: Path, directory: Path = Path(".")) -> [str]:
+    """Finds names of modules imported by python file
+
+    Relative imports are resolved using the file's location in the project directory, and names
+    imported from modules are included as they may be submodules (e.g. "package.module" for
+    "from package import module").
+
+    Args:
+        file_path (Path): path to python file (returns no modules if it can't be parsed)
+        directory (Path, optional): project directory. Defaults to Path(".").
+
+    Returns:
+        [str]: sorted full module names (e.g. "pandas.api" for "import pandas.api")
+    """
+
+    try:
+        tree = ast.parse(Path(file_path).read_bytes())
+    except (SyntaxError, ValueError, OSError):
+        return []
+
+    # Note the package the file is in (for resolving relative imports)
+    try:
+        package_parts = list(
+            Path(file_path)
+            .resolve()
+            .relative_to(Path(directory).resolve())
+            .parent.parts
+        )
+    except ValueError:
+        package_parts = None
+
+    module_names = set()
+    for node in ast.walk(tree):
+        if isinstance(node, ast.Import):
+            module_names.update(alias.name for alias in node.names)
+        elif isinstance(node, ast.ImportFrom):
+
+            # Resolve module being imported from
+            if node.level == 0:
+                module_name = node.module
+            elif package_parts is None or node.level - 1 > len(package_parts):
+                continue
+            else:
+                module_parts = package_parts[: len(package_parts) - (node.level - 1)]
+                if node.module is not None:
+                    module_parts = module_parts + node.module.split(".")
+                module_name = ".".join(module_parts)
+            if module_name == "":
+                continue
+
+            module_names.add(module_name)
+            module_names.update(
+                f"{module_name}.{alias.name}"
+                for alias in node.names
+                if alias.name != "*"
+            )
+
+    return sorted(module_names)
+
+
+def find_local_module_files(module_name: str, directory: Path = Path(".")) -> [Path]:
+    """Finds the files in project directory run when module is imported
+
+    Args:
+        module_name (str): full module name (e.g. "package.module")
+        directory (Path, optional): project directory. Defaults to Path(".").
+
+    Returns:
+        [Path]: paths to the package __init__.py files and module file found. Empty if module isn't
+            in directory.
+    """
+
+    module_parts = module_name.split(".")
+    if not any(
+        path.exists()
+        for path in (
+            Path(directory, module_parts[0]),
+            Path(directory, f"{module_parts[0]}.py"),
+        )
+    ):
+        return []
+
+    # Note the __init__.py of each package and the module file itself
+    file_paths = []
+    for index in range(1, len(module_parts) + 1):
+        module_path = Path(directory, *module_parts[:index])
+        for file_path in (
+            Path(module_path, "__init__.py"),
+            module_path.with_name(f"{module_path.name}.py"),
+        ):
+            if file_path.is_file():
+                file_paths.append(file_path)
+
+    return file_paths
+
+
+def find_test_dependencies(test_files: [Path], directory: Path = Path(".")) -> [str]:
+    """Finds the top level names of modules outside the project imported by test files
+
+    Imports of the project modules the test files import (directly or through other project
+    modules) are included, so the dependencies of the code under test are found but not those only
+    used by other files (e.g. setup.py, benchmarks or scripts).
+
+    Args:
+        test_files ([Path]): paths to test files
+        directory (Path, optional): project directory. Defaults to Path(".").
+
+    Returns:
+        [str]: sorted top level module names (e.g. "pandas" for "import pandas.api")
+    """
+
+    module_names = set()
+    parsed_files = set()
+    file_paths = [Path(file_path) for file_path in test_files]
+    while len(file_paths) > 0:
+
+        # Skip files already parsed
+        file_path = file_paths.pop()
+        if file_path.resolve() in parsed_files:
+            continue
+        parsed_files.add(file_path.resolve())
+
+        # Follow project modules and note the others
+        for module_name in find_imported_modules(file_path, directory):
+            local_files = find_local_module_files(module_name, directory)
+            if len(local_files) > 0:
+                file_paths.extend(local_files)
+            elif not Path(directory, module_name.split(".")[0]).exists():
+                module_names.add(module_name.split(".")[0])
+
+    return sorted(module_names)
+
+
+def is_external_module(module_name: str, directory: Path = Path(".")) -> bool:
+    """Checks if module is installed outside directory (so importing it isn't measured)
+
+    Args:
+        module_name (str): top level module name
+        directory (Path, optional): project directory. Defaults to Path(".").
+
+    Returns:
+        bool: True if module found outside directory and False if it's in directory or not found
+    """
+
+    try:
+        module_spec = importlib.util.find_spec(module_name)
+    except (ImportError, ValueError):
+        return False
+    if module_spec is None:
+        return False
+
+    # Check each location of module (namespace packages can have several)
+    directory = Path(directory).resolve()
+    locations = (
+        [module_spec.origin]
+        if module_spec.submodule_search_locations is None
+        else list(module_spec.submodule_search_locations)
+    )
+    for location in locations:
+        if location is None or location in ("built-in", "frozen"):
+            continue
+        if Path(location).resolve().is_relative_to(directory):
+            return False
+
+    return True
+
+
+def import_common_dependencies(
+    tester: str = "unittest", test_files: [Path] = (), directory: Path = Path(".")
+) -> [str]:
+    """Imports the dependencies of the tests (so forked workers don't have to)
+
+    Only modules imported by the test files (or the project modules they import) and installed
+    outside the project directory are imported, so the project's own modules are still imported
+    (and measured) in each worker. Modules that fail to import are skipped and importing stops if
+    a module starts a thread (as forking copies threads' locks but not the threads).
+
+    Args:
+        tester (str, optional): unit test package to use ("unittest" or "pytest"). Defaults to "unittest".
+        test_files ([Path], optional): paths to test files. Defaults to ().
+        directory (Path, optional): project directory. Defaults to Path(".").
+
+    Returns:
+        [str]: names of modules imported
+    """
+
+    module_names = [tester] + find_test_dependencies(test_files, directory)
+
+    imported_modules = []
+    for module_name in module_names:
+        if module_name in sys.modules:
+            continue
+        if not is_external_module(module_name, directory):
+            continue
+        thread_count = threading.active_count()
+        try:
+            importlib.import_module(module_name)
+        except Exception:
+            continue
+        imported_modules.append(module_name)
+        if threading.active_count() > thread_count:
+            warnings.warn(
+                f"Importing {module_name} started a thread, so no more dependencies imported before forking workers."
+            )
+            break
+
+    return imported_modules
+
+
+def run_worker(
+    tester: str,
+    test_modules: [str],
+    timings_path: Path = None,
+    omit_patterns: [str] = (),
+) -> int:
+    """Runs batch of test modules under coverage in a forked worker
+
+    Coverage is started in the worker (after the fork) and its data written to a parallel (uniquely
+    named) data file.
+
+    Args:
+        tester (str): unit test package to use ("unittest" or "pytest")
+        test_modules ([str]): test modules to run
+        timings_path (Path, optional): file to write duration of each test to. Not recorded if None.
+            Defaults to None.
+        omit_patterns ([str], optional): coverage omit patterns of files not to trace. Defaults to ().
+
+    Returns:
+        int: exit code (0 if tests passed and 1 otherwise)
+    """
+
+    try:
+        coverage_object = coverage.Coverage(
+            source=["."], omit=omit_patterns, data_suffix=True
+        )
+        tests_passed = unittest_coverage_functions.measure_tests_in_process(
+            coverage_object, tester, timings_path, test_modules
+        )
+        coverage_object.save()
+
+    except BaseException:
+        traceback.print_exc()
+        tests_passed = False
+
+    return 0 if tests_passed else 1
+
+
+def start_worker(
+    tester: str,
+    test_modules: [str],
+    output_path: Path,
+    timings_path: Path = None,
+    omit_patterns: [str] = (),
+) -> int:
+    """Forks worker process to run batch of test modules (see run_worker())
+
+    Args:
+        tester (str): unit test package to use ("unittest" or "pytest")
+        test_modules ([str]): test modules to run
+        output_path (Path): file to write worker's standard error (unit testing progress) to
+        timings_path (Path, optional): file to write duration of each test to. Not recorded if None.
+            Defaults to None.
+        omit_patterns ([str], optional): coverage omit patterns of files not to trace. Defaults to ().
+
+    Returns:
+        int: process id of worker
+    """
+
+    # Flush output so buffered text isn't written by both processes
+    sys.stdout.flush()
+    sys.stderr.flush()
+
+    process_id = os.fork()
+    if process_id != 0:
+        return process_id
+
+    # In worker - send standard error to output file, run the tests, and exit (skipping clean up of parent)
+    exit_code = 1
+    try:
+        sys.stderr = open(output_path, "w")
+        os.dup2(sys.stderr.fileno(), 2)
+        exit_code = run_worker(tester, test_modules, timings_path, omit_patterns)
+    finally:
+        sys.stdout.flush()
+        sys.stderr.flush()
+        os._exit(exit_code)
+
+
+def run_worker_pool(
+    tester: str = "unittest",
+    jobs: int = 1,
+    timings_path: Path = None,
+    omit_patterns: [str] = (),
+    log_path: Path = None,
+    tail_lines: int = output_functions.DEFAULT_TAIL_LINES,
+) -> coverage.Coverage:
+    """Runs test modules in batches in workers forked from this (pre-warmed) process and combines their data
+
+    The tests' dependencies are imported once before forking (see import_common_dependencies()),
+    so the workers start running tests straight away instead of importing them again. If threads
+    are running before forking, the test modules are run in coverage processes instead (see
+    parallel_coverage_functions.run_parallel_code_coverage()). Only available where processes can
+    be forked (not Windows).
+
+    Args:
+        tester (str, optional): unit test package to use ("unittest" or "pytest"). Defaults to "unittest".
+        jobs (int, optional): number of batches (and workers run at once). Uses all cores if 0. Defaults to 1.
+        timings_path (Path, optional): file to write duration of each test (across all batches) to. Not
+            recorded if None. Defaults to None.
+        omit_patterns ([str], optional): coverage omit patterns of files not to trace. Defaults to ().
+        log_path (Path, optional): log file to copy test output of each batch to. Console if None.
+            Defaults to None.
+        tail_lines (int, optional): number of last lines of each batch's output kept for warnings.
+            Defaults to output_functions.DEFAULT_TAIL_LINES.
+
+    Returns:
+        coverage.Coverage: coverage object holding combined data or None if any batch failed
+    """
+
+    # Check processes can be forked
+    if not hasattr(os, "fork"):
+        raise ValueError("The fork engine isn't available on this platform")
+
+    # Note number of jobs
+    jobs = os.cpu_count() if jobs == 0 else jobs
+
+    # Find and split the test modules
+    test_modules = parallel_coverage_functions.discover_test_modules(tester)
+    if len(test_modules) == 0:
+        warnings.warn("No test modules found to run in worker pool!")
+        return None
+    test_files = [
+        Path(module if tester == "pytest" else module.replace(".", os.sep) + ".py")
+        for module in test_modules
+    ]
+    module_sizes = [os.path.getsize(test_file) for test_file in test_files]
+    batches = parallel_coverage_functions.split_into_shards(
+        test_modules, module_sizes, jobs
+    )
+
+    # Warm up this process by importing the dependencies the workers will need
+    import_common_dependencies(tester, test_files)
+
+    # Run in coverage processes instead if threads are running (forked workers would inherit their locks)
+    if threading.active_count() > 1:
+        warnings.warn(
+            "Threads are running, so test modules run in coverage processes instead of forked workers."
+        )
+        return parallel_coverage_functions.run_parallel_code_coverage(
+            tester, jobs, timings_path, omit_patterns, log_path, tail_lines
+        )
+
+    # Remove data from previous runs
+    coverage_object = coverage.Coverage()
+    coverage_object.erase()
+
+    # Note where each batch writes its test durations
+    batch_timings_paths = [
+        None if timings_path is None else Path(f"{timings_path}.{index}")
+        for index in range(len(batches))
+    ]
+
+    with tempfile.TemporaryDirectory() as output_directory:
+
+        # Run the batches (no more than jobs at once)
+        output_paths = [
+            Path(output_directory, f"batch_{index}.txt")
+            for index in range(len(batches))
+        ]
+        exit_codes = [None] * len(batches)
+        running_workers = {}
+        for index, batch in enumerate(batches):
+            while len(running_workers) == jobs:
+                process_id, wait_status = os.wait()
+                if process_id in running_workers:
+                    exit_codes[running_workers.pop(process_id)] = (
+                        os.waitstatus_to_exitcode(wait_status)
+                    )
+            process_id = start_worker(
+                tester,
+                batch,
+                output_paths[index],
+                batch_timings_paths[index],
+                omit_patterns,
+            )
+            running_workers[process_id] = index
+        for process_id, index in running_workers.items():
+            _, wait_status = os.waitpid(process_id, 0)
+            exit_codes[index] = os.waitstatus_to_exitcode(wait_status)
+
+        # Check the results
+        batches_passed = True
+        with output_functions.open_output(log_path) as output:
+            for batch, output_path, exit_code in zip(batches, output_paths, exit_codes):
+
+                # Show output from batch (unit testing progress sent to standard error)
+                tail = output_functions.copy_output(output_path, output, tail_lines)
+
+                if exit_code != 0:
+                    warnings.warn(
+                        f"Running coverage on test modules ({', '.join(batch)}) in worker failed! Exit code: {exit_code}.{output_functions.format_tail(tail)}"
+                    )
+                    batches_passed = False
+
+    # Merge the test durations from each batch
+    if timings_path is not None:
+        profiling_functions.write_test_durations(
+            profiling_functions.read_test_durations(batch_timings_paths),
+            timings_path,
+        )
+        for batch_timings_path in batch_timings_paths:
+            batch_timings_path.unlink(missing_ok=True)
+
+    if not batches_passed:
+        return None
+
+    # Combine the batch data files
+    with metrics_functions.record_phase("combine_coverage_data"):
+        coverage_object.combine()
+        coverage_object.save()
+
+    return coverage_object
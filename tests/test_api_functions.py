@@ -0,0 +1,109 @@
+# Load packages
+import unittest  # running tests
+from pathlib import Path  # handling file paths
+import tempfile  # creating temporary directories
+import os  # checking current directory
+from concurrent.futures import ThreadPoolExecutor  # running projects from threads
+
+# Local imports
+from coverage_shield import api_functions  # library api
+from coverage_shield.coverage_data_functions import CoverageRecord
+from tests.test_batch_functions import create_repository  # creating small projects
+
+
+class TestApiFunctions(unittest.TestCase):
+    def test_calculate_coverage_percentage(self):
+        """Test percentage calculated and rounded as on the badge"""
+
+        self.assertEqual(
+            api_functions.calculate_coverage_percentage(
+                CoverageRecord("TOTAL", 3, 1, 0, 0)
+            ),
+            66.7,
+            "Check percentage rounded",
+        )
+        self.assertEqual(
+            api_functions.calculate_coverage_percentage(
+                CoverageRecord("TOTAL", 0, 0, 0, 0)
+            ),
+            100.0,
+            "Check project without statements fully covered",
+        )
+        self.assertIsNone(
+            api_functions.calculate_coverage_percentage(None),
+            "Check no percentage if coverage failed",
+        )
+
+    def test_find_coverage_config(self):
+        """Test coverage configuration found in project directory (as coverage finds it)"""
+
+        with tempfile.TemporaryDirectory() as temporary_directory:
+            no_config = api_functions.find_coverage_config(Path(temporary_directory))
+            Path(temporary_directory, "setup.cfg").write_text("[metadata]\nname = a\n")
+            Path(temporary_directory, "pyproject.toml").write_text(
+                '[tool.coverage.report]\nexclude_lines = ["def unused"]\n'
+            )
+            pyproject_config = api_functions.find_coverage_config(
+                Path(temporary_directory)
+            )
+            Path(temporary_directory, ".coveragerc").touch()
+            coveragerc_config = api_functions.find_coverage_config(
+                Path(temporary_directory)
+            )
+
+        self.assertFalse(no_config, "Check no configuration")
+        self.assertEqual(
+            Path(pyproject_config).name,
+            "pyproject.toml",
+            "Check files without coverage settings skipped",
+        )
+        self.assertEqual(
+            Path(coveragerc_config).name, ".coveragerc", "Check .coveragerc first"
+        )
+
+    def test_update_coverage_badge(self):
+        """Test projects run from several threads without changing directory"""
+
+        directory = os.getcwd()
+        with tempfile.TemporaryDirectory() as temporary_directory:
+
+            # Create passing and failing projects (ignoring tests in passing project)
+            passing_directory = Path(temporary_directory, "passing")
+            failing_directory = Path(temporary_directory, "failing")
+            create_repository(passing_directory)
+            create_repository(failing_directory, test_passes=False)
+            Path(passing_directory, ".covignore").write_text("tests/\n")
+            Path(passing_directory, "pyproject.toml").write_text(
+                '[tool.coverage.report]\nexclude_lines = ["return 1"]\n'
+            )
+
+            # Update badges from separate threads
+            with ThreadPoolExecutor(max_workers=2) as executor:
+                passing_result, failing_result = executor.map(
+                    api_functions.update_coverage_badge,
+                    [passing_directory, failing_directory],
+                )
+            readme = Path(passing_directory, "README.md").read_text()
+
+        # Check passing project result
+        self.assertTrue(passing_result.passed, "Check passing project passed")
+        self.assertEqual(
+            passing_result.files,
+            (CoverageRecord("module.py", 3, 0, 0, 0),),
+            "Check per file statistics (ignoring tests and excluded line)",
+        )
+        self.assertEqual(passing_result.coverage, 100.0, "Check percentage")
+        self.assertIn(passing_result.badge_url, readme, "Check badge added to README")
+        self.assertIn("run_tests", passing_result.timings, "Check steps timed")
+
+        # Check failing project result
+        self.assertFalse(failing_result.passed, "Check failing project failed")
+        self.assertIsNone(failing_result.total, "Check no total")
+        self.assertIn("failing", failing_result.badge_url, "Check failing badge")
+
+        # Check directory unchanged
+        self.assertEqual(os.getcwd(), directory, "Check directory unchanged")
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,105 @@
+# Load packages
+import unittest  # running tests
+from pathlib import Path  # handling file paths
+import tempfile  # creating temporary directories
+import os  # checking file modification times
+
+# Local imports
+from coverage_shield import badge_functions  # functions to render badges locally
+
+
+class TestBadgeFunctions(unittest.TestCase):
+    def test_parse_badge_url(self):
+        """Test label, value, and colour read from shields io urls"""
+
+        self.assertEqual(
+            badge_functions.parse_badge_url(
+                "https://img.shields.io/badge/coverage-87.5%25-a5d86a"
+            ),
+            ("coverage", "87.5%", "a5d86a"),
+            "Check coverage badge parsed",
+        )
+        self.assertEqual(
+            badge_functions.parse_badge_url(
+                "https://img.shields.io/badge/diff%20coverage-n%2Fa-lightgrey"
+            ),
+            ("diff coverage", "n/a", "lightgrey"),
+            "Check encoded characters decoded",
+        )
+        self.assertEqual(
+            badge_functions.parse_badge_url(
+                "https://img.shields.io/badge/my--label_one-some__value-red"
+            ),
+            ("my-label one", "some_value", "red"),
+            "Check doubled dashes and underscores decoded",
+        )
+        with self.assertRaises(ValueError):
+            badge_functions.parse_badge_url("https://img.shields.io/badge/coverage")
+
+    def test_render_badge_svg(self):
+        """Test badge sized around text and coloured"""
+
+        badge_svg = badge_functions.render_badge_svg("coverage", "87.5%", "a5d86a")
+
+        # Check text, colour, and size (label and value each padded by 10 pixels)
+        width = (
+            round(badge_functions.measure_text_width("coverage"))
+            + round(badge_functions.measure_text_width("87.5%"))
+            + 20
+        )
+        self.assertIn("<title>coverage: 87.5%</title>", badge_svg, "Check text")
+        self.assertIn('fill="#a5d86a"', badge_svg, "Check colour")
+        self.assertIn(
+            f'<svg xmlns="http://www.w3.org/2000/svg" width="{width}"',
+            badge_svg,
+            "Check width",
+        )
+        self.assertIn('fill="#333">87.5%', badge_svg, "Check dark text on light colour")
+
+        # Check named colours, white text on dark colours, and text escaped
+        badge_svg = badge_functions.render_badge_svg("a<b", "failing", "red")
+        self.assertIn('fill="#e05d44"', badge_svg, "Check named colour")
+        self.assertIn('fill="#fff">failing', badge_svg, "Check white text")
+        self.assertIn("a&lt;b", badge_svg, "Check text escaped")
+        with self.assertRaises(ValueError):
+            badge_functions.render_badge_svg("coverage", "50%", "not a colour")
+
+    def test_write_local_badges(self):
+        """Test badges written once and linked relative to README"""
+
+        with tempfile.TemporaryDirectory() as temporary_directory:
+            badge_urls = {
+                "Code Coverage": "https://img.shields.io/badge/coverage-87.5%25-a5d86a",
+                "Diff Coverage": "https://img.shields.io/badge/diff%20coverage-n%2Fa-lightgrey",
+            }
+            badge_directory = Path(temporary_directory, "images", "badges")
+            readme_path = Path(temporary_directory, "README.md")
+
+            # Write badges
+            badge_paths, written_paths = badge_functions.write_local_badges(
+                badge_urls, badge_directory, readme_path
+            )
+            badge_path = Path(badge_directory, "code_coverage.svg")
+            os.utime(badge_path, (0, 0))
+
+            # Write same badges again
+            _, rewritten_paths = badge_functions.write_local_badges(
+                badge_urls, badge_directory, readme_path
+            )
+            modified_time = badge_path.stat().st_mtime
+
+        self.assertEqual(
+            badge_paths,
+            {
+                "Code Coverage": "images/badges/code_coverage.svg",
+                "Diff Coverage": "images/badges/diff_coverage.svg",
+            },
+            "Check badge paths relative to README",
+        )
+        self.assertEqual(len(written_paths), 2, "Check badges written")
+        self.assertEqual(rewritten_paths, [], "Check unchanged badges not rewritten")
+        self.assertEqual(modified_time, 0, "Check unchanged badge file untouched")
+
+
+if __name__ == "__main__":
+    unittest.main()
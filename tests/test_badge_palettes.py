@@ -0,0 +1,24 @@
+# Load packages
+import unittest  # running tests
+import seaborn  # creating colour palettes
+
+# Local imports
+from coverage_shield.badge_palettes import (
+    BADGE_PALETTES,
+)  # precomputed colour palettes for badges
+
+
+class TestBadgePalettes(unittest.TestCase):
+    def test_badge_palettes(self):
+        """Test precomputed palettes match those seaborn creates"""
+
+        for palette_name, palette in BADGE_PALETTES.items():
+            self.assertEqual(
+                palette,
+                list(seaborn.color_palette(palette_name, 100).as_hex()),
+                f"Check precomputed {palette_name} palette matches seaborn",
+            )
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,185 @@
+# Load packages
+import unittest  # running tests
+from pathlib import Path  # handling file paths
+import tempfile  # creating temporary directories
+
+# Local imports
+from coverage_shield import (
+    batch_functions,
+)  # functions for running coverage_shield on many repositories
+from coverage_shield import command_line_interface_functions  # cli functions
+
+
+def create_repository(directory: Path, test_passes: bool = True):
+    """Creates small repository with a module, its tests, and a README (for testing)
+
+    Args:
+        directory (Path): directory to create repository in
+        test_passes (bool, optional): whether the test passes. Defaults to True.
+    """
+
+    Path(directory, "tests").mkdir(parents=True)
+    Path(directory, "tests", "__init__.py").touch()
+    with open(Path(directory, "module.py"), "w") as file:
+        file.write(
+            "def double(value):\n    return value * 2\n\n\ndef unused():\n    return 1\n"
+        )
+    with open(Path(directory, "tests", "test_module.py"), "w") as file:
+        file.write(
+            "import unittest\n"
+            "import module\n\n\n"
+            "class TestModule(unittest.TestCase):\n"
+            "    def test_double(self):\n"
+            f"        self.assertEqual(module.double(2), {4 if test_passes else 5})\n"
+        )
+    with open(Path(directory, "README.md"), "w") as file:
+        file.write("# Repository\n")
+
+
+class TestBatchFunctions(unittest.TestCase):
+    def test_expand_directories(self):
+        """Test directory patterns expanded into unique directories"""
+
+        with tempfile.TemporaryDirectory() as temporary_directory:
+
+            # Create some directories and a file
+            for name in ["packages/a", "packages/b", "other"]:
+                Path(temporary_directory, name).mkdir(parents=True)
+            Path(temporary_directory, "packages", "file.txt").touch()
+
+            # Expand the patterns
+            directories = batch_functions.expand_directories(
+                ["packages/*", "other", "packages/a", "missing"],
+                Path(temporary_directory),
+            )
+            expected = [
+                Path(temporary_directory, name).resolve()
+                for name in ["packages/a", "packages/b", "other"]
+            ]
+
+        self.assertEqual(directories, expected, "Check directories found once")
+
+    def test_build_repository_arguments(self):
+        """Test options for each repository passed on (but not batch options)"""
+
+        parser = command_line_interface_functions.build_command_line_interface()
+        args = command_line_interface_functions.parse_command_line_arguments(
+            parser,
+            [
+                "-b",
+                "packages/*",
+                "--concurrency",
+                "4",
+                "-e",
+                "fork",
+                "-i",
+                "-n",
+                "--history_report",
+            ],
+            testing=True,
+        )
+        self.assertEqual(
+            batch_functions.build_repository_arguments(args),
+            [
+                "--readme",
+                "README.md",
+                "--tester",
+                "unittest",
+                "--engine",
+                "fork",
+                "--jobs",
+                "1",
+                "--tail_lines",
+                "20",
+                "--incremental",
+                "--history_report",
+                "10",
+                "--no_cache",
+            ],
+            "Check repository arguments built",
+        )
+
+    def test_run_batch(self):
+        """Test repositories run concurrently and summarised"""
+
+        with tempfile.TemporaryDirectory() as temporary_directory:
+
+            # Create passing and failing repositories
+            passing_directory = Path(temporary_directory, "passing")
+            failing_directory = Path(temporary_directory, "failing")
+            create_repository(passing_directory)
+            create_repository(failing_directory, test_passes=False)
+
+            # Run coverage_shield on both
+            results = batch_functions.run_batch(
+                [passing_directory, failing_directory], ["--no_cache"], concurrency=2
+            )
+            passing_readme = Path(passing_directory, "README.md").read_text()
+            failing_log = Path(
+                failing_directory, batch_functions.BATCH_LOG_PATH
+            ).read_text()
+
+        # Check results
+        self.assertEqual(
+            [(result.status, result.coverage) for result in results],
+            [("passed", "88.9%"), ("failing", None)],
+            "Check result of each repository",
+        )
+        self.assertIn("coverage-88.9%25", passing_readme, "Check badge added to README")
+        self.assertIn("FAILED", failing_log, "Check test output written to log")
+        summary = batch_functions.format_batch_summary(results, 1.0)
+        self.assertIn(
+            "2 repositories: 1 passed, 1 failing, 0 errors in 1.0s",
+            summary,
+            "Check totals summarised",
+        )
+
+    def test_run_batch_local_badges(self):
+        """Test results collected from each run (not README) when badges rendered locally"""
+
+        with tempfile.TemporaryDirectory() as temporary_directory:
+
+            # Create a repository and run coverage_shield on it twice (second run cached)
+            directory = Path(temporary_directory, "repository")
+            create_repository(directory)
+            results = [
+                batch_functions.run_batch([directory], ["--local_badges"])[0]
+                for _ in range(2)
+            ]
+            readme = Path(directory, "README.md").read_text()
+
+        self.assertIn(
+            "badges/code_coverage.svg", readme, "Check README links local badge"
+        )
+        self.assertEqual(
+            [(result.status, result.coverage, result.cached) for result in results],
+            [("passed", "88.9%", False), ("passed", "88.9%", True)],
+            "Check result of each run",
+        )
+
+    def test_repository_result(self):
+        """Test result of run written and read, and missing result noted"""
+
+        with tempfile.TemporaryDirectory() as temporary_directory:
+            result_path = Path(temporary_directory, "result.json")
+            batch_functions.write_repository_result(
+                {"statements": 9, "missed": 1, "badge_urls": {}, "cached": False},
+                result_path,
+            )
+            passed_result = batch_functions.read_repository_result(result_path)
+            batch_functions.write_repository_result(
+                {"statements": None, "missed": None, "badge_urls": {}, "cached": False},
+                result_path,
+            )
+            failing_result = batch_functions.read_repository_result(result_path)
+            missing_result = batch_functions.read_repository_result(
+                Path(temporary_directory, "missing.json")
+            )
+
+        self.assertEqual(passed_result, ("passed", "88.9%", False), "Check passed")
+        self.assertEqual(failing_result, ("failing", None, False), "Check failing")
+        self.assertIsNone(missing_result, "Check missing result")
+
+
+if __name__ == "__main__":
+    unittest.main()
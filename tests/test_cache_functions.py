@@ -0,0 +1,124 @@
+# Load packages
+import unittest  # running tests
+from pathlib import Path  # handling file paths
+import tempfile  # creating temporary directories
+import os  # setting file modification times
+
+# Local imports
+from coverage_shield import (
+    cache_functions,
+)  # functions for caching coverage results
+
+
+class TestCacheFunctions(unittest.TestCase):
+    def test_build_cache_key(self):
+        """Test cache key only changes when python files or options change"""
+
+        with tempfile.TemporaryDirectory() as temporary_directory:
+
+            # Create a python file and a README
+            directory = Path(temporary_directory)
+            with open(Path(directory, "module.py"), "w") as file:
+                file.write("a = 1\n")
+            with open(Path(directory, "README.md"), "w") as file:
+                file.write("# README\n")
+            cache_key = cache_functions.build_cache_key(directory, ["unittest"])
+
+            # Check key unchanged if README changes
+            with open(Path(directory, "README.md"), "a") as file:
+                file.write("More text\n")
+            self.assertEqual(
+                cache_functions.build_cache_key(directory, ["unittest"]),
+                cache_key,
+                "Check key unchanged when non-python file changes",
+            )
+
+            # Check key changes if options change
+            self.assertNotEqual(
+                cache_functions.build_cache_key(directory, ["pytest"]),
+                cache_key,
+                "Check key changes when options change",
+            )
+
+            # Check key changes if python file changes
+            with open(Path(directory, "module.py"), "a") as file:
+                file.write("b = 2\n")
+            self.assertNotEqual(
+                cache_functions.build_cache_key(directory, ["unittest"]),
+                cache_key,
+                "Check key changes when python file changes",
+            )
+
+    def test_build_cache_key_config_and_fixtures(self):
+        """Test cache key changes when coverage configuration or test fixtures change"""
+
+        with tempfile.TemporaryDirectory() as temporary_directory:
+
+            # Create a module, its tests, and a test fixture
+            directory = Path(temporary_directory)
+            Path(directory, "module.py").write_text("a = 1\n")
+            Path(directory, "tests/data").mkdir(parents=True)
+            Path(directory, "tests/test_module.py").write_text("import module\n")
+            Path(directory, "tests/data/input.txt").write_text("1\n")
+            cache_key = cache_functions.build_cache_key(directory, ["unittest"])
+
+            # Check key changes if test fixture changes
+            Path(directory, "tests/data/input.txt").write_text("2\n")
+            fixture_cache_key = cache_functions.build_cache_key(directory, ["unittest"])
+            self.assertNotEqual(
+                fixture_cache_key, cache_key, "Check key changes when fixture changes"
+            )
+
+            # Check key changes if coverage configuration added or changed
+            Path(directory, ".coveragerc").write_text("[run]\nbranch = True\n")
+            config_cache_key = cache_functions.build_cache_key(directory, ["unittest"])
+            self.assertNotEqual(
+                config_cache_key,
+                fixture_cache_key,
+                "Check key changes when coverage configuration added",
+            )
+            Path(directory, ".coveragerc").write_text("[run]\nomit = tests/*\n")
+            self.assertNotEqual(
+                cache_functions.build_cache_key(directory, ["unittest"]),
+                config_cache_key,
+                "Check key changes when coverage configuration changes",
+            )
+
+    def test_get_installed_packages(self):
+        """Test installed package metadata directories found"""
+
+        self.assertTrue(
+            any(
+                package.startswith("coverage-")
+                for package in cache_functions.get_installed_packages()
+            ),
+            "Check coverage package found",
+        )
+
+    def test_store_and_load_cached_result(self):
+        """Test results cached, loaded, and least recently used evicted"""
+
+        with tempfile.TemporaryDirectory() as temporary_directory:
+
+            # Store some results
+            cache_directory = Path(temporary_directory, "cache")
+            for index, cache_key in enumerate(["a", "b", "c"]):
+                cache_functions.store_cached_result(
+                    cache_key, {"badge_url": cache_key}, cache_directory, max_entries=2
+                )
+                os.utime(Path(cache_directory, f"{cache_key}.json"), (index, index))
+
+            # Check oldest result evicted
+            self.assertIsNone(
+                cache_functions.load_cached_result("a", cache_directory),
+                "Check least recently used result evicted",
+            )
+            self.assertEqual(
+                cache_functions.load_cached_result("b", cache_directory),
+                {"badge_url": "b"},
+                "Check cached result loaded",
+            )
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,99 @@
+# Load packages
+import unittest  # running tests
+from pathlib import Path  # handling file paths
+import tempfile  # creating temporary directories
+import os  # changing directory
+import coverage  # creating coverage data
+
+# Local imports
+from coverage_shield import combine_functions  # functions to combine data files
+
+
+class TestCombineFunctions(unittest.TestCase):
+    def test_combine_data_files(self):
+        """Test data files from many jobs found and merged over several rounds"""
+
+        with tempfile.TemporaryDirectory() as temporary_directory:
+
+            # Create a module and a data file for each job (each running a different line)
+            module_path = Path(temporary_directory, "module.py")
+            module_path.write_text("\n".join(f"a{line} = {line}" for line in range(9)))
+            for job in range(9):
+                job_directory = Path(temporary_directory, "artifacts", f"job{job}")
+                job_directory.mkdir(parents=True)
+                coverage_data = coverage.CoverageData(
+                    str(Path(job_directory, f".coverage.job{job}"))
+                )
+                coverage_data.add_lines({str(module_path): [job + 1]})
+                coverage_data.write()
+            Path(temporary_directory, "artifacts", ".coveragerc").touch()
+
+            # Find and combine the data files (in four processes, needing three rounds)
+            output_path = Path(temporary_directory, ".coverage")
+            data_paths = combine_functions.find_data_files(
+                Path(temporary_directory), output_path
+            )
+            coverage_object = combine_functions.combine_data_files(
+                data_paths, output_path, jobs=4
+            )
+            combined_lines = coverage_object.get_data().lines(str(module_path))
+            data_files_kept = all(data_path.is_file() for data_path in data_paths)
+
+            # Check output left out when finding data files again
+            found_again = combine_functions.find_data_files(
+                Path(temporary_directory), output_path
+            )
+
+        self.assertEqual(len(data_paths), 9, "Check data files found (not .coveragerc)")
+        self.assertEqual(
+            sorted(combined_lines), list(range(1, 10)), "Check lines of all jobs merged"
+        )
+        self.assertTrue(data_files_kept, "Check data files kept")
+        self.assertEqual(found_again, data_paths, "Check combined data file left out")
+
+    def test_run_combined_code_coverage(self):
+        """Test report built from combined data and warning if no data files"""
+
+        with tempfile.TemporaryDirectory() as temporary_directory:
+
+            # Create a module and data files of two jobs
+            module_path = Path(temporary_directory, "module.py")
+            module_path.write_text("a = 1\nb = 2\nc = 3\nd = 4\n")
+            for job, lines in enumerate([[1, 2], [2, 3]]):
+                coverage_data = coverage.CoverageData(
+                    str(Path(temporary_directory, f".coverage.{job}"))
+                )
+                coverage_data.add_lines({str(module_path): lines})
+                coverage_data.write()
+
+            # Combine (from data directory, writing .coverage to current directory)
+            with tempfile.TemporaryDirectory() as output_directory:
+                directory = Path.cwd()
+                try:
+                    os.chdir(output_directory)
+                    coverage_records = list(
+                        combine_functions.run_combined_code_coverage(
+                            Path(temporary_directory), jobs=2, stream=True
+                        )
+                    )
+                    combined_data_saved = Path(".coverage").is_file()
+                    with self.assertWarns(UserWarning):
+                        empty_records = list(
+                            combine_functions.run_combined_code_coverage(
+                                Path("missing"), stream=True
+                            )
+                        )
+                finally:
+                    os.chdir(directory)
+
+        self.assertEqual(
+            [record[1:] for record in coverage_records],
+            [(4, 1, 0, 0)],
+            "Check lines of both jobs counted",
+        )
+        self.assertTrue(combined_data_saved, "Check combined data saved")
+        self.assertEqual(empty_records, [], "Check empty report if no data files")
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -1,6 +1,8 @@
 # Load packages
 import unittest  # running tests
 from pathlib import Path  # handling file paths
+from contextlib import redirect_stderr  # capturing error messages
+from io import StringIO  # capturing error messages
 
 # Local imports
 from coverage_shield import command_line_interface_functions  # cli functions
@@ -50,6 +52,43 @@ class TestCommandLineInterfaceFunctions(unittest.TestCase):
             "Check readme stored as argument",
         )
 
+    def test_parse_jobs_default(self):
+        """Test jobs default to one process, or all cores when combining data files"""
+
+        parser = command_line_interface_functions.build_command_line_interface()
+        jobs = [
+            command_line_interface_functions.parse_command_line_arguments(
+                parser, arguments, testing=True
+            ).jobs
+            for arguments in [
+                [],
+                ["--combine", "data"],
+                ["--combine", "data", "-j", "2"],
+            ]
+        ]
+
+        self.assertEqual(jobs, [1, 0, 2], "Check default number of jobs")
+
+    def test_watch_incompatible_options(self):
+        """Test options watch mode can't use rejected"""
+
+        parser = command_line_interface_functions.build_command_line_interface()
+        with redirect_stderr(StringIO()) as error_output:
+            with self.assertRaises(SystemExit):
+                command_line_interface_functions.parse_command_line_arguments(
+                    parser, ["-w", "-e", "subprocess", "-g"], testing=True
+                )
+        args = command_line_interface_functions.parse_command_line_arguments(
+            parser, ["-w", "--local_badges", "--diff_coverage"], testing=True
+        )
+
+        self.assertIn(
+            "-w/--watch can't be used with -e/--engine, -g/--git_push",
+            error_output.getvalue(),
+            "Check incompatible options reported",
+        )
+        self.assertEqual(args.watch, 0.1, "Check compatible options accepted")
+
 
 if __name__ == "__main__":
     unittest.main()
@@ -0,0 +1,199 @@
+# Load packages
+import unittest  # running tests
+from pathlib import Path  # handling file paths
+import tempfile  # creating temporary directories
+import json  # creating coverage json reports
+import coverage  # creating coverage data
+
+# Local imports
+from coverage_shield import (
+    coverage_data_functions,
+)  # functions for reading coverage data
+
+
+def build_coverage_json() -> str:
+    """Builds a simple coverage json report for testing
+
+    Returns:
+        str: coverage json report
+    """
+
+    # Note statements and missed statements for some files
+    file_statistics = {
+        "setup.py": (3, 3),
+        "my package/__init__.py": (1, 0),
+        "my package/functions.py": (40, 10),
+        "tests/test_functions.py": (20, 0),
+    }
+
+    # Build the report
+    coverage_report = {
+        "files": {
+            name: {"summary": {"num_statements": statements, "missing_lines": missed}}
+            for name, (statements, missed) in file_statistics.items()
+        }
+    }
+
+    return json.dumps(coverage_report)
+
+
+class TestCoverageDataFunctions(unittest.TestCase):
+    def test_parse_coverage_json(self):
+        """Test coverage json report parsed into arrays"""
+
+        # Parse the json report
+        coverage_arrays = coverage_data_functions.parse_coverage_json(
+            build_coverage_json()
+        )
+
+        # Check file names (including spaces) kept
+        self.assertEqual(
+            coverage_arrays["names"][1],
+            "my package/__init__.py",
+            "Check file names with spaces read in",
+        )
+
+        # Check statistics read in
+        self.assertEqual(
+            list(coverage_arrays["statements"]),
+            [3, 1, 40, 20],
+            "Check statement counts read in",
+        )
+        self.assertEqual(
+            list(coverage_arrays["missed"]),
+            [3, 0, 10, 0],
+            "Check missed statement counts read in",
+        )
+        self.assertEqual(
+            list(coverage_arrays["branches"]),
+            [0, 0, 0, 0],
+            "Check branch counts default to zero",
+        )
+
+    def test_read_coverage_json(self):
+        """Test coverage json report file read into arrays"""
+
+        with tempfile.TemporaryDirectory() as temporary_directory:
+
+            # Write json report to file
+            json_path = Path(temporary_directory, "coverage.json")
+            with open(json_path, "w") as file:
+                file.write(build_coverage_json())
+
+            # Read the report
+            coverage_arrays = coverage_data_functions.read_coverage_json(json_path)
+
+        # Check all files read in
+        self.assertEqual(len(coverage_arrays["names"]), 4, "Check files read in")
+
+    def test_filter_coverage_arrays_and_totals(self):
+        """Test filtering files and calculating totals"""
+
+        # Parse the json report and remove ignored files
+        coverage_arrays = coverage_data_functions.filter_coverage_arrays(
+            coverage_data_functions.parse_coverage_json(build_coverage_json()),
+            ["setup.py", "__init__.py"],
+        )
+
+        # Check ignored files removed
+        self.assertEqual(
+            list(coverage_arrays["names"]),
+            ["my package/functions.py", "tests/test_functions.py"],
+            "Check ignored files removed",
+        )
+
+        # Check totals
+        self.assertEqual(
+            coverage_data_functions.calculate_coverage_totals(coverage_arrays),
+            (60, 10),
+            "Check total statements and missed statements",
+        )
+
+    def test_coverage_arrays_to_dataframe(self):
+        """Test arrays converted to coverage report dataframe"""
+
+        # Build the dataframe
+        coverage_dataframe = coverage_data_functions.coverage_arrays_to_dataframe(
+            coverage_data_functions.parse_coverage_json(build_coverage_json())
+        )
+
+        # Check percentage covered calculated
+        self.assertEqual(
+            list(coverage_dataframe.Cover),
+            [0.0, 100.0, 75.0, 100.0],
+            "Check percentage of statements covered",
+        )
+
+    def test_iterate_coverage_records(self):
+        """Test records of each file streamed from coverage.Coverage data"""
+
+        with tempfile.TemporaryDirectory() as temporary_directory:
+
+            # Create two simple modules
+            module_paths = [
+                Path(temporary_directory, "module_a.py"),
+                Path(temporary_directory, "module_b.py"),
+            ]
+            for module_path in module_paths:
+                with open(module_path, "w") as file:
+                    file.write("a = 1\nb = 2\nif a > b:\n    print(a)\n")
+
+            # Record lines executed in each module
+            coverage_object = coverage.Coverage(
+                data_file=str(Path(temporary_directory, ".coverage"))
+            )
+            coverage_object.get_data().add_lines(
+                {str(module_paths[0]): [1, 2, 3], str(module_paths[1]): [1]}
+            )
+
+            # Stream the records
+            coverage_records = list(
+                coverage_data_functions.iterate_coverage_records(coverage_object)
+            )
+
+        # Check statistics of each file
+        self.assertEqual(
+            [(record.statements, record.missed) for record in sorted(coverage_records)],
+            [(4, 1), (4, 3)],
+            "Check statements and missed statements of each file",
+        )
+
+    def test_filter_and_sum_coverage_records(self):
+        """Test streamed records filtered and summed"""
+
+        # Build records from json report
+        coverage_arrays = coverage_data_functions.parse_coverage_json(
+            build_coverage_json()
+        )
+        coverage_records = (
+            coverage_data_functions.CoverageRecord(name, statements, missed, 0, 0)
+            for name, statements, missed in zip(
+                coverage_arrays["names"],
+                coverage_arrays["statements"],
+                coverage_arrays["missed"],
+            )
+        )
+
+        # Remove ignored files and sum
+        coverage_total = coverage_data_functions.sum_coverage_records(
+            coverage_data_functions.filter_coverage_records(
+                coverage_records, ["setup.py", "__init__.py"]
+            )
+        )
+
+        # Check totals
+        self.assertEqual(
+            (coverage_total.statements, coverage_total.missed),
+            (60, 10),
+            "Check total statements and missed statements",
+        )
+
+        # Check no total without records
+        self.assertIsNone(
+            coverage_data_functions.sum_coverage_records([]),
+            "Check no total when no records",
+        )
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,129 @@
+# Load packages
+import unittest  # running tests
+from pathlib import Path  # handling file paths
+from coverage.files import GlobMatcher, prep_patterns  # matching coverage omit patterns
+
+# Local imports
+from coverage_shield import (
+    covignore_functions,
+)  # functions for matching .covignore patterns
+
+# Patterns for testing (a bit of everything)
+PATTERNS = [
+    "setup.py",
+    "vendor/",
+    "/build",
+    "docs/**/gen_*.py",
+    "*_pb2.py",
+    "[ab]_old.py",
+    "!vendor/keep.py",
+    "tests/data/",
+]
+
+
+class TestCovignoreFunctions(unittest.TestCase):
+    def test_split_pattern(self):
+        """Test pattern split into glob and flags"""
+
+        self.assertEqual(
+            covignore_functions.split_pattern("!/build/"),
+            ("build", True, True, True),
+            "Check negated, anchored, directory pattern split",
+        )
+        self.assertEqual(
+            covignore_functions.split_pattern("\\!important.py  "),
+            ("!important.py", False, False, False),
+            "Check escaped exclamation mark and trailing spaces",
+        )
+
+    def test_is_ignored(self):
+        """Test files ignored as git would ignore them"""
+
+        is_ignored = covignore_functions.build_ignore_function(PATTERNS)
+        expected = {
+            "setup.py": True,  # name matches anywhere
+            "package/setup.py": True,
+            "vendor/library.py": True,  # directory matches anywhere
+            "package/vendor/library.py": True,
+            "vendor": False,  # directory pattern doesn't match files
+            "vendor/keep.py": False,  # negated pattern re-includes file
+            "build/module.py": True,  # anchored to repository directory
+            "package/build/module.py": False,
+            "docs/gen_a.py": True,  # ** matches zero or more directories
+            "docs/api/v1/gen_b.py": True,
+            "package/message_pb2.py": True,  # * matches within name
+            "a_old.py": True,  # character class
+            "c_old.py": False,
+            "tests/data/fixture.py": True,
+            "package/tests/data/fixture.py": False,  # pattern with slash is anchored
+            "package/module.py": False,
+        }
+        for file_path, ignored in expected.items():
+            self.assertEqual(
+                is_ignored(file_path), ignored, f"Check if {file_path} is ignored"
+            )
+
+        # Check windows separators handled
+        self.assertTrue(is_ignored("vendor\\library.py"), "Check backslashes handled")
+
+    def test_compile_patterns(self):
+        """Test consecutive patterns joined into groups"""
+
+        compiled_patterns = covignore_functions.compile_patterns(tuple(PATTERNS))
+        self.assertEqual(
+            [negated for _, negated in compiled_patterns],
+            [False, True, False],
+            "Check patterns grouped by negation",
+        )
+
+    def test_build_omit_patterns(self):
+        """Test coverage omit patterns built from patterns after last negation"""
+
+        directory = Path.cwd()
+
+        # Check only patterns after negation used
+        self.assertEqual(
+            covignore_functions.build_omit_patterns(PATTERNS, directory),
+            [f"{directory.resolve().as_posix()}/tests/data/*"],
+            "Check patterns after last negation converted",
+        )
+
+        # Check coverage omits the same files the patterns ignore
+        omit_patterns = covignore_functions.build_omit_patterns(
+            ["setup.py", "vendor/", "/build", "docs/**/gen_*.py", "*_pb2.py"],
+            directory,
+        )
+        matcher = GlobMatcher(prep_patterns(omit_patterns), "omit")
+        is_ignored = covignore_functions.build_ignore_function(PATTERNS[:5])
+        for file_path in [
+            "package/setup.py",
+            "vendor/library.py",
+            "build/module.py",
+            "package/build/module.py",
+            "docs/api/gen_b.py",
+            "package/message_pb2.py",
+            "package/module.py",
+        ]:
+            self.assertEqual(
+                matcher.match(str(Path(directory, file_path).resolve())),
+                is_ignored(file_path),
+                f"Check coverage omits {file_path} if ignored",
+            )
+
+    def test_build_omit_arguments(self):
+        """Test omit command line argument built"""
+
+        self.assertEqual(
+            covignore_functions.build_omit_arguments(["**/setup.py", "**/vendor/*"]),
+            ["--omit=**/setup.py,**/vendor/*"],
+            "Check omit patterns joined",
+        )
+        self.assertEqual(
+            covignore_functions.build_omit_arguments([]),
+            [],
+            "Check no argument without patterns",
+        )
+
+
+if __name__ == "__main__":
+    unittest.main()
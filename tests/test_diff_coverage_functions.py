@@ -0,0 +1,96 @@
+# Load packages
+import unittest  # running tests
+from pathlib import Path  # handling file paths
+import tempfile  # creating temporary directories
+import os  # handling file paths
+import coverage  # creating coverage data
+
+# Local imports
+from coverage_shield import (
+    diff_coverage_functions,
+)  # functions for calculating coverage of changed lines
+
+
+class TestDiffCoverageFunctions(unittest.TestCase):
+    def test_build_interval_index(self):
+        """Test changed line ranges sorted and merged"""
+
+        # Build index from hunks (including deleted lines only)
+        interval_index = diff_coverage_functions.build_interval_index(
+            {
+                "module.py": [(10, 0, 12, 3), (3, 2, 3, 4), (1, 1, 7, 1)],
+                "deleted.py": [(1, 5, 0, 0)],
+            }
+        )
+
+        # Check ranges merged and sorted
+        starts, ends = interval_index["module.py"]
+        self.assertEqual(list(starts), [3, 12], "Check range starts")
+        self.assertEqual(list(ends), [7, 14], "Check range ends")
+
+        # Check files without added lines left out
+        self.assertFalse("deleted.py" in interval_index, "Check deleted file left out")
+
+    def test_count_lines_in_intervals(self):
+        """Test lines within ranges counted"""
+
+        starts, ends = diff_coverage_functions.build_interval_index(
+            {"module.py": [(1, 1, 3, 3), (1, 1, 10, 1)]}
+        )["module.py"]
+        self.assertEqual(
+            diff_coverage_functions.count_lines_in_intervals(
+                [1, 3, 5, 6, 10, 11], starts, ends
+            ),
+            3,
+            "Check lines within ranges counted",
+        )
+
+    def test_calculate_diff_coverage(self):
+        """Test statements and missed statements on changed lines counted"""
+
+        with tempfile.TemporaryDirectory() as temporary_directory:
+
+            # Create a simple module
+            module_path = Path(temporary_directory, "simple_module.py")
+            with open(module_path, "w") as file:
+                file.write("a = 1\nb = 2\nif a > b:\n    print(a)\n")
+
+            # Record the first three lines as executed
+            data_file = Path(temporary_directory, ".coverage")
+            coverage_data = coverage.CoverageData(basename=str(data_file))
+            coverage_data.add_lines({str(module_path): [1, 2, 3]})
+            coverage_data.write()
+
+            # Count statements on lines 2 to 4
+            relative_path = Path(os.path.relpath(module_path)).as_posix()
+            changed_statements, changed_missed = (
+                diff_coverage_functions.calculate_diff_coverage(
+                    diff_coverage_functions.build_interval_index(
+                        {relative_path: [(2, 3, 2, 3)]}
+                    ),
+                    data_file,
+                )
+            )
+
+        # Check counts
+        self.assertEqual(changed_statements, 3, "Check changed statements counted")
+        self.assertEqual(changed_missed, 1, "Check missed statements counted")
+
+    def test_make_diff_coverage_badge_url(self):
+        """Test diff coverage badge url built"""
+
+        self.assertTrue(
+            diff_coverage_functions.make_diff_coverage_badge_url(4, 1).startswith(
+                "https://img.shields.io/badge/diff%20coverage-75.0%25-"
+            ),
+            "Check diff coverage in badge",
+        )
+        self.assertEqual(
+            diff_coverage_functions.make_diff_coverage_badge_url(0, 0),
+            "https://img.shields.io/badge/diff%20coverage-n%2Fa-lightgrey",
+            "Check badge when no statements changed",
+        )
+
+
+if __name__ == "__main__":
+    unittest.main()
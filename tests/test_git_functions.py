@@ -2,6 +2,9 @@
 import unittest  # running tests
 from pathlib import Path  # handling file paths
 import subprocess  # command line commands
+import tempfile  # creating temporary directories
+import os  # changing directory
+from contextlib import contextmanager  # creating repository within a with statement
 
 # Local imports
 from coverage_shield import (
@@ -9,6 +12,64 @@ from coverage_shield import (
 )  # functions for interacting with git
 
 
+@contextmanager
+def create_repository_with_remote():
+    """Creates git repository (current directory within with statement) with a local bare
+    repository as its remote
+
+    Yields:
+        Path: path to bare repository
+    """
+
+    directory = Path.cwd()
+    with tempfile.TemporaryDirectory() as temporary_directory:
+        remote_path = Path(temporary_directory, "remote.git")
+        repository_path = Path(temporary_directory, "repository")
+        git_functions.send_command("git", "init", "--quiet", "--bare", str(remote_path))
+        git_functions.send_command(
+            "git", "clone", "--quiet", str(remote_path), str(repository_path)
+        )
+        try:
+            os.chdir(repository_path)
+            git_functions.send_command("git", "config", "user.name", "Tester")
+            git_functions.send_command("git", "config", "user.email", "test@test.com")
+            Path("README.md").write_text("# Package\n")
+            Path("other.md").write_text("Other\n")
+            git_functions.send_command("git", "add", "README.md", "other.md")
+            git_functions.send_command("git", "commit", "--quiet", "-m", "First")
+            git_functions.send_command(
+                "git", "push", "--quiet", "origin", "HEAD", capture_output=True
+            )
+            yield remote_path
+        finally:
+            os.chdir(directory)
+
+
+def get_last_commit(git_directory: Path = None) -> [str]:
+    """Gets message and files changed of last commit
+
+    Args:
+        git_directory (Path, optional): repository to check. Current repository if None.
+            Defaults to None.
+
+    Returns:
+        [str]: commit message followed by files changed
+    """
+
+    command_result = git_functions.send_command(
+        "git",
+        *([] if git_directory is None else ["--git-dir", str(git_directory)]),
+        "log",
+        "-1",
+        "--name-only",
+        "--format=%s",
+        capture_output=True,
+        text=True,
+    )
+
+    return [line for line in command_result.stdout.splitlines() if line != ""]
+
+
 class TestGitFunctions(unittest.TestCase):
     def test_check_if_file_changed_using_git(self):
 
@@ -59,6 +120,141 @@ class TestGitFunctions(unittest.TestCase):
         # Remove temporary file
         Path.unlink(temporary_file_path)
 
+    def test_commit_changed_files(self):
+        """Test only changed files staged and committed, in one commit"""
+
+        with create_repository_with_remote():
+
+            # Change README and add badge file (other.md unchanged)
+            Path("README.md").write_text("# Package\nBadge\n")
+            Path("badges").mkdir()
+            Path("badges", "coverage.svg").write_text("<svg></svg>")
+            Path("staged.txt").write_text("Staged\n")
+            git_functions.send_command("git", "add", "staged.txt")
+
+            # Commit the changed files
+            changed_paths = git_functions.commit_changed_files(
+                [Path("README.md"), Path("other.md"), Path("badges", "coverage.svg")],
+                "Updated badges",
+            )
+            last_commit = get_last_commit()
+            readme_changed = git_functions.check_if_file_changed_using_git(
+                Path("README.md")
+            )
+            staged_changed = git_functions.check_if_file_changed_using_git(
+                Path("staged.txt")
+            )
+
+            # Check nothing committed if nothing changed
+            unchanged_paths = git_functions.commit_changed_files(
+                [Path("README.md")], "Nothing changed"
+            )
+
+        self.assertEqual(
+            sorted(changed_paths),
+            ["README.md", "badges/coverage.svg"],
+            "Check changed files found",
+        )
+        self.assertEqual(
+            last_commit,
+            ["Updated badges", "README.md", "badges/coverage.svg"],
+            "Check changed files committed together",
+        )
+        self.assertFalse(readme_changed, "Check README committed")
+        self.assertTrue(staged_changed, "Check other staged files left staged")
+        self.assertEqual(unchanged_paths, [], "Check nothing committed")
+
+    def test_push_with_retry(self):
+        """Test push to local remote, and retries if remote missing"""
+
+        with create_repository_with_remote() as remote_path:
+
+            # Commit and push (waiting for push)
+            Path("README.md").write_text("# Package\nBadge\n")
+            git_functions.push_updated_readme(Path("README.md"), wait=True)
+            pushed_commit = get_last_commit(remote_path)
+
+            # Commit and push in the background
+            Path("README.md").write_text("# Package\nNew badge\n")
+            push_process = git_functions.push_updated_readme(Path("README.md"))
+            return_code = push_process.wait(timeout=60)
+            local_head, remote_head = [
+                git_functions.send_command(
+                    "git", *git_arguments, "rev-parse", "HEAD", capture_output=True
+                ).stdout
+                for git_arguments in [[], ["--git-dir", str(remote_path)]]
+            ]
+            push_log = git_functions.PUSH_LOG_PATH.read_text()
+
+            # Push to missing remote
+            git_functions.send_command(
+                "git", "remote", "set-url", "origin", str(Path("missing.git").resolve())
+            )
+            Path("README.md").write_text("# Package\n")
+            git_functions.commit_changed_files([Path("README.md")], "Not pushed")
+            pushed = git_functions.push_with_retry(retries=2, backoff=0.01)
+
+        self.assertEqual(
+            pushed_commit,
+            ["Updated coverage badge in README.md", "README.md"],
+            "Check commit pushed",
+        )
+        self.assertEqual(return_code, 0, "Check background push succeeded")
+        self.assertEqual(local_head, remote_head, "Check commit pushed in background")
+        self.assertIn("git push succeeded (attempt 1)", push_log, "Check push logged")
+        self.assertFalse(pushed, "Check push to missing remote failed")
+
+    def test_parse_diff_hunks(self):
+
+        # Create some git diff output
+        diff_output = "\n".join(
+            [
+                "diff --git a/module.py b/module.py",
+                "--- a/module.py",
+                "+++ b/module.py",
+                "@@ -3,2 +3,4 @@ def function():",
+                "@@ -10,0 +12 @@",
+                "diff --git a/old module.py b/old module.py",
+                "--- a/old module.py\t",
+                "+++ /dev/null",
+                "@@ -1,5 +0,0 @@",
+            ]
+        )
+
+        # Parse the hunks
+        diff_hunks = git_functions.parse_diff_hunks(diff_output)
+
+        # Check hunks for changed and deleted files
+        self.assertEqual(
+            diff_hunks,
+            {
+                "module.py": [(3, 2, 3, 4), (10, 0, 12, 1)],
+                "old module.py": [(1, 5, 0, 0)],
+            },
+            "Check hunks parsed from diff",
+        )
+
+    def test_get_diff_hunks(self):
+        """Test changed file paths found whatever diff prefixes git is configured with"""
+
+        with create_repository_with_remote():
+
+            # Change README and configure git not to use the usual diff prefixes
+            Path("README.md").write_text("# Package\nBadge\n")
+            diff_hunks = {}
+            for setting in ["diff.noprefix", "diff.mnemonicPrefix"]:
+                git_functions.send_command("git", "config", setting, "true")
+                diff_hunks[setting] = git_functions.get_diff_hunks("HEAD")
+                git_functions.send_command("git", "config", "--unset", setting)
+
+        # Check changed file path found with each setting
+        for setting, hunks in diff_hunks.items():
+            self.assertEqual(
+                hunks,
+                {"README.md": [(1, 0, 2, 1)]},
+                f"Check changed file path found with {setting}",
+            )
+
     def test_send_command(self):
 
         # Send a command in terminal
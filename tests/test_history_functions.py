@@ -0,0 +1,112 @@
+# Load packages
+import unittest  # running tests
+from pathlib import Path  # handling file paths
+import tempfile  # creating temporary directories
+
+# Local imports
+from coverage_shield import history_functions  # functions to record coverage history
+from coverage_shield.coverage_data_functions import CoverageRecord
+
+
+def record_commits(connection, commits: dict[str, list[CoverageRecord]]):
+    """Records coverage of each commit in history (for testing)
+
+    Args:
+        connection (sqlite3.Connection): connection to history database
+        commits (dict[str, list[CoverageRecord]]): statistics of each file, keyed by commit
+    """
+
+    for commit, coverage_records in commits.items():
+        history_functions.record_coverage(connection, commit, iter(coverage_records))
+
+
+class TestHistoryFunctions(unittest.TestCase):
+    def test_coverage_history(self):
+        """Test runs recorded and queried for trend, drops in coverage, and changed files"""
+
+        with tempfile.TemporaryDirectory() as temporary_directory:
+            history_path = Path(temporary_directory, "history", "history.sqlite3")
+            connection = history_functions.open_history(history_path)
+
+            # Record commits (rerunning the first commit, and with a failed run)
+            record_commits(
+                connection,
+                {
+                    "aaa": [CoverageRecord("a.py", 10, 5, 0, 0)],
+                    "bbb": [
+                        CoverageRecord("a.py", 10, 2, 0, 0),
+                        CoverageRecord("b.py", 10, 0, 0, 0),
+                    ],
+                    "ccc": [
+                        CoverageRecord("a.py", 10, 2, 0, 0),
+                        CoverageRecord("c.py", 20, 6, 0, 0),
+                    ],
+                },
+            )
+            total = history_functions.record_coverage(
+                connection, "aaa", iter([CoverageRecord("a.py", 10, 4, 2, 1)])
+            )
+            failed = history_functions.record_coverage(connection, "ddd", iter([]))
+
+            # Query history
+            trend = history_functions.get_coverage_trend(connection)
+            last_trend = history_functions.get_coverage_trend(connection, 2)
+            regressions = history_functions.find_regressions(connection)
+            file_deltas = history_functions.get_file_deltas(connection, "ccc", "bbb")
+            report = history_functions.format_history_report(connection)
+            connection.close()
+
+        self.assertEqual(total, CoverageRecord("TOTAL", 10, 4, 2, 1), "Check total")
+        self.assertIsNone(failed, "Check failed run not recorded")
+        self.assertEqual(
+            [(record.commit, record.coverage) for record in trend],
+            [("bbb", 90.0), ("ccc", 73.3), ("aaa", 60.0)],
+            "Check latest run of each commit used (oldest first)",
+        )
+        self.assertEqual(
+            [record.commit for record in last_trend],
+            ["ccc", "aaa"],
+            "Check most recent commits",
+        )
+        self.assertEqual(
+            regressions,
+            [
+                history_functions.Regression("ccc", "bbb", 73.3, 90.0),
+                history_functions.Regression("aaa", "ccc", 60.0, 73.3),
+            ],
+            "Check drops in coverage",
+        )
+        self.assertEqual(
+            file_deltas,
+            [
+                history_functions.FileDelta("b.py", None, None, 10, 0),
+                history_functions.FileDelta("c.py", 20, 6, None, None),
+            ],
+            "Check added and removed files (unchanged file not included)",
+        )
+        self.assertIn("Drops in coverage: 2", report, "Check drops reported")
+        self.assertIn("  a.py  8/10 -> 6/10", report, "Check changed file reported")
+
+    def test_make_sparkline(self):
+        """Test values drawn between lowest and highest blocks"""
+
+        self.assertEqual(
+            history_functions.make_sparkline([50, 75, 100]), "▁▅█", "Check sparkline"
+        )
+        self.assertEqual(
+            history_functions.make_sparkline([80, 80]), "██", "Check flat sparkline"
+        )
+        self.assertEqual(
+            history_functions.make_sparkline([50, 100], minimum=0, maximum=100),
+            "▅█",
+            "Check sparkline with fixed range",
+        )
+        self.assertEqual(
+            history_functions.make_trend_badge_url([]),
+            "https://img.shields.io/badge/coverage%20trend-no%20history-lightgrey",
+            "Check badge without history",
+        )
+
+
+if __name__ == "__main__":
+    unittest.main()
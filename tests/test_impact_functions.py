@@ -0,0 +1,318 @@
+# Load packages
+import unittest  # running tests
+import os  # handling file paths
+import tempfile  # creating temporary directories
+from pathlib import Path  # handling file paths
+import coverage  # creating coverage data
+
+# Local imports
+from coverage_shield import (
+    impact_functions,
+)  # functions for selecting tests impacted by changes
+from coverage_shield import git_functions  # functions for interacting with git
+from coverage_shield.coverage_data_functions import CoverageRecord  # coverage of file
+
+
+def build_test_index() -> dict:
+    """Builds a simple test index for testing
+
+    Returns:
+        dict: test index
+    """
+
+    return {
+        "tester": "unittest",
+        "tests": [
+            "",
+            "tests.test_a.TestA.test_one",
+            "tests.test_a.TestA.test_two",
+            "tests.test_b.TestB.test_three",
+        ],
+        "files": {
+            "package/module_a.py": {"0": [[1, 3]], "1": [[4, 6]], "2": [[8, 9]]},
+            "package/module_b.py": {"0": [[1, 2]], "3": [[3, 5]]},
+            "tests/test_a.py": {"0": [[1, 5]], "1": [[6, 7]], "2": [[8, 9]]},
+        },
+        "hashes": {},
+    }
+
+
+def compare_incremental_code_coverage(module_name: str, changes: list) -> list:
+    """Records baseline coverage of a module with a test for each of its two functions, makes each
+    change (rerunning impacted tests after each), and then reruns all tests
+
+    Args:
+        module_name (str): name of module (unique, as tests run in current process)
+        changes (list): functions making a change in the repository
+
+    Returns:
+        list: baseline, last incremental, and full run coverage records
+    """
+
+    with tempfile.TemporaryDirectory() as temporary_directory:
+
+        # Create a repository with a module and a test for each of its functions
+        with open(Path(temporary_directory, f"{module_name}.py"), "w") as file:
+            file.write("def first():\n    return 1\n\n\ndef second():\n    return 2\n")
+        with open(Path(temporary_directory, f"test_{module_name}.py"), "w") as file:
+            file.write(
+                "import unittest\n"
+                f"import {module_name}\n\n\n"
+                "class TestModule(unittest.TestCase):\n"
+                "    def test_first(self):\n"
+                f"        self.assertEqual({module_name}.first(), 1)\n\n"
+                "    def test_second(self):\n"
+                f"        self.assertEqual({module_name}.second(), 2)\n"
+            )
+        directory = Path.cwd()
+        try:
+            os.chdir(temporary_directory)
+            git_functions.send_command("git", "init", "--quiet")
+            commit_changes("First")
+
+            # Record baseline, then rerun impacted tests after each change
+            full_records = list(
+                impact_functions.run_incremental_code_coverage(stream=True)
+            )
+            for change in changes:
+                change()
+                incremental_records = list(
+                    impact_functions.run_incremental_code_coverage(stream=True)
+                )
+
+            # Run all tests again (without baseline)
+            impact_functions.BASELINE_DATA_PATH.unlink()
+            changed_records = list(
+                impact_functions.run_incremental_code_coverage(stream=True)
+            )
+        finally:
+            os.chdir(directory)
+
+    return full_records, incremental_records, changed_records
+
+
+def change_file(file_path: str, change) -> None:
+    """Changes text of file
+
+    Args:
+        file_path (str): path to file
+        change (callable): function returning changed text of file
+    """
+
+    Path(file_path).write_text(change(Path(file_path).read_text()))
+
+
+def commit_changes(message: str) -> None:
+    """Commits all changes to python files in current repository
+
+    Args:
+        message (str): commit message
+    """
+
+    git_functions.send_command("git", "add", "--all", "--", "*.py")
+    git_functions.send_command(
+        "git",
+        *["-c", "user.name=Tester", "-c", "user.email=test@test.com"],
+        *["commit", "--quiet", "-m", message],
+    )
+
+
+class TestImpactFunctions(unittest.TestCase):
+    def test_convert_lines_to_ranges(self):
+        """Test consecutive lines collapsed into ranges"""
+
+        self.assertEqual(
+            impact_functions.convert_lines_to_ranges([1, 2, 3, 5, 7, 8]),
+            [[1, 3], [5, 5], [7, 8]],
+            "Check lines collapsed into ranges",
+        )
+
+    def test_build_test_index(self):
+        """Test index of lines run by each test built from coverage data"""
+
+        # Record lines run outside tests and by a test
+        file_path = os.path.abspath("module.py")
+        coverage_data = coverage.CoverageData(no_disk=True)
+        coverage_data.set_context("")
+        coverage_data.add_lines({file_path: [1, 2]})
+        coverage_data.set_context("tests.test_a.TestA.test_one")
+        coverage_data.add_lines({file_path: [4, 5, 7]})
+
+        # Build the index
+        test_index = impact_functions.build_test_index(coverage_data)
+
+        # Check index
+        self.assertEqual(
+            test_index["tests"],
+            ["", "tests.test_a.TestA.test_one"],
+            "Check test ids stored",
+        )
+        self.assertEqual(
+            test_index["files"]["module.py"],
+            {"0": [[1, 2]], "1": [[4, 5], [7, 7]]},
+            "Check line ranges stored for each test",
+        )
+
+    def test_select_impacted_tests(self):
+        """Test tests running changed files selected"""
+
+        with tempfile.TemporaryDirectory() as temporary_directory:
+
+            # Create changed test module and a new module
+            directory = Path.cwd()
+            try:
+                os.chdir(temporary_directory)
+                Path("tests").mkdir()
+                Path("tests", "test_a.py").touch()
+                Path("package").mkdir()
+                Path("package", "new_module.py").touch()
+
+                # Check all tests running changed file selected
+                running_tests = impact_functions.select_impacted_tests(
+                    build_test_index(), ["package/module_a.py", "README.md"]
+                )
+
+                # Check changed test module run as a whole
+                test_module_tests = impact_functions.select_impacted_tests(
+                    build_test_index(), ["tests/test_a.py", "package/module_b.py"]
+                )
+
+                # Check all tests run if unknown source file changed
+                new_module_tests = impact_functions.select_impacted_tests(
+                    build_test_index(), ["package/new_module.py"]
+                )
+            finally:
+                os.chdir(directory)
+
+        self.assertEqual(
+            running_tests,
+            ["tests.test_a.TestA.test_one", "tests.test_a.TestA.test_two"],
+            "Check tests running changed file selected",
+        )
+        self.assertEqual(
+            test_module_tests,
+            ["tests.test_a", "tests.test_b.TestB.test_three"],
+            "Check changed test module selected",
+        )
+        self.assertIsNone(
+            new_module_tests, "Check all tests run if changed file not in index"
+        )
+
+        # Check all tests run if changed file only run on import
+        test_index = build_test_index()
+        test_index["files"]["package/constants.py"] = {"0": [[1, 2]]}
+        self.assertIsNone(
+            impact_functions.select_impacted_tests(
+                test_index, ["package/constants.py"]
+            ),
+            "Check all tests run if changed file only run on import",
+        )
+
+    def test_run_incremental_code_coverage(self):
+        """Test coverage after rerunning impacted tests matches running all tests"""
+
+        # Record baseline, then change a line of the module run by one test
+        full_records, incremental_records, changed_records = (
+            compare_incremental_code_coverage(
+                "impacted_module",
+                [
+                    lambda: change_file(
+                        "impacted_module.py",
+                        lambda text: text.replace("return 1", "return 0 + 1"),
+                    )
+                ],
+            )
+        )
+
+        self.assertEqual(
+            [record[0] for record in full_records],
+            ["impacted_module.py", "test_impacted_module.py"],
+            "Check baseline recorded",
+        )
+        self.assertEqual(
+            incremental_records,
+            changed_records,
+            "Check incremental coverage matches running all tests",
+        )
+
+    def test_run_incremental_code_coverage_removed_test(self):
+        """Test coverage of a removed test is dropped from baseline"""
+
+        # Record baseline, then remove the test of the second function
+        full_records, incremental_records, changed_records = (
+            compare_incremental_code_coverage(
+                "pruned_module",
+                [
+                    lambda: change_file(
+                        "test_pruned_module.py",
+                        lambda text: text[: text.index("    def test_second")],
+                    )
+                ],
+            )
+        )
+
+        self.assertEqual(
+            full_records[0],
+            CoverageRecord("pruned_module.py", 4, 0, 0, 0),
+            "Check baseline recorded",
+        )
+        self.assertEqual(
+            incremental_records,
+            changed_records,
+            "Check incremental coverage matches running all tests",
+        )
+        self.assertEqual(
+            incremental_records[0],
+            CoverageRecord("pruned_module.py", 4, 1, 0, 0),
+            "Check line only run by removed test missed",
+        )
+
+    def test_run_incremental_code_coverage_reverted_change(self):
+        """Test reverting an uncommitted change reruns the tests it changed"""
+
+        # Commit removing a test, restore it without committing, then revert the restore
+        full_records, incremental_records, changed_records = (
+            compare_incremental_code_coverage(
+                "reverted_module",
+                [
+                    lambda: change_file(
+                        "test_reverted_module.py",
+                        lambda text: text[: text.index("    def test_second")],
+                    ),
+                    lambda: commit_changes("Removed test"),
+                    lambda: git_functions.send_command(
+                        "git", "checkout", "--quiet", "HEAD~1", "--", "."
+                    ),
+                    lambda: git_functions.send_command(
+                        "git", "checkout", "--quiet", "HEAD", "--", "."
+                    ),
+                ],
+            )
+        )
+
+        self.assertEqual(
+            incremental_records,
+            changed_records,
+            "Check incremental coverage matches running all tests",
+        )
+        self.assertEqual(
+            incremental_records[0],
+            CoverageRecord("reverted_module.py", 4, 1, 0, 0),
+            "Check line only run by reverted test missed",
+        )
+
+    def test_find_changed_files(self):
+        """Test files added, removed, or changed found from hashes"""
+
+        self.assertEqual(
+            impact_functions.find_changed_files(
+                {"a.py": "1", "b.py": "2", "c.py": "3"},
+                {"a.py": "1", "b.py": "4", "d.py": "5"},
+            ),
+            ["b.py", "c.py", "d.py"],
+            "Check changed files found",
+        )
+
+
+if __name__ == "__main__":
+    unittest.main()
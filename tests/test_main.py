@@ -1,6 +1,8 @@
 # Load packages
 import unittest  # running tests
 from pathlib import Path  # handling file paths
+import subprocess  # running command line in a fresh python process
+import sys  # getting python executable
 
 # Local imports
 from coverage_shield import (
@@ -15,6 +17,35 @@ class TestMain(unittest.TestCase):
         with self.assertRaises(SystemExit):
             __main__.main(["--help"])
 
+    def test_help_imports(self):
+        """Test --help doesn't import the slow packages used to run coverage"""
+
+        # Get the modules loaded after running --help in a fresh python process (printed last)
+        loaded_modules = (
+            subprocess.check_output(
+                [
+                    sys.executable,
+                    "-c",
+                    "import sys\n"
+                    "from coverage_shield import __main__\n"
+                    "try:\n"
+                    "    __main__.main(['--help'])\n"
+                    "except SystemExit:\n"
+                    "    pass\n"
+                    "print(' '.join(sys.modules))",
+                ],
+                text=True,
+            )
+            .splitlines()[-1]
+            .split()
+        )
+
+        # Check slow packages not loaded
+        for package in ["pandas", "seaborn", "numpy", "coverage"]:
+            self.assertFalse(
+                package in loaded_modules, f"Check {package} not imported by --help"
+            )
+
 
 if __name__ == "__main__":
     unittest.main()
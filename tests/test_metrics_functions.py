@@ -0,0 +1,160 @@
+# Load packages
+import unittest  # running tests
+from pathlib import Path  # handling file paths
+import tempfile  # creating temporary directories
+import subprocess  # running child process
+import sys  # getting python executable
+import json  # reading metrics file
+
+# Local imports
+from coverage_shield import (
+    metrics_functions,
+)  # functions for recording resources used by each phase
+
+
+class TestMetricsFunctions(unittest.TestCase):
+    def test_record_phase(self):
+        """Test nested phases recorded in order they start (even if they fail)"""
+
+        metrics_functions.reset_phases()
+        with metrics_functions.record_phase("run_coverage"):
+            with metrics_functions.record_phase("run_tests"):
+                subprocess.run(
+                    [sys.executable, "-c", "sum(range(10 ** 6))"], check=True
+                )
+        with self.assertRaises(ValueError):
+            with metrics_functions.record_phase("update_readme"):
+                raise ValueError("README missing")
+
+        # Check phases recorded
+        phases = metrics_functions.recorded_phases
+        self.assertEqual(
+            [phase["phase"] for phase in phases],
+            ["run_coverage", "run_coverage/run_tests", "update_readme"],
+            "Check nested phases named by path and failing phase recorded",
+        )
+        self.assertGreaterEqual(
+            phases[0]["wall_seconds"],
+            phases[1]["wall_seconds"],
+            "Check phase takes at least as long as nested phase",
+        )
+
+        # Check child process resources included
+        if metrics_functions.resource is not None:
+            self.assertGreater(
+                phases[1]["child_cpu_seconds"], 0, "Check child cpu time recorded"
+            )
+            self.assertGreater(
+                phases[1]["child_peak_rss_mb"], 0, "Check child memory recorded"
+            )
+
+    def test_calculate_phase_metrics(self):
+        """Test times subtracted and peak memory taken from end of phase"""
+
+        phase_metrics = metrics_functions.calculate_phase_metrics(
+            {
+                "wall_seconds": 10.0,
+                "cpu_seconds": 1.0,
+                "child_cpu_seconds": None,
+                "peak_rss_mb": 50.0,
+            },
+            {
+                "wall_seconds": 12.5,
+                "cpu_seconds": 2.0,
+                "child_cpu_seconds": None,
+                "peak_rss_mb": 80.04,
+            },
+        )
+        self.assertEqual(
+            phase_metrics,
+            {
+                "wall_seconds": 2.5,
+                "cpu_seconds": 1.0,
+                "child_cpu_seconds": None,
+                "peak_rss_mb": 80.0,
+            },
+            "Check phase metrics calculated",
+        )
+
+    def test_sum_phase_times(self):
+        """Test times of phases with name summed at any depth (cpu time including children)"""
+
+        phases = [
+            {
+                "phase": "run_tests",
+                "wall_seconds": 2.0,
+                "cpu_seconds": 0.5,
+                "child_cpu_seconds": 1.0,
+            },
+            {
+                "phase": "run_coverage/run_tests",
+                "wall_seconds": 1.0,
+                "cpu_seconds": 0.5,
+                "child_cpu_seconds": 0.0,
+            },
+            {
+                "phase": "run_tests_later",
+                "wall_seconds": 5.0,
+                "cpu_seconds": 5.0,
+                "child_cpu_seconds": 0.0,
+            },
+            {
+                "phase": "build_report",
+                "wall_seconds": 9.0,
+                "cpu_seconds": None,
+                "child_cpu_seconds": None,
+            },
+        ]
+
+        self.assertEqual(
+            metrics_functions.sum_phase_times("run_tests", phases),
+            (3.0, 2.0),
+            "Check times summed",
+        )
+        self.assertEqual(
+            metrics_functions.sum_phase_times("build_report", phases),
+            (9.0, None),
+            "Check cpu time not measured",
+        )
+        self.assertIsNone(
+            metrics_functions.sum_phase_times("missing", phases),
+            "Check no matching phases",
+        )
+
+    def test_write_metrics(self):
+        """Test metrics written to json and summarised in a line"""
+
+        phase_metrics = {
+            "wall_seconds": 1.5,
+            "cpu_seconds": 0.2,
+            "child_cpu_seconds": 1.1,
+            "peak_rss_mb": 60.0,
+            "child_peak_rss_mb": 95.2,
+        }
+        metrics = metrics_functions.build_metrics(
+            [
+                {"phase": "run_coverage", **phase_metrics},
+                {"phase": "run_coverage/run_tests", **phase_metrics},
+            ],
+            phase_metrics,
+            ["--metrics"],
+        )
+
+        # Write and read back metrics
+        with tempfile.TemporaryDirectory() as temporary_directory:
+            metrics_path = Path(temporary_directory, ".coverage_shield", "metrics.json")
+            metrics_functions.write_metrics(metrics, metrics_path)
+            with open(metrics_path) as file:
+                written_metrics = json.load(file)
+
+        # Check metrics written and summarised
+        self.assertEqual(written_metrics, metrics, "Check metrics written to json")
+        self.assertEqual(
+            metrics_functions.format_metrics_summary(metrics),
+            "coverage_shield 1.50s (cpu 0.20s + child 1.10s, peak 95MB) | run_coverage 1.50s",
+            "Check summary of top level phases",
+        )
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,91 @@
+# Load packages
+import unittest  # running tests
+from pathlib import Path  # handling file paths
+import tempfile  # creating temporary directories
+import sys  # getting python executable
+from io import StringIO  # collecting output
+
+# Local imports
+from coverage_shield import output_functions  # functions for streaming test output
+
+# Python command writing numbered lines to standard output and error (and a last line without a newline)
+COMMAND = [
+    sys.executable,
+    "-c",
+    "import sys\n"
+    "for index in range(100):\n"
+    "    print(index, file=sys.stderr if index % 2 else sys.stdout)\n"
+    "sys.stdout.write('done')\n"
+    "sys.exit(3)\n",
+]
+
+
+class TestOutputFunctions(unittest.TestCase):
+    def test_run_streamed_command(self):
+        """Test all output written but only last lines kept"""
+
+        output = StringIO()
+        result = output_functions.run_streamed_command(
+            COMMAND, output=output, tail_lines=3
+        )
+
+        self.assertEqual(result.returncode, 3, "Check return code")
+        self.assertEqual(result.tail, ("98", "99", "done"), "Check last lines kept")
+        self.assertEqual(
+            output.getvalue(),
+            "".join(f"{index}\n" for index in range(100)) + "done",
+            "Check standard output and error written in order",
+        )
+
+    def test_run_streamed_command_with_prefix(self):
+        """Test prefix added to each line"""
+
+        output = StringIO()
+        output_functions.run_streamed_command(
+            COMMAND, output=output, tail_lines=3, prefix="[1] "
+        )
+
+        self.assertEqual(
+            output.getvalue().splitlines()[-2:],
+            ["[1] 99", "[1] done"],
+            "Check lines prefixed",
+        )
+
+    def test_copy_output(self):
+        """Test output file copied and last lines kept"""
+
+        with tempfile.TemporaryDirectory() as temporary_directory:
+            file_path = Path(temporary_directory, "output.txt")
+            file_path.write_text("one\ntwo\nthree\n")
+            output = StringIO()
+            tail = output_functions.copy_output(file_path, output, tail_lines=2)
+            missing_tail = output_functions.copy_output(
+                Path(temporary_directory, "missing.txt"), output
+            )
+
+        self.assertEqual(output.getvalue(), "one\ntwo\nthree\n", "Check output copied")
+        self.assertEqual(tail, ("two", "three"), "Check last lines kept")
+        self.assertEqual(missing_tail, (), "Check missing file has no output")
+        self.assertEqual(
+            output_functions.format_tail(tail),
+            "\nLast 2 lines of output:\ntwo\nthree",
+            "Check last lines formatted",
+        )
+
+    def test_redirect_output(self):
+        """Test output written in python sent to log file"""
+
+        with tempfile.TemporaryDirectory() as temporary_directory:
+            log_path = Path(temporary_directory, "tests.log")
+            with output_functions.redirect_output(log_path):
+                print("to standard output")
+                print("to standard error", file=sys.stderr)
+            log = log_path.read_text()
+
+        self.assertEqual(
+            log, "to standard output\nto standard error\n", "Check output logged"
+        )
+
+
+if __name__ == "__main__":
+    unittest.main()
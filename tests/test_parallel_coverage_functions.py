@@ -0,0 +1,77 @@
+# Load packages
+import unittest  # running tests
+from pathlib import Path  # handling file paths
+import tempfile  # creating temporary directories
+
+# Local imports
+from coverage_shield import (
+    parallel_coverage_functions,
+)  # functions for running coverage in parallel
+
+
+class TestParallelCoverageFunctions(unittest.TestCase):
+    def test_discover_test_modules(self):
+        """Test test modules found in the form each tester accepts (following each tester's rules)"""
+
+        with tempfile.TemporaryDirectory() as temporary_directory:
+
+            # Create some test and non-test files (each test file with a test)
+            for file_path in [
+                "tests/__init__.py",
+                "tests/test_one.py",
+                "tests/two_test.py",
+                "tests/helpers.py",
+                ".hidden/__init__.py",
+                ".hidden/test_hidden.py",
+                "scripts/test_script.py",
+                "venv/pyvenv.cfg",
+                "venv/test_installed.py",
+                "build/test_built.py",
+            ]:
+                Path(temporary_directory, file_path).parent.mkdir(exist_ok=True)
+                Path(temporary_directory, file_path).write_text(
+                    "def test_function():\n    pass\n"
+                )
+
+            # Find the test modules
+            unittest_modules = parallel_coverage_functions.discover_test_modules(
+                "unittest", Path(temporary_directory)
+            )
+            pytest_modules = parallel_coverage_functions.discover_test_modules(
+                "pytest", Path(temporary_directory)
+            )
+
+        # Check expected modules found
+        self.assertEqual(
+            unittest_modules,
+            ["tests.test_one"],
+            "Check unittest module names found (only searching packages)",
+        )
+        self.assertEqual(
+            pytest_modules,
+            [
+                str(Path("scripts/test_script.py")),
+                str(Path("tests/test_one.py")),
+                str(Path("tests/two_test.py")),
+            ],
+            "Check pytest file paths found (skipping directories pytest ignores)",
+        )
+
+    def test_split_into_shards(self):
+        """Test test modules split into balanced shards"""
+
+        # Split modules into shards
+        shards = parallel_coverage_functions.split_into_shards(
+            ["a", "b", "c", "d"], [10, 1, 6, 5], 2
+        )
+
+        # Check modules balanced across shards
+        self.assertEqual(shards, [["a", "b"], ["c", "d"]], "Check shards balanced")
+
+        # Check empty shards dropped
+        shards = parallel_coverage_functions.split_into_shards(["a"], [1], 4)
+        self.assertEqual(shards, [["a"]], "Check empty shards removed")
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,120 @@
+# Load packages
+import unittest  # running tests
+from pathlib import Path  # handling file paths
+import tempfile  # creating temporary directories
+import io  # capturing test runner output
+import math  # checking for missing values
+
+# Local imports
+from coverage_shield import (
+    profiling_functions,
+)  # functions for profiling tests
+
+
+class TestProfilingFunctions(unittest.TestCase):
+    def test_timed_text_test_result(self):
+        """Test duration of each test recorded by test result"""
+
+        # Define some simple tests
+        class SimpleTests(unittest.TestCase):
+            def test_one(self):
+                pass
+
+            def test_two(self):
+                pass
+
+        # Run the tests with timed result
+        test_suite = unittest.TestLoader().loadTestsFromTestCase(SimpleTests)
+        test_result = unittest.TextTestRunner(
+            stream=io.StringIO(), resultclass=profiling_functions.TimedTextTestResult
+        ).run(test_suite)
+
+        # Check durations recorded for each test
+        self.assertEqual(
+            sorted(test_id.split(".")[-1] for test_id in test_result.test_durations),
+            ["test_one", "test_two"],
+            "Check duration recorded for each test",
+        )
+
+    def test_get_test_module(self):
+        """Test module extracted from unittest and pytest test ids"""
+
+        self.assertEqual(
+            profiling_functions.get_test_module("tests.test_main.TestMain.test_main"),
+            "tests.test_main",
+            "Check module from unittest test id",
+        )
+        self.assertEqual(
+            profiling_functions.get_test_module(
+                "tests/test_main.py::TestMain::test_main"
+            ),
+            "tests/test_main.py",
+            "Check module from pytest node id",
+        )
+
+    def test_get_tester_arguments(self):
+        """Test tester run with timing runner or plugin when recording durations"""
+
+        self.assertEqual(
+            profiling_functions.get_tester_arguments("unittest"),
+            ["-m", "unittest"],
+            "Check tester run directly if not recording durations",
+        )
+        self.assertEqual(
+            profiling_functions.get_tester_arguments("pytest", Path("timings.json")),
+            ["-m", "pytest", "-p", "coverage_shield.profiling_functions"],
+            "Check timing plugin used with pytest",
+        )
+
+    def test_build_hotspot_report(self):
+        """Test slowest tests ranked and compared to previous run"""
+
+        with tempfile.TemporaryDirectory() as temporary_directory:
+
+            # Store durations for two runs
+            history_path = Path(temporary_directory, "test_durations.json")
+            profiling_functions.update_test_timing_history(
+                {"tests.test_a.TestA.test_one": 1.0}, 2.0, history_path
+            )
+            timing_history = profiling_functions.update_test_timing_history(
+                {
+                    "tests.test_a.TestA.test_one": 1.5,
+                    "tests.test_a.TestA.test_two": 0.5,
+                    "tests.test_b.TestB.test_three": 3.0,
+                },
+                5.0,
+                history_path,
+            )
+
+        # Build report of slowest tests
+        hotspot_report = profiling_functions.build_hotspot_report(timing_history, 2)
+
+        # Check slowest tests ranked
+        self.assertEqual(
+            list(hotspot_report.Test),
+            ["tests.test_b.TestB.test_three", "tests.test_a.TestA.test_one"],
+            "Check slowest tests ranked",
+        )
+        self.assertEqual(
+            list(hotspot_report.Share), [60.0, 30.0], "Check share of test time"
+        )
+        self.assertTrue(
+            math.isnan(hotspot_report.Change[1]), "Check new test has no change"
+        )
+        self.assertEqual(
+            hotspot_report.Change[2], 0.5, "Check change since previous run"
+        )
+
+        # Build report of slowest modules
+        hotspot_report = profiling_functions.build_hotspot_report(
+            timing_history, by_module=True
+        )
+        self.assertEqual(
+            list(hotspot_report.Test),
+            ["tests.test_b", "tests.test_a"],
+            "Check test durations summed by module",
+        )
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,200 @@
+# Load packages
+import unittest  # running tests
+from pathlib import Path  # handling file paths
+import tempfile  # creating temporary directories
+
+# Local imports
+from coverage_shield import reduction_functions  # functions to reduce test suite
+from coverage_shield import coverage_data_functions  # functions to handle coverage data
+from coverage_shield.coverage_data_functions import CoverageRecord
+
+# Test index of a small package: the slow test covers everything, the quick tests cover a part each
+TEST_INDEX = {
+    "tester": "unittest",
+    "tests": [
+        "",
+        "tests.test_module.TestModule.test_slow",
+        "tests.test_module.TestModule.test_first",
+        "tests.test_module.TestModule.test_second",
+        "tests.test_module.TestModule.test_repeat",
+    ],
+    "files": {
+        "module.py": {"0": [[1, 2]], "1": [[3, 10]], "2": [[3, 6]], "3": [[7, 10]]},
+        "other.py": {"1": [[1, 1]], "4": [[1, 1]]},
+        "tests/test_module.py": {"0": [[1, 5]], "1": [[7, 8]], "2": [[10, 11]]},
+    },
+    "hashes": {},
+}
+TEST_DURATIONS = {
+    "tests.test_module.TestModule.test_slow": 5.0,
+    "tests.test_module.TestModule.test_first": 1.0,
+    "tests.test_module.TestModule.test_second": 1.0,
+    "tests.test_module.TestModule.test_repeat": 0.5,
+}
+
+
+class TestReductionFunctions(unittest.TestCase):
+    def test_build_test_line_sets(self):
+        """Test lines of each test numbered (test file left out, import lines counted once)"""
+
+        test_lines = reduction_functions.build_test_line_sets(TEST_INDEX)
+
+        self.assertEqual(
+            {test_id: lines.bit_count() for test_id, lines in test_lines.items()},
+            {
+                "tests.test_module.TestModule.test_slow": 10,
+                "tests.test_module.TestModule.test_first": 5,
+                "tests.test_module.TestModule.test_second": 5,
+                "tests.test_module.TestModule.test_repeat": 1,
+            },
+            "Check lines (and module.py import) counted for each test",
+        )
+        self.assertEqual(
+            test_lines["tests.test_module.TestModule.test_first"]
+            | test_lines["tests.test_module.TestModule.test_second"]
+            | test_lines["tests.test_module.TestModule.test_repeat"],
+            test_lines["tests.test_module.TestModule.test_slow"],
+            "Check quick tests run same lines as slow test",
+        )
+
+    def test_select_tests(self):
+        """Test greedy and exact searches choose quickest tests covering all lines"""
+
+        greedy = reduction_functions.select_tests(TEST_INDEX, TEST_DURATIONS)
+        exact = reduction_functions.select_tests(TEST_INDEX, TEST_DURATIONS, "exact")
+
+        self.assertEqual(
+            greedy,
+            reduction_functions.TestSelection(
+                (
+                    "tests.test_module.TestModule.test_first",
+                    "tests.test_module.TestModule.test_repeat",
+                    "tests.test_module.TestModule.test_second",
+                ),
+                2.5,
+                7.5,
+                10,
+                False,
+                ("tests/test_module.py",),
+            ),
+            "Check quick tests chosen over slow test",
+        )
+        self.assertEqual(exact.tests, greedy.tests, "Check exact selection")
+        self.assertTrue(exact.exact, "Check exact search used")
+        with self.assertRaises(ValueError):
+            reduction_functions.select_tests(TEST_INDEX, TEST_DURATIONS, "random")
+
+    def test_select_tests_exact(self):
+        """Test exact search finds quicker selection than greedy search and redundant tests removed"""
+
+        # Greedy search picks the test covering most lines per second first, then needs two more
+        test_lines = {"big": 0b011110, "left": 0b000111, "right": 0b111000}
+        test_durations = {"big": 1.0, "left": 1.0, "right": 1.0}
+
+        self.assertEqual(
+            sorted(reduction_functions.select_tests_greedy(test_lines, test_durations)),
+            ["left", "right"],
+            "Check test made redundant by later tests removed",
+        )
+        self.assertEqual(
+            sorted(
+                reduction_functions.select_tests_exact(
+                    test_lines, {"big": 1.0, "left": 1.5, "right": 1.5}
+                )
+            ),
+            ["left", "right"],
+            "Check exact search",
+        )
+        self.assertEqual(
+            reduction_functions.remove_redundant_tests(
+                ["big", "left", "right"], test_lines, test_durations
+            ),
+            ["left", "right"],
+            "Check redundant test removed",
+        )
+
+    def test_test_selection_file(self):
+        """Test selection written and read, and time saved and coverage reported"""
+
+        selection = reduction_functions.select_tests(TEST_INDEX, TEST_DURATIONS)
+        full_total = CoverageRecord("TOTAL", 20, 5, 0, 0)
+        test_file_records = [CoverageRecord("tests/test_module.py", 10, 0, 0, 0)]
+        with tempfile.TemporaryDirectory() as temporary_directory:
+            selection_path = Path(temporary_directory, "reduced", "tests.json")
+            reduction_functions.write_test_selection(
+                selection, "unittest", full_total, test_file_records, selection_path
+            )
+            read_selection = reduction_functions.read_test_selection(
+                "unittest", selection_path
+            )
+            other_tester = reduction_functions.read_test_selection(
+                "pytest", selection_path
+            )
+
+        self.assertEqual(
+            read_selection, (selection, full_total, test_file_records), "Check read"
+        )
+        self.assertIsNone(other_tester, "Check selection only used for same tester")
+        self.assertEqual(
+            list(
+                coverage_data_functions.filter_coverage_records(
+                    [
+                        CoverageRecord("module.py", 20, 5, 0, 0),
+                        CoverageRecord("tests/test_module.py", 10, 0, 0, 0),
+                        CoverageRecord("other/tests/test_module.py", 10, 0, 0, 0),
+                    ],
+                    reduction_functions.get_tested_code_patterns(
+                        selection.test_files, ["*.txt"]
+                    ),
+                )
+            ),
+            [
+                CoverageRecord("module.py", 20, 5, 0, 0),
+                CoverageRecord("other/tests/test_module.py", 10, 0, 0, 0),
+            ],
+            "Check test files left out of report",
+        )
+        self.assertEqual(
+            reduction_functions.build_reduced_coverage_records(
+                [
+                    CoverageRecord("module.py", 20, 5, 0, 0),
+                    CoverageRecord("tests/test_module.py", 10, 4, 0, 0),
+                ],
+                selection,
+                test_file_records,
+            ),
+            (
+                [
+                    CoverageRecord("module.py", 20, 5, 0, 0),
+                    CoverageRecord("tests/test_module.py", 10, 0, 0, 0),
+                ],
+                CoverageRecord("TOTAL", 20, 5, 0, 0),
+            ),
+            "Check test files taken from full test suite",
+        )
+        self.assertEqual(
+            reduction_functions.build_reduced_coverage_records(
+                [], selection, test_file_records
+            ),
+            ([], None),
+            "Check failed reduced test suite gives empty report",
+        )
+        self.assertEqual(
+            reduction_functions.format_reduction_summary(
+                selection, full_total, full_total, 3.0
+            ),
+            "Reduced test suite (greedy): 3 tests taking 2.50s of 7.50s (67% saved), "
+            "run in 3.00s. Coverage matches full test suite (75.0%).",
+            "Check matching coverage reported",
+        )
+        self.assertIn(
+            "Coverage doesn't match full test suite (70.0% vs 75.0%, +1 missed statements)",
+            reduction_functions.format_reduction_summary(
+                selection, full_total, CoverageRecord("TOTAL", 20, 6, 0, 0)
+            ),
+            "Check coverage drop reported",
+        )
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,112 @@
+# Load packages
+import unittest  # running tests
+from pathlib import Path  # handling file paths
+import tempfile  # creating temporary directories
+import os  # changing directory and reading environment variables
+import sys  # checking python version
+
+# Local imports
+from coverage_shield import tracer_functions  # functions to choose coverage core
+from coverage_shield import metrics_functions  # functions to record phase metrics
+
+
+class TestTracerFunctions(unittest.TestCase):
+    def test_choose_core(self):
+        """Test fastest available core chosen and unavailable cores rejected"""
+
+        available_cores = tracer_functions.get_available_cores()
+        context_cores = tracer_functions.get_available_cores(dynamic_contexts=True)
+
+        self.assertEqual(available_cores[-1], "pytrace", "Check python tracer last")
+        self.assertEqual(
+            "sysmon" in available_cores,
+            sys.version_info >= (3, 12),
+            "Check sys.monitoring core available on python 3.12+",
+        )
+        self.assertNotIn("sysmon", context_cores, "Check sysmon without contexts")
+        self.assertEqual(
+            tracer_functions.choose_core("auto"),
+            available_cores[0],
+            "Check fastest core chosen",
+        )
+        self.assertEqual(
+            tracer_functions.choose_core("pytrace"), "pytrace", "Check core chosen"
+        )
+        with self.assertRaises(ValueError):
+            tracer_functions.choose_core("fast")
+        with self.assertRaises(ValueError):
+            tracer_functions.choose_core("sysmon", dynamic_contexts=True)
+
+    def test_use_core(self):
+        """Test core environment variable set within with statement and restored after"""
+
+        previous_core = os.environ.get(tracer_functions.CORE_VARIABLE)
+        with tracer_functions.use_core("pytrace"):
+            core = os.environ.get(tracer_functions.CORE_VARIABLE)
+        with tracer_functions.use_core(None):
+            default_core = os.environ.get(tracer_functions.CORE_VARIABLE)
+
+        self.assertEqual(core, "pytrace", "Check core set")
+        self.assertEqual(default_core, previous_core, "Check default core unchanged")
+        self.assertEqual(
+            os.environ.get(tracer_functions.CORE_VARIABLE),
+            previous_core,
+            "Check core restored",
+        )
+
+    def test_run_uninstrumented_tests(self):
+        """Test tests run without coverage and timed as a phase"""
+
+        directory = os.getcwd()
+        with tempfile.TemporaryDirectory() as temporary_directory:
+
+            # Create a passing test module
+            Path(temporary_directory, "test_module.py").write_text(
+                "import unittest\n\n"
+                "class TestModule(unittest.TestCase):\n"
+                "    def test_pass(self):\n"
+                "        self.assertTrue(True)\n"
+            )
+
+            # Run the tests (as phase)
+            os.chdir(temporary_directory)
+            try:
+                metrics_functions.reset_phases()
+                tests_passed = [
+                    tracer_functions.run_uninstrumented_tests(engine=engine)
+                    for engine in ["api", "subprocess"]
+                ]
+                n_phases = len(metrics_functions.recorded_phases)
+                with self.assertWarns(UserWarning):
+                    missing_passed = tracer_functions.run_uninstrumented_tests(
+                        test_ids=["test_missing"]
+                    )
+                times = metrics_functions.sum_phase_times("uninstrumented_tests")
+            finally:
+                metrics_functions.reset_phases()
+                os.chdir(directory)
+
+        self.assertEqual(
+            tests_passed, [True, True], "Check tests passed in and out of process"
+        )
+        self.assertEqual(n_phases, 2, "Check each run recorded as a phase")
+        self.assertFalse(missing_passed, "Check missing tests fail")
+        self.assertGreater(times[0], 0, "Check tests timed")
+
+    def test_format_overhead_summary(self):
+        """Test overhead calculated from cpu time, or wall time if cpu time not measured"""
+
+        self.assertEqual(
+            tracer_functions.format_overhead_summary("ctrace", (3.0, 2.5), (2.0, 1.0)),
+            "Tracing overhead (ctrace core): +150% cpu time (tests took 3.00s with coverage and 2.00s without)",
+            "Check cpu time compared",
+        )
+        self.assertEqual(
+            tracer_functions.format_overhead_summary(None, (3.0, None), (2.0, None)),
+            "Tracing overhead (default core): +50% wall time (tests took 3.00s with coverage and 2.00s without)",
+            "Check wall time compared",
+        )
+
+
+if __name__ == "__main__":
+    unittest.main()
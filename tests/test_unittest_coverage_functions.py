@@ -2,11 +2,17 @@
 import unittest  # running tests
 from pathlib import Path  # handling file paths
 import seaborn  # creating colour palette
+import tempfile  # creating temporary directories
+import coverage  # creating coverage data
+import pandas as pd  # creating coverage report dataframes
 
 # Local imports
 from coverage_shield import (
     unittest_coverage_functions,
 )  # functions for running coverage
+from coverage_shield import (
+    coverage_data_functions,
+)  # functions for reading coverage data
 
 
 class TestUnittestCoverageFunctions(unittest.TestCase):
@@ -39,6 +45,125 @@ class TestUnittestCoverageFunctions(unittest.TestCase):
         # Remove temporary file
         Path.unlink(temporary_file_path)
 
+    def test_replace_regex_in_file_unchanged(self):
+        """Test file only rewritten (atomically) if badge changes"""
+
+        with tempfile.TemporaryDirectory() as temporary_directory:
+
+            # Create README with badge (and a second copy of the badge further down)
+            readme_path = Path(temporary_directory, "README.md")
+            readme_path.write_text(
+                "![Code Coverage](old)\n# Title\n![Code Coverage](old)\n"
+            )
+            readme_path.chmod(0o664)
+            pattern = unittest_coverage_functions.build_badge_pattern("Code Coverage")
+
+            # Update badge, then update it again with the same badge
+            changed = unittest_coverage_functions.replace_regex_in_file(
+                readme_path, pattern, "![Code Coverage](new)"
+            )
+            readme = readme_path.read_text()
+            mode = readme_path.stat().st_mode
+            modified_time = readme_path.stat().st_mtime_ns
+            unchanged = unittest_coverage_functions.replace_regex_in_file(
+                readme_path, pattern, "![Code Coverage](new)"
+            )
+            unchanged_modified_time = readme_path.stat().st_mtime_ns
+            files = sorted(path.name for path in Path(temporary_directory).iterdir())
+
+        self.assertTrue(changed, "Check changed file reported")
+        self.assertEqual(
+            readme,
+            "![Code Coverage](new)\n# Title\n![Code Coverage](old)\n",
+            "Check only first badge updated",
+        )
+        self.assertEqual(mode & 0o777, 0o664, "Check file permissions kept")
+        self.assertFalse(unchanged, "Check unchanged file reported")
+        self.assertEqual(
+            unchanged_modified_time, modified_time, "Check unchanged file not written"
+        )
+        self.assertEqual(files, ["README.md"], "Check no temporary files left")
+
+    def test_update_badges_in_files(self):
+        """Test badges updated in each file, as SVG files if badge directory provided"""
+
+        badge_urls = {
+            "Code Coverage": "https://img.shields.io/badge/coverage-90%25-green"
+        }
+        with tempfile.TemporaryDirectory() as temporary_directory:
+
+            # Create README and docs file
+            readme_path = Path(temporary_directory, "README.md")
+            readme_path.write_text("![Code Coverage](old)\n")
+            docs_path = Path(temporary_directory, "docs", "index.md")
+            docs_path.parent.mkdir()
+            docs_path.write_text("![Code Coverage](old)\n")
+
+            # Update badges as SVG files
+            badge_paths = unittest_coverage_functions.update_badges_in_files(
+                badge_urls,
+                [readme_path, docs_path],
+                Path(temporary_directory, "badges"),
+            )
+            readme = readme_path.read_text()
+            docs = docs_path.read_text()
+
+        self.assertEqual(
+            badge_paths,
+            [Path(temporary_directory, "badges", "code_coverage.svg")],
+            "Check SVG file written once",
+        )
+        self.assertEqual(
+            [readme, docs],
+            [
+                "![Code Coverage](badges/code_coverage.svg)\n",
+                "![Code Coverage](../badges/code_coverage.svg)\n",
+            ],
+            "Check each file links to SVG file",
+        )
+
+    def test_update_badges_in_file(self):
+        """Test all badges updated in markdown and reStructuredText files"""
+
+        badge_urls = {"Code Coverage": "new", "Diff Coverage": "diff"}
+        with tempfile.TemporaryDirectory() as temporary_directory:
+
+            # Create markdown and reStructuredText files (one badge present in each)
+            markdown_path = Path(temporary_directory, "docs", "index.md")
+            markdown_path.parent.mkdir()
+            markdown_path.write_text("# Docs\n![Code Coverage](old)\n")
+            rst_path = Path(temporary_directory, "README.rst")
+            rst_path.write_text("|Diff Coverage|\n\n.. |Diff Coverage| image:: old\n")
+
+            # Update badges (twice, to check unchanged files reported)
+            changed = [
+                unittest_coverage_functions.update_badges_in_file(file_path, badge_urls)
+                for file_path in [markdown_path, rst_path, markdown_path]
+            ]
+            markdown = markdown_path.read_text()
+            rst = rst_path.read_text()
+
+            # Find files from paths and patterns
+            targets = unittest_coverage_functions.find_badge_targets(
+                ["*.rst", "docs/*.md", "README.rst", "missing.md"],
+                Path(temporary_directory),
+            )
+            expected_targets = [rst_path.resolve(), markdown_path.resolve()]
+
+        self.assertEqual(changed, [True, True, False], "Check changed files reported")
+        self.assertEqual(
+            markdown,
+            "![Diff Coverage](diff)\n# Docs\n![Code Coverage](new)\n",
+            "Check markdown badge updated and missing badge added",
+        )
+        self.assertEqual(
+            rst,
+            "|Code Coverage|\n\n.. |Code Coverage| image:: new\n\n"
+            "|Diff Coverage|\n\n.. |Diff Coverage| image:: diff\n",
+            "Check reStructuredText badge updated and missing badge added",
+        )
+        self.assertEqual(targets, expected_targets, "Check files found once")
+
     def test_parse_coverage_report(self):
         """Test parse of coverage byte string into coverage report"""
 
@@ -134,6 +259,75 @@ class TestUnittestCoverageFunctions(unittest.TestCase):
                 f"Checking getting badge colour for value = {value} (should be {colour})",
             )
 
+    def test_run_code_coverage_options(self):
+        """Test unrecognised tester and engine options are rejected"""
+
+        # Check unknown tester raises error
+        with self.assertRaises(ValueError):
+            unittest_coverage_functions.run_code_coverage(tester="nose")
+
+        # Check unknown engine raises error
+        with self.assertRaises(ValueError):
+            unittest_coverage_functions.run_code_coverage(engine="magic")
+
+    def test_build_coverage_dataframe(self):
+        """Test coverage report dataframe built from coverage.Coverage data"""
+
+        with tempfile.TemporaryDirectory() as temporary_directory:
+
+            # Create a simple module
+            module_path = Path(temporary_directory, "simple_module.py")
+            with open(module_path, "w") as file:
+                file.write("a = 1\nb = 2\nif a > b:\n    print(a)\n")
+
+            # Record the first three lines as executed
+            coverage_object = coverage.Coverage(
+                data_file=str(Path(temporary_directory, ".coverage"))
+            )
+            coverage_object.get_data().add_lines({str(module_path): [1, 2, 3]})
+
+            # Build the dataframe
+            coverage_dataframe = unittest_coverage_functions.build_coverage_dataframe(
+                coverage_object
+            )
+
+        # Check statements and missed statements counted
+        self.assertEqual(
+            list(coverage_dataframe.Stmts), [4], "Check statements counted"
+        )
+        self.assertEqual(
+            list(coverage_dataframe.Miss), [1], "Check missed statements counted"
+        )
+        self.assertEqual(
+            list(coverage_dataframe.Cover), [75.0], "Check coverage calculated"
+        )
+
+    def test_make_coverage_badge_url_from_records(self):
+        """Test badge url built from streamed records matches dataframe"""
+
+        # Build dataframe and records for the same files
+        coverage_dataframe = pd.DataFrame(
+            {"Name": ["a.py", "b.py"], "Stmts": [10, 30], "Miss": [2, 5]}
+        )
+        coverage_records = (
+            coverage_data_functions.CoverageRecord(name, statements, missed, 0, 0)
+            for name, statements, missed in coverage_dataframe.itertuples(index=False)
+        )
+
+        # Check urls match
+        self.assertEqual(
+            unittest_coverage_functions.make_coverage_badge_url(coverage_records),
+            unittest_coverage_functions.make_coverage_badge_url(coverage_dataframe),
+            "Check badge url same for records and dataframe",
+        )
+
+        # Check failing badge when no records
+        self.assertEqual(
+            unittest_coverage_functions.make_coverage_badge_url(iter(())),
+            "https://img.shields.io/badge/coverage-failing-red",
+            "Check failing badge for empty records",
+        )
+
     def test_load_patterns_to_ignore_in_coverage(self):
 
         # Create temporary file
@@ -0,0 +1,95 @@
+# Load packages
+import unittest  # running tests
+from pathlib import Path  # handling file paths
+import tempfile  # creating temporary directories
+import sys  # checking platform
+
+# Local imports
+from coverage_shield import (
+    watch_functions,
+)  # functions for watching for changes and rerunning tests
+
+
+class ScriptedWatcher:
+    """Watcher returning a fixed sequence of changes (for testing)"""
+
+    def __init__(self, changes: [set[Path]]):
+        self.changes = list(changes)
+
+    def read_changes(self, timeout: float = None) -> set[Path]:
+        return self.changes.pop(0) if len(self.changes) > 0 else set()
+
+
+class TestWatchFunctions(unittest.TestCase):
+    def check_watcher_finds_changes(self, watcher_class):
+        """Checks watcher finds new and modified python files (but not files in hidden directories)
+
+        Args:
+            watcher_class: watcher class to check
+        """
+
+        with tempfile.TemporaryDirectory() as temporary_directory:
+
+            # Create a module and a hidden directory
+            directory = Path(temporary_directory)
+            module_path = Path(directory, "module.py")
+            with open(module_path, "w") as file:
+                file.write("a = 1\n")
+            Path(directory, ".hidden").mkdir()
+
+            # Start watching and change some files
+            watcher = watcher_class(directory)
+            with open(module_path, "a") as file:
+                file.write("b = 2\n")
+            with open(Path(directory, ".hidden", "ignored.py"), "w") as file:
+                file.write("c = 3\n")
+            new_module_path = Path(directory, "package", "new_module.py")
+            new_module_path.parent.mkdir()
+            with open(new_module_path, "w") as file:
+                file.write("d = 4\n")
+
+            # Collect the changes (until both modules found or a few seconds passed)
+            changed_files = set()
+            for _ in range(10):
+                changed_files.update(
+                    file_path
+                    for file_path in watcher.read_changes(timeout=0.5)
+                    if watch_functions.is_watched_file(file_path)
+                )
+                if {module_path, new_module_path} <= changed_files:
+                    break
+            watcher.close()
+
+        # Check changes found
+        self.assertEqual(
+            changed_files,
+            {module_path, new_module_path},
+            "Check changed python files found",
+        )
+
+    def test_polling_watcher(self):
+        """Test polling watcher finds changed files"""
+
+        self.check_watcher_finds_changes(watch_functions.PollingWatcher)
+
+    @unittest.skipUnless(sys.platform.startswith("linux"), "inotify is Linux only")
+    def test_inotify_watcher(self):
+        """Test inotify watcher finds changed files"""
+
+        self.check_watcher_finds_changes(watch_functions.InotifyWatcher)
+
+    def test_wait_for_changes(self):
+        """Test bursts of changes collected and non-python files ignored"""
+
+        watcher = ScriptedWatcher(
+            [{Path("README.md")}, {Path("a.py")}, {Path("b.py")}, set(), {Path("c.py")}]
+        )
+        self.assertEqual(
+            watch_functions.wait_for_changes(watcher, debounce=0),
+            {Path("a.py"), Path("b.py")},
+            "Check changes collected until no more changes",
+        )
+
+
+if __name__ == "__main__":
+    unittest.main()
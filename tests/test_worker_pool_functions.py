@@ -0,0 +1,157 @@
+# Load packages
+import unittest  # running tests
+from pathlib import Path  # handling file paths
+import tempfile  # creating temporary directories
+import sys  # checking loaded modules
+
+# Local imports
+from coverage_shield import (
+    worker_pool_functions,
+)  # functions for running tests in forked workers
+
+
+class TestWorkerPoolFunctions(unittest.TestCase):
+    def test_find_imported_modules(self):
+        """Test absolute and relative imports found in python file"""
+
+        with tempfile.TemporaryDirectory() as temporary_directory:
+
+            # Create some python files
+            files = {
+                "package/module.py": "import os.path, json\nfrom . import helpers\nfrom .sub.tools import run\n",
+                "broken.py": "import (\n",
+            }
+            for file_path, content in files.items():
+                Path(temporary_directory, file_path).parent.mkdir(exist_ok=True)
+                Path(temporary_directory, file_path).write_text(content)
+
+            # Find the imported modules
+            module_names = worker_pool_functions.find_imported_modules(
+                Path(temporary_directory, "package/module.py"),
+                Path(temporary_directory),
+            )
+            broken_module_names = worker_pool_functions.find_imported_modules(
+                Path(temporary_directory, "broken.py"), Path(temporary_directory)
+            )
+
+        # Check expected modules found
+        self.assertEqual(
+            module_names,
+            [
+                "json",
+                "os.path",
+                "package",
+                "package.helpers",
+                "package.sub.tools",
+                "package.sub.tools.run",
+            ],
+            "Check absolute and resolved relative imports found",
+        )
+        self.assertEqual(broken_module_names, [], "Check broken file skipped")
+
+    def test_find_test_dependencies(self):
+        """Test only modules imported by tests and the project modules they import found"""
+
+        with tempfile.TemporaryDirectory() as temporary_directory:
+
+            # Create a project with tests, code under test, and other scripts
+            files = {
+                "package/__init__.py": "import json\n",
+                "package/module.py": "from . import helpers\n",
+                "package/helpers.py": "import colorsys\n",
+                "package/unused.py": "import wave\n",
+                "tests/test_module.py": "from package import module\nimport unittest\n",
+                "setup.py": "import setuptools\n",
+                "benchmarks/run.py": "import timeit\n",
+            }
+            for file_path, content in files.items():
+                Path(temporary_directory, file_path).parent.mkdir(exist_ok=True)
+                Path(temporary_directory, file_path).write_text(content)
+
+            # Find the dependencies of the tests
+            module_names = worker_pool_functions.find_test_dependencies(
+                [Path(temporary_directory, "tests/test_module.py")],
+                Path(temporary_directory),
+            )
+
+        # Check only modules the tests need found
+        self.assertEqual(
+            module_names,
+            ["colorsys", "json", "unittest"],
+            "Check dependencies of tests and code under test found but not other files",
+        )
+
+    def test_import_common_dependencies(self):
+        """Test only modules installed outside directory imported"""
+
+        with tempfile.TemporaryDirectory() as temporary_directory:
+
+            # Create a module importing an installed module and a local module
+            directory = Path(temporary_directory)
+            Path(directory, "local_module.py").write_text("import colorsys\n")
+            Path(directory, "test_local.py").write_text("import local_module\n")
+
+            # Check local module not external
+            sys.path.insert(0, str(directory))
+            try:
+                self.assertFalse(
+                    worker_pool_functions.is_external_module("local_module", directory),
+                    "Check module in directory not external",
+                )
+                imported_modules = worker_pool_functions.import_common_dependencies(
+                    "unittest", [Path(directory, "test_local.py")], directory
+                )
+            finally:
+                sys.path.remove(str(directory))
+
+        # Check only installed modules imported
+        self.assertTrue(
+            worker_pool_functions.is_external_module("colorsys", directory),
+            "Check installed module external",
+        )
+        self.assertNotIn(
+            "local_module", imported_modules, "Check local module not imported"
+        )
+        self.assertNotIn("local_module", sys.modules, "Check local module not loaded")
+        self.assertIn("colorsys", sys.modules, "Check installed module loaded")
+
+    def test_import_common_dependencies_thread(self):
+        """Test importing stops when a dependency starts a thread"""
+
+        with tempfile.TemporaryDirectory() as temporary_directory:
+
+            # Create a project whose tests import a dependency (installed elsewhere) that starts a thread
+            directory = Path(temporary_directory, "project")
+            directory.mkdir()
+            Path(directory, "test_threads.py").write_text(
+                "import threading_dependency\nimport wave\n"
+            )
+            installed_directory = Path(temporary_directory, "installed")
+            installed_directory.mkdir()
+            Path(installed_directory, "threading_dependency.py").write_text(
+                "import threading\nevent = threading.Event()\nthread = threading.Thread(target=event.wait)\nthread.start()\n"
+            )
+
+            # Import the dependencies
+            sys.path.insert(0, str(installed_directory))
+            try:
+                with self.assertWarns(UserWarning):
+                    imported_modules = worker_pool_functions.import_common_dependencies(
+                        "unittest", [Path(directory, "test_threads.py")], directory
+                    )
+            finally:
+                sys.path.remove(str(installed_directory))
+                threading_dependency = sys.modules.pop("threading_dependency")
+                threading_dependency.event.set()
+                threading_dependency.thread.join()
+
+        # Check importing stopped after the thread started
+        self.assertEqual(
+            imported_modules,
+            ["threading_dependency"],
+            "Check no more modules imported after thread started",
+        )
+
+
+if __name__ == "__main__":
+    unittest.main()